@@ -1,15 +1,24 @@
+import functools
 import os
 import re
+import string
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 
+# Deleting every allowed character leaves only the ones the regex would rewrite.
+_NAMESPACE_ALLOWED_DELETE = str.maketrans("", "", string.ascii_lowercase + string.digits + "_-")
+_NAMESPACE_INVALID_RE = re.compile(r"[^a-z0-9_-]+")
 
+
+@functools.lru_cache(maxsize=None)
 def _resolve_namespace() -> str:
     raw = str(os.getenv("IVASMS_DATA_NAMESPACE", "")).strip().lower()
     if not raw:
         return "main"
-    cleaned = re.sub(r"[^a-z0-9_-]+", "-", raw).strip("-_")
+    if raw.translate(_NAMESPACE_ALLOWED_DELETE):
+        raw = _NAMESPACE_INVALID_RE.sub("-", raw)
+    cleaned = raw.strip("-_")
     return cleaned or "main"
 
 
@@ -1,9 +1,18 @@
-import json
+import atexit
+import functools
+import os
+import queue
 import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator
+
+import orjson
 
 from .paths import (
     ACCOUNTS_FILE,
@@ -30,202 +39,450 @@ JSON_KEY_BY_NAME = {
     COUNTRY_FILE.name: "country_codes",
 }
 
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-64000;"
+    "PRAGMA mmap_size=30000000000;"
+    "PRAGMA busy_timeout=5000;"
+)
+READER_POOL_SIZE = 4
+PAGE_SIZE = 32768
+DAILY_CACHE_SIZE = 64
+MIGRATION_WORKERS = 8
+JSON_DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it, so this runs once at import, before any writer threads.
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+# Mode for files that do not exist yet, matching what open()/write_text would create.
+NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+SCHEMA_VERSION = 3
+# STRICT needs SQLite 3.37+; older builds still get the clustered WITHOUT ROWID layout.
+TABLE_OPTIONS = "WITHOUT ROWID, STRICT" if sqlite3.sqlite_version_info >= (3, 37, 0) else "WITHOUT ROWID"
+KV_STORE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS kv_store (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        updated_at INTEGER NOT NULL
+    ) {TABLE_OPTIONS}
+"""
+DAILY_STORE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS daily_store (
+        day_key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        updated_at INTEGER NOT NULL
+    ) {TABLE_OPTIONS}
+"""
+# Pre-v3 rows carry local "%Y-%m-%d %H:%M:%S" strings; integers pass through unchanged.
+UPDATED_AT_TO_EPOCH = (
+    "CASE WHEN typeof(updated_at) = 'integer' THEN updated_at "
+    "ELSE COALESCE(CAST(strftime('%s', updated_at, 'utc') AS INTEGER), 0) END"
+)
+META_DDL = """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+"""
+
+KV_UPSERT_SQL = """
+    INSERT INTO kv_store(key, value, updated_at)
+    VALUES(?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+"""
+DAILY_UPSERT_SQL = """
+    INSERT INTO daily_store(day_key, value, updated_at)
+    VALUES(?, ?, ?)
+    ON CONFLICT(day_key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+"""
+KV_INSERT_IF_ABSENT_SQL = "INSERT INTO kv_store(key, value, updated_at) VALUES(?, ?, ?) ON CONFLICT(key) DO NOTHING"
+DAILY_INSERT_IF_ABSENT_SQL = (
+    "INSERT INTO daily_store(day_key, value, updated_at) VALUES(?, ?, ?) ON CONFLICT(day_key) DO NOTHING"
+)
+META_UPSERT_SQL = "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value"
+
+
+def _load_legacy_payload(path: Path) -> bytes | None:
+    try:
+        return orjson.dumps(orjson.loads(path.read_bytes()), option=JSON_DUMP_OPTIONS)
+    except Exception:
+        return None
+
+
+# Directories, schema and legacy import only need to run once per database per process.
+_INIT_LOCK = threading.Lock()
+_INITIALIZED_DBS: set[Path] = set()
+
 
 class JsonSQLiteStore:
     def __init__(self, db_path: Path = DB_FILE) -> None:
         self.db_path = db_path
-        ensure_dirs()
-        self._init_db()
-        self._migrate_from_legacy_once()
+        self._lock = threading.Lock()
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=READER_POOL_SIZE)
+        # Raw payloads (None = missing row); callers always get a freshly parsed copy.
+        self._kv_cache: dict[str, bytes | None] = {}
+        self._daily_cache: OrderedDict[str, bytes | None] = OrderedDict()
+        self._cache_gen = 0
+        self._data_version = -1
+        with _INIT_LOCK:
+            init_key = Path(db_path).resolve()
+            first_open = init_key not in _INITIALIZED_DBS
+            if first_open:
+                ensure_dirs()
+            self._conn_obj = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn_obj.executescript(CONNECTION_PRAGMAS)
+            if first_open:
+                self._init_db()
+                self._migrate_from_legacy_once()
+                _INITIALIZED_DBS.add(init_key)
+        atexit.register(self._optimize)
+
+    def _optimize(self) -> None:
+        # Refreshes planner statistics only for tables that changed; near-free otherwise.
+        if not self._lock.acquire(timeout=1):
+            return
+        try:
+            self._conn_obj.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        finally:
+            self._lock.release()
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.executescript(CONNECTION_PRAGMAS)
+        return conn
 
     @contextmanager
-    def _conn(self) -> Iterator[sqlite3.Connection]:
-        conn = sqlite3.connect(self.db_path, timeout=30)
+    def _read_conn(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit connection: SELECTs never open a transaction, so nothing is committed here.
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._open_reader()
         try:
             yield conn
-            conn.commit()
         finally:
-            conn.close()
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def _write_conn(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._conn_obj
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _sync_cache(self) -> None:
+        # data_version only moves when another connection (e.g. another bot process) commits.
+        version = self._conn_obj.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._kv_cache.clear()
+            self._daily_cache.clear()
+
+    def _invalidate(self, kv_key: str | None = None, day_key: str | None = None, everything: bool = False) -> None:
+        self._cache_gen += 1
+        if everything:
+            self._kv_cache.clear()
+            self._daily_cache.clear()
+            return
+        if kv_key is not None:
+            self._kv_cache.pop(kv_key, None)
+        if day_key is not None:
+            self._daily_cache.pop(day_key, None)
+
+    def _kv_payload(self, key: str) -> bytes | None:
+        with self._lock:
+            self._sync_cache()
+            if key in self._kv_cache:
+                return self._kv_cache[key]
+            gen = self._cache_gen
+        # The BLOB comes back as one bytes object that orjson parses in place (no str copy).
+        # Blob I/O (Connection.blobopen) is not usable here: WITHOUT ROWID tables have no rowid.
+        with self._read_conn() as conn:
+            row = conn.execute("SELECT value FROM kv_store WHERE key = ?", (key,)).fetchone()
+        payload = row[0] if row else None
+        with self._lock:
+            if gen == self._cache_gen:
+                self._kv_cache[key] = payload
+        return payload
+
+    def _daily_payload(self, day_key: str) -> bytes | None:
+        with self._lock:
+            self._sync_cache()
+            if day_key in self._daily_cache:
+                self._daily_cache.move_to_end(day_key)
+                return self._daily_cache[day_key]
+            gen = self._cache_gen
+        with self._read_conn() as conn:
+            row = conn.execute("SELECT value FROM daily_store WHERE day_key = ?", (day_key,)).fetchone()
+        payload = row[0] if row else None
+        with self._lock:
+            if gen == self._cache_gen:
+                self._daily_cache[day_key] = payload
+                while len(self._daily_cache) > DAILY_CACHE_SIZE:
+                    self._daily_cache.popitem(last=False)
+        return payload
 
     def _init_db(self) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS kv_store (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-                """
-            )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS daily_store (
-                    day_key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-                """
-            )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS meta (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL
-                )
-                """
-            )
-
-    def _now(self) -> str:
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # page_size only sticks on a brand-new file, and must be set before WAL is enabled.
+        if self._conn_obj.execute("PRAGMA page_count").fetchone()[0] == 0:
+            self._conn_obj.execute(f"PRAGMA page_size={PAGE_SIZE}")
+        # WAL is persistent in the database file and lets readers run alongside the writer.
+        self._conn_obj.execute("PRAGMA journal_mode=WAL")
+        with self._write_conn() as conn:
+            conn.execute(META_DDL)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row and str(row[0]).isdigit() and int(row[0]) >= SCHEMA_VERSION:
+                conn.execute(KV_STORE_DDL)
+                conn.execute(DAILY_STORE_DDL)
+                return
+            # Older databases hold rowid tables with TEXT payloads; rebuild them in place.
+            self._rebuild_table(conn, "kv_store", KV_STORE_DDL, f"key, CAST(value AS BLOB), {UPDATED_AT_TO_EPOCH}")
+            self._rebuild_table(conn, "daily_store", DAILY_STORE_DDL, f"day_key, CAST(value AS BLOB), {UPDATED_AT_TO_EPOCH}")
+            conn.execute(META_UPSERT_SQL, ("schema_version", str(SCHEMA_VERSION)))
+
+    def _rebuild_table(self, conn: sqlite3.Connection, table: str, ddl: str, columns: str) -> None:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        if not exists:
+            conn.execute(ddl)
+            return
+        conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        conn.execute(ddl)
+        conn.execute(f"INSERT INTO {table} SELECT {columns} FROM {table}_old")
+        conn.execute(f"DROP TABLE {table}_old")
+
+    def _now(self) -> int:
+        return int(time.time())
 
     def _meta_get(self, key: str) -> str:
-        with self._conn() as conn:
+        with self._read_conn() as conn:
             row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
         return str(row[0]) if row else ""
 
     def _meta_set(self, key: str, value: str) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-                (key, value),
-            )
+        with self._write_conn() as conn:
+            conn.execute(META_UPSERT_SQL, (key, value))
 
-    def _has_key(self, key: str) -> bool:
-        with self._conn() as conn:
-            row = conn.execute("SELECT 1 FROM kv_store WHERE key = ?", (key,)).fetchone()
-        return bool(row)
+    def revision(self) -> tuple[int, int]:
+        # Changes whenever any connection commits, so callers can cache what they derive from reads.
+        with self._lock:
+            self._sync_cache()
+            return self._data_version, self._cache_gen
 
     def get_json(self, key: str, fallback: Any) -> Any:
-        with self._conn() as conn:
-            row = conn.execute("SELECT value FROM kv_store WHERE key = ?", (key,)).fetchone()
-        if not row:
+        payload = self._kv_payload(key)
+        if payload is None:
             return fallback
         try:
-            return json.loads(str(row[0]))
+            return orjson.loads(payload)
         except Exception:
             return fallback
 
     def set_json(self, key: str, data: Any) -> None:
-        payload = json.dumps(data, ensure_ascii=False, indent=2)
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO kv_store(key, value, updated_at)
-                VALUES(?, ?, ?)
-                ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
-                """,
-                (key, payload, self._now()),
-            )
+        payload = orjson.dumps(data, option=JSON_DUMP_OPTIONS)
+        # Rewriting identical bytes would only bump data_version and flush every reader's cache.
+        if self._kv_payload(key) == payload:
+            return
+        with self._write_conn() as conn:
+            conn.execute(KV_UPSERT_SQL, (key, payload, self._now()))
+            self._invalidate(kv_key=key)
 
     def get_daily(self, day_key: str, fallback: Any) -> Any:
-        with self._conn() as conn:
-            row = conn.execute("SELECT value FROM daily_store WHERE day_key = ?", (day_key,)).fetchone()
-        if not row:
+        payload = self._daily_payload(day_key)
+        if payload is None:
             return fallback
         try:
-            return json.loads(str(row[0]))
+            return orjson.loads(payload)
         except Exception:
             return fallback
 
     def set_daily(self, day_key: str, data: Any) -> None:
-        payload = json.dumps(data, ensure_ascii=False, indent=2)
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO daily_store(day_key, value, updated_at)
-                VALUES(?, ?, ?)
-                ON CONFLICT(day_key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
-                """,
-                (day_key, payload, self._now()),
-            )
+        payload = orjson.dumps(data, option=JSON_DUMP_OPTIONS)
+        with self._write_conn() as conn:
+            conn.execute(DAILY_UPSERT_SQL, (day_key, payload, self._now()))
+            self._invalidate(day_key=day_key)
+
+    def set_daily_many(self, items: Iterable[tuple[str, Any]]) -> None:
+        now = self._now()
+        rows = [(day_key, orjson.dumps(data, option=JSON_DUMP_OPTIONS), now) for day_key, data in items]
+        if not rows:
+            return
+        with self._write_conn() as conn:
+            conn.executemany(DAILY_UPSERT_SQL, rows)
+            for day_key, _payload, _now in rows:
+                self._invalidate(day_key=day_key)
 
     def delete_daily(self, day_key: str) -> None:
-        with self._conn() as conn:
+        with self._write_conn() as conn:
             conn.execute("DELETE FROM daily_store WHERE day_key = ?", (day_key,))
+            self._invalidate(day_key=day_key)
 
     def list_daily_keys(self) -> list[str]:
-        with self._conn() as conn:
-            rows = conn.execute("SELECT day_key FROM daily_store ORDER BY day_key").fetchall()
-        return [str(r[0]) for r in rows]
+        # daily_store is clustered on day_key, so this is an in-order scan with no sort step.
+        with self._read_conn() as conn:
+            return [r[0] for r in conn.execute("SELECT day_key FROM daily_store ORDER BY day_key")]
 
     def clear_daily(self) -> None:
-        with self._conn() as conn:
+        with self._write_conn() as conn:
             conn.execute("DELETE FROM daily_store")
+            self._invalidate(everything=True)
 
     def _migrate_from_legacy_once(self) -> None:
         if self._meta_get("legacy_migrated_v1"):
             return
 
+        kv_sources: list[tuple[str, Path]] = []
         for filename, key in JSON_KEY_BY_NAME.items():
             path = ACCOUNTS_FILE.parent / filename
-            if not path.exists() or self._has_key(key):
-                continue
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-            except Exception:
-                continue
-            self.set_json(key, data)
-
-        for path in DAILY_STORE_DIR.glob("messages_*.json"):
-            day_key = path.stem.replace("messages_", "", 1)
-            if not day_key:
-                continue
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-            except Exception:
-                continue
-            existing = self.get_daily(day_key, None)
-            if existing is None:
-                self.set_daily(day_key, data)
-
-        self._meta_set("legacy_migrated_v1", self._now())
-
-
-_STORE = JsonSQLiteStore()
+            if path.exists():
+                kv_sources.append((key, path))
+
+        daily_sources: list[tuple[str, Path]] = []
+        with os.scandir(DAILY_STORE_DIR) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith("messages_") and name.endswith(".json")) or not entry.is_file():
+                    continue
+                day_key = name[len("messages_"):-len(".json")]
+                if day_key:
+                    daily_sources.append((day_key, Path(entry.path)))
+
+        sources = kv_sources + daily_sources
+        if sources:
+            # File reads and parsing overlap across threads; the writes below stay in one transaction.
+            with ThreadPoolExecutor(max_workers=min(MIGRATION_WORKERS, len(sources))) as pool:
+                payloads = list(pool.map(_load_legacy_payload, [path for _key, path in sources]))
+        else:
+            payloads = []
+
+        now = self._now()
+        kv_rows: list[tuple[str, bytes, int]] = [
+            (key, payload, now) for (key, _path), payload in zip(kv_sources, payloads) if payload is not None
+        ]
+        daily_rows: list[tuple[str, bytes, int]] = [
+            (day_key, payload, now)
+            for (day_key, _path), payload in zip(daily_sources, payloads[len(kv_sources):])
+            if payload is not None
+        ]
+
+        # One transaction for the whole import instead of a commit per file.
+        with self._write_conn() as conn:
+            # First write wins: rows already in the database are never overwritten by legacy files.
+            conn.executemany(KV_INSERT_IF_ABSENT_SQL, kv_rows)
+            conn.executemany(DAILY_INSERT_IF_ABSENT_SQL, daily_rows)
+            conn.execute(META_UPSERT_SQL, ("legacy_migrated_v1", str(now)))
+            self._invalidate(everything=True)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_store() -> JsonSQLiteStore:
+    return JsonSQLiteStore()
+
+
+@functools.lru_cache(maxsize=256)
+def _json_key_for_str(path_str: str) -> str:
+    return JSON_KEY_BY_NAME.get(Path(path_str).name, "")
 
 
 def json_key_for_path(path: Path | str) -> str:
-    name = Path(path).name
-    return JSON_KEY_BY_NAME.get(name, "")
+    return _json_key_for_str(str(path))
 
 
 def load_json(path: Path, fallback: Any) -> Any:
     key = json_key_for_path(path)
     if key:
-        return _STORE.get_json(key, fallback)
+        return _get_store().get_json(key, fallback)
     if not path.exists():
         return fallback
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return orjson.loads(path.read_bytes())
     except Exception:
         return fallback
 
 
+def json_revision(path: Path) -> Any:
+    key = json_key_for_path(path)
+    if key:
+        return _get_store().revision()
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 def save_json(path: Path, data: Any) -> None:
     key = json_key_for_path(path)
     if key:
-        _STORE.set_json(key, data)
+        _get_store().set_json(key, data)
         return
+    payload = orjson.dumps(data, option=JSON_DUMP_OPTIONS | orjson.OPT_INDENT_2)
+    try:
+        if path.read_bytes() == payload:
+            return
+    except OSError:
+        pass
+    _write_bytes_atomic(path, payload)
+
+
+def _write_bytes_atomic(path: Path, payload: bytes) -> None:
+    # Write a sibling temp file and rename it over the target so readers never see a partial file.
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    try:
+        mode = path.stat().st_mode & 0o777
+    except OSError:
+        mode = NEW_FILE_MODE
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(payload)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
 
 
 def get_daily_store(day_key: str, fallback: Any) -> Any:
-    return _STORE.get_daily(day_key, fallback)
+    return _get_store().get_daily(day_key, fallback)
 
 
 def set_daily_store(day_key: str, data: Any) -> None:
-    _STORE.set_daily(day_key, data)
+    _get_store().set_daily(day_key, data)
+
+
+def set_daily_store_many(items: Iterable[tuple[str, Any]]) -> None:
+    _get_store().set_daily_many(items)
 
 
 def delete_daily_store(day_key: str) -> None:
-    _STORE.delete_daily(day_key)
+    _get_store().delete_daily(day_key)
 
 
 def list_daily_store_days() -> list[str]:
-    return _STORE.list_daily_keys()
+    return _get_store().list_daily_keys()
 
 
 def clear_daily_store() -> None:
-    _STORE.clear_daily()
+    _get_store().clear_daily()
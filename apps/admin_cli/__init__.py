@@ -0,0 +1,401 @@
+import functools
+import gc
+import importlib
+import sys
+from datetime import date
+from typing import TYPE_CHECKING, Callable
+
+from apps.admin_cli._common import (
+    DEFAULT_API_BASE,
+    _ask,
+    _default_api_base,
+    _dotenv_loaded,
+    err,
+    heading,
+    is_real_value,
+    ok,
+)
+
+if TYPE_CHECKING:
+    import argparse
+
+CLI_DESCRIPTION = "Manage bot accounts, groups, stats and balances"
+# Canonical command name -> its aliases.
+COMMAND_ALIASES: dict[str, tuple[str, ...]] = {
+    "add-account": ("acc-add",),
+    "add-group": ("grp-add",),
+    "clear-store": (),
+    "list-accounts": (),
+    "list-groups": (),
+    "set-platform-emoji-id": ("set-emoji",),
+    "remove-account": ("acc-rm",),
+    "stats": ("st",),
+    "balances": ("bal",),
+    "add-range": ("ar", "range-add"),
+    "fetch-numbers": ("fn", "numbers"),
+    "fetch-traffic": ("ft", "traffic"),
+    "fetch-platforms": ("fp", "platforms"),
+    "show-ranges": ("sr", "ranges"),
+    "sync-ranges": ("sync",),
+}
+CLI_COMMANDS = tuple(COMMAND_ALIASES)
+# Any accepted spelling (canonical name or alias) -> canonical name.
+_CANONICAL_COMMANDS: dict[str, str] = {
+    name: canonical for canonical, aliases in COMMAND_ALIASES.items() for name in (canonical, *aliases)
+}
+HELP_FLAGS = frozenset({"-h", "--help"})
+MENU_TEXT = (
+    "\n".join(
+        [
+            " 1) Add account",
+            " 2) Add group",
+            " 3) List accounts",
+            " 4) List groups",
+            " 5) Remove account",
+            " 6) Stats",
+            " 7) Balances (all accounts)",
+            " 8) Add range",
+            " 9) Fetch numbers",
+            "10) Fetch traffic",
+            "11) Fetch platforms",
+            "12) Show ranges store",
+            "13) Sync ranges (every 30 min)",
+            "14) Exit",
+        ]
+    )
+    + "\n"
+)
+
+
+# Command name -> submodule defining it; resolved on first access by __getattr__ (PEP 562).
+_LAZY_HANDLERS: dict[str, str] = {
+    "add_account": "_accounts",
+    "add_group": "_accounts",
+    "list_accounts": "_accounts",
+    "list_groups": "_accounts",
+    "remove_account": "_accounts",
+    "set_platform_emoji_id": "_accounts",
+    "balances_command": "_stats",
+    "clear_store": "_stats",
+    "stats_command": "_stats",
+    "add_range_command": "_ranges",
+    "show_ranges_store_command": "_ranges",
+    "sync_ranges_command": "_ranges",
+    "fetch_numbers_command": "_fetch",
+    "fetch_platforms_command": "_fetch",
+    "fetch_traffic_command": "_fetch",
+}
+
+
+def __getattr__(name: str):
+    # Command modules are imported on first use, so each command only loads the code it runs.
+    module = _LAZY_HANDLERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    handler = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = handler
+    return handler
+
+
+def _handler(name: str) -> Callable:
+    return globals().get(name) or __getattr__(name)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_api_base() -> str:
+    # Asked at most once per menu session when .env has no usable API_BASE_URL.
+    api_base = _default_api_base()
+    if is_real_value(api_base):
+        return api_base
+    return _ask("API base URL", DEFAULT_API_BASE)
+
+
+def _menu_add_account() -> None:
+    name = _ask("Account name")
+    email = _ask("Email")
+    password = _ask("Password")
+    enabled = _ask("Enabled? (y/n)", "y").lower() != "n"
+    _handler("add_account")(name, email, password, enabled=enabled)
+
+
+def _menu_add_group() -> None:
+    name = _ask("Group name")
+    chat_id = _ask("Telegram chat_id (example: -1001234567890)")
+    enabled = _ask("Enabled? (y/n)", "y").lower() != "n"
+    _handler("add_group")(name, chat_id, enabled=enabled)
+    print("Run bot.py and messages will be sent to enabled groups.")
+
+
+def _menu_stats() -> None:
+    if _ask("All days? (y/n)", "n").lower() == "y":
+        _handler("stats_command")(None, all_days=True)
+    else:
+        day_key = _ask("Day YYYY-MM-DD", date.today().isoformat())
+        _handler("stats_command")(day_key, all_days=False)
+
+
+def _menu_add_range() -> None:
+    api_base = _get_api_base()
+    range_name = _ask("Range name")
+    count_raw = _ask("Count (multiple of 50, max 1000)", "50")
+    try:
+        count = int(count_raw)
+    except ValueError:
+        err("count must be a number")
+        return
+    _handler("add_range_command")(api_base, range_name, count)
+
+
+def _menu_fetch_traffic() -> None:
+    api_base = _get_api_base()
+    app_name = _ask("App name", "WhatsApp")
+    _handler("fetch_traffic_command")(api_base, app_name)
+
+
+def _menu_sync_ranges() -> None:
+    api_base = _get_api_base()
+    interval_raw = _ask("Interval minutes", "30")
+    try:
+        interval_minutes = int(interval_raw)
+    except ValueError:
+        err("interval must be a number")
+        return
+    _handler("sync_ranges_command")(api_base, interval_minutes, once=False)
+
+
+MENU_EXIT = "14"
+_MENU_ACTIONS: dict[str, Callable[[], object]] = {
+    "1": _menu_add_account,
+    "2": _menu_add_group,
+    "3": lambda: _handler("list_accounts")(),
+    "4": lambda: _handler("list_groups")(),
+    "5": lambda: _handler("remove_account")(name=None, email=None),
+    "6": _menu_stats,
+    "7": lambda: _handler("balances_command")(_get_api_base()),
+    "8": _menu_add_range,
+    "9": lambda: _handler("fetch_numbers_command")(_get_api_base()),
+    "10": _menu_fetch_traffic,
+    "11": lambda: _handler("fetch_platforms_command")(_get_api_base()),
+    "12": lambda: _handler("show_ranges_store_command")(),
+    "13": _menu_sync_ranges,
+}
+
+
+def interactive_menu() -> None:
+    _dotenv_loaded()
+    # Long-lived loop: move startup objects out of the collector's young generations.
+    gc.freeze()
+    while True:
+        heading("Bot CLI Menu")
+        sys.stdout.write(MENU_TEXT)
+        choice = input("Choose (1-14): ").strip()
+        if choice == MENU_EXIT:
+            ok("bye")
+            return
+        action = _MENU_ACTIONS.get(choice)
+        if action is None:
+            err("invalid choice")
+            continue
+        action()
+
+
+def _add_subparser(sub, name: str):
+    return sub.add_parser(name, aliases=list(COMMAND_ALIASES[name]))
+
+
+def _build_add_account_parser(sub) -> None:
+    p_add_acc = _add_subparser(sub, "add-account")
+    p_add_acc.add_argument("--name", required=True)
+    p_add_acc.add_argument("--email", required=True)
+    p_add_acc.add_argument("--password", required=True)
+    p_add_acc.add_argument("--disabled", action="store_true")
+
+
+def _build_add_group_parser(sub) -> None:
+    p_add_grp = _add_subparser(sub, "add-group")
+    p_add_grp.add_argument("--name", required=True)
+    p_add_grp.add_argument("--chat-id", required=True)
+    p_add_grp.add_argument("--disabled", action="store_true")
+
+
+def _build_clear_store_parser(sub) -> None:
+    p_clear = _add_subparser(sub, "clear-store")
+    p_clear.add_argument("--start-date")
+
+
+def _build_list_accounts_parser(sub) -> None:
+    _add_subparser(sub, "list-accounts")
+
+
+def _build_list_groups_parser(sub) -> None:
+    _add_subparser(sub, "list-groups")
+
+
+def _build_set_emoji_parser(sub) -> None:
+    p_set_emoji = _add_subparser(sub, "set-platform-emoji-id")
+    p_set_emoji.add_argument("--key", required=True)
+    p_set_emoji.add_argument("--emoji-id", required=True)
+
+
+def _build_remove_account_parser(sub) -> None:
+    p_remove_acc = _add_subparser(sub, "remove-account")
+    p_remove_acc.add_argument("--name")
+    p_remove_acc.add_argument("--email")
+
+
+def _build_stats_parser(sub) -> None:
+    p_stats = _add_subparser(sub, "stats")
+    p_stats.add_argument("--day", help="YYYY-MM-DD")
+    p_stats.add_argument("--all-days", action="store_true")
+
+
+def _build_balances_parser(sub) -> None:
+    p_balances = _add_subparser(sub, "balances")
+    p_balances.add_argument("--api-base")
+
+
+def _build_add_range_parser(sub) -> None:
+    p_add_range = _add_subparser(sub, "add-range")
+    p_add_range.add_argument("--range-name", required=True)
+    p_add_range.add_argument("--count", required=True, type=int, help="Requested numbers count (multiple of 50, max 1000)")
+    p_add_range.add_argument("--api-base")
+
+
+def _build_fetch_numbers_parser(sub) -> None:
+    p_fetch_numbers = _add_subparser(sub, "fetch-numbers")
+    p_fetch_numbers.add_argument("--api-base")
+
+
+def _build_fetch_traffic_parser(sub) -> None:
+    p_fetch_traffic = _add_subparser(sub, "fetch-traffic")
+    p_fetch_traffic.add_argument("--app-name", default="WhatsApp")
+    p_fetch_traffic.add_argument("--api-base")
+
+
+def _build_fetch_platforms_parser(sub) -> None:
+    p_fetch_platforms = _add_subparser(sub, "fetch-platforms")
+    p_fetch_platforms.add_argument("--api-base")
+
+
+def _build_show_ranges_parser(sub) -> None:
+    _add_subparser(sub, "show-ranges")
+
+
+def _build_sync_ranges_parser(sub) -> None:
+    p_sync_ranges = _add_subparser(sub, "sync-ranges")
+    p_sync_ranges.add_argument("--api-base")
+    p_sync_ranges.add_argument("--interval-minutes", type=int, default=30)
+    p_sync_ranges.add_argument("--once", action="store_true")
+
+
+# Canonical command name -> the builder for its subparser.
+_SUBCOMMANDS: dict[str, Callable[..., None]] = {
+    "add-account": _build_add_account_parser,
+    "add-group": _build_add_group_parser,
+    "clear-store": _build_clear_store_parser,
+    "list-accounts": _build_list_accounts_parser,
+    "list-groups": _build_list_groups_parser,
+    "set-platform-emoji-id": _build_set_emoji_parser,
+    "remove-account": _build_remove_account_parser,
+    "stats": _build_stats_parser,
+    "balances": _build_balances_parser,
+    "add-range": _build_add_range_parser,
+    "fetch-numbers": _build_fetch_numbers_parser,
+    "fetch-traffic": _build_fetch_traffic_parser,
+    "fetch-platforms": _build_fetch_platforms_parser,
+    "show-ranges": _build_show_ranges_parser,
+    "sync-ranges": _build_sync_ranges_parser,
+}
+# Commands (canonical names) that take no options at all are dispatched straight from sys.argv, without argparse.
+_ZERO_ARG_COMMANDS: dict[str, Callable[[], object]] = {
+    "list-accounts": lambda: _handler("list_accounts")(),
+    "list-groups": lambda: _handler("list_groups")(),
+    "show-ranges": lambda: _handler("show_ranges_store_command")(),
+    "fetch-numbers": lambda: _handler("fetch_numbers_command")(_default_api_base()),
+    "fetch-platforms": lambda: _handler("fetch_platforms_command")(_default_api_base()),
+}
+# Canonical command name -> its handler, called with the parsed arguments.
+_CMD_TABLE: dict[str, Callable[["argparse.Namespace"], object]] = {
+    "add-account": lambda args: _handler("add_account")(args.name, args.email, args.password, enabled=not args.disabled),
+    "add-group": lambda args: _handler("add_group")(args.name, args.chat_id, enabled=not args.disabled),
+    "clear-store": lambda args: _handler("clear_store")(args.start_date),
+    "list-accounts": lambda args: _handler("list_accounts")(),
+    "list-groups": lambda args: _handler("list_groups")(),
+    "set-platform-emoji-id": lambda args: _handler("set_platform_emoji_id")(args.key, args.emoji_id),
+    "remove-account": lambda args: _handler("remove_account")(args.name, args.email),
+    "stats": lambda args: _handler("stats_command")(args.day, args.all_days),
+    "balances": lambda args: _handler("balances_command")(args.api_base),
+    "add-range": lambda args: _handler("add_range_command")(args.api_base, args.range_name, args.count),
+    "fetch-numbers": lambda args: _handler("fetch_numbers_command")(args.api_base),
+    "fetch-traffic": lambda args: _handler("fetch_traffic_command")(args.api_base, args.app_name),
+    "fetch-platforms": lambda args: _handler("fetch_platforms_command")(args.api_base),
+    "show-ranges": lambda args: _handler("show_ranges_store_command")(),
+    "sync-ranges": lambda args: _handler("sync_ranges_command")(args.api_base, args.interval_minutes, args.once),
+}
+
+
+def _print_fast_help() -> None:
+    # Top-level help needs no .env and no subparsers; "<command> -h" still goes through the full parser.
+    import argparse
+
+    p = argparse.ArgumentParser(description=CLI_DESCRIPTION)
+    p.add_argument(
+        "command",
+        nargs="?",
+        choices=CLI_COMMANDS,
+        help="run '<command> -h' for its options; without a command the interactive menu opens",
+    )
+    p.print_help()
+
+
+def main() -> int:
+    if len(sys.argv) == 1:
+        # No command: straight to the menu, which loads .env itself.
+        interactive_menu()
+        return 0
+    if len(sys.argv) == 2 and sys.argv[1] in HELP_FLAGS:
+        _print_fast_help()
+        return 0
+    command = _CANONICAL_COMMANDS.get(sys.argv[1])
+    if len(sys.argv) == 2 and command in _ZERO_ARG_COMMANDS:
+        _dotenv_loaded()
+        _ZERO_ARG_COMMANDS[command]()
+        return 0
+
+    _dotenv_loaded()
+    # Deferred so the menu and the option-less commands above never import argparse.
+    import argparse
+
+    # Defaults only matter when help is printed.
+    wants_help = not HELP_FLAGS.isdisjoint(sys.argv)
+    p = argparse.ArgumentParser(
+        description=CLI_DESCRIPTION,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter if wants_help else argparse.HelpFormatter,
+    )
+    sub = p.add_subparsers(dest="cmd")
+    # Only the requested subcommand's parser is built; anything unrecognized gets all of them
+    # so argparse can report the valid choices.
+    if command is not None:
+        _SUBCOMMANDS[command](sub)
+    else:
+        for build in _SUBCOMMANDS.values():
+            build(sub)
+
+    args = p.parse_args()
+    if "api_base" in args:
+        # Resolved after parsing so the .env default is only looked up when no --api-base was given.
+        args.api_base = args.api_base or _default_api_base()
+    if not args.cmd:
+        interactive_menu()
+        return 0
+
+    canonical = _CANONICAL_COMMANDS.get(args.cmd, args.cmd)
+    handler = _CMD_TABLE.get(canonical)
+    if handler is None:
+        err("unknown command")
+        return 2
+    if canonical == "sync-ranges" and not args.once:
+        # Daemon mode: keep the parser graph out of every collection in the sync loop.
+        gc.freeze()
+    handler(args)
+    return 0
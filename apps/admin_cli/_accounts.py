@@ -0,0 +1,160 @@
+from app.paths import ACCOUNTS_FILE, GROUPS_FILE, PLATFORMS_FILE
+from apps.admin_cli._common import (
+    _accounts_limit_total,
+    _ask,
+    _index_by,
+    _print_lines,
+    _upsert_by,
+    _validate_chat_id,
+    _validate_email,
+    err,
+    heading,
+    invalidate_accounts_cache,
+    load_json,
+    ok,
+    save_json,
+    warn,
+)
+
+
+def add_account(name: str, email: str, password: str, enabled: bool) -> None:
+    rows = load_json(ACCOUNTS_FILE, [])
+    if not isinstance(rows, list):
+        rows = []
+    if not _validate_email(email):
+        err("invalid email format")
+        return
+    if not str(password or "").strip():
+        err("password is required")
+        return
+    by_email = _index_by(rows, "email")
+    limit = _accounts_limit_total()
+    if limit > 0 and str(email).strip().casefold() not in by_email and len(by_email) >= limit:
+        err(f"accounts limit reached (limit={limit}, used={len(by_email)}, remaining=0)")
+        return
+    account = {"name": name, "email": email, "password": password, "enabled": enabled}
+    save_json(ACCOUNTS_FILE, _upsert_by(rows, "email", account))
+    invalidate_accounts_cache()
+    ok(f"added account: {email}")
+
+
+def remove_account(name: str | None, email: str | None) -> None:
+    n = str(name or "").strip()
+    e = str(email or "").strip()
+    rows = load_json(ACCOUNTS_FILE, [])
+    if not isinstance(rows, list):
+        err("accounts data is invalid in database")
+        return
+
+    if not n and not e:
+        valid_rows = [row for row in rows if isinstance(row, dict)]
+        if not valid_rows:
+            warn("no accounts found")
+            return
+        print("Choose account to remove:")
+        for idx, row in enumerate(valid_rows, start=1):
+            row_name = str(row.get("name", "")).strip() or "-"
+            row_email = str(row.get("email", "")).strip() or "-"
+            status = "enabled" if bool(row.get("enabled", True)) else "disabled"
+            print(f"{idx}) {row_name} | {row_email} | {status}")
+        picked = _ask("Account number to remove")
+        if not picked.isdigit():
+            err("invalid selection")
+            return
+        selected_index = int(picked)
+        if selected_index < 1 or selected_index > len(valid_rows):
+            err("invalid selection")
+            return
+        selected = valid_rows[selected_index - 1]
+        n = str(selected.get("name", "")).strip()
+        e = str(selected.get("email", "")).strip()
+
+    before = len(rows)
+    kept = []
+    for row in rows:
+        if not isinstance(row, dict):
+            kept.append(row)
+            continue
+        row_name = str(row.get("name", "")).strip()
+        row_email = str(row.get("email", "")).strip()
+        matched = False
+        if n and row_name == n:
+            matched = True
+        if e and row_email == e:
+            matched = True
+        if not matched:
+            kept.append(row)
+
+    removed = before - len(kept)
+    if removed <= 0:
+        warn("no matching account found")
+        return
+    save_json(ACCOUNTS_FILE, kept)
+    invalidate_accounts_cache()
+    ok(f"removed accounts: {removed}")
+
+
+def add_group(name: str, chat_id: str, enabled: bool) -> None:
+    rows = load_json(GROUPS_FILE, [])
+    if not isinstance(rows, list):
+        rows = []
+    if not _validate_chat_id(chat_id):
+        err("invalid chat_id format (expected: -100xxxxxxxxxx)")
+        return
+    group = {"name": name, "chat_id": str(chat_id), "enabled": enabled}
+    save_json(GROUPS_FILE, _upsert_by(rows, "chat_id", group))
+    ok(f"added group: {chat_id}")
+
+
+def list_accounts() -> None:
+    heading("Accounts")
+    rows = load_json(ACCOUNTS_FILE, [])
+    if not isinstance(rows, list) or not rows:
+        warn("no accounts found")
+        return
+    lines: list[str] = []
+    for idx, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            continue
+        name = str(row.get("name", "")).strip() or "-"
+        email = str(row.get("email", "")).strip() or "-"
+        status = "enabled" if bool(row.get("enabled", True)) else "disabled"
+        lines.append(f"{idx}. {name} | {email} | {status}")
+    _print_lines(lines)
+
+
+def list_groups() -> None:
+    heading("Groups")
+    rows = load_json(GROUPS_FILE, [])
+    if not isinstance(rows, list) or not rows:
+        warn("no groups found")
+        return
+    lines: list[str] = []
+    for idx, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            continue
+        name = str(row.get("name", "")).strip() or "-"
+        chat_id = str(row.get("chat_id", "")).strip() or "-"
+        status = "enabled" if bool(row.get("enabled", True)) else "disabled"
+        lines.append(f"{idx}. {name} | {chat_id} | {status}")
+    _print_lines(lines)
+
+
+def set_platform_emoji_id(key: str, emoji_id: str) -> None:
+    rows = load_json(PLATFORMS_FILE, [])
+    if not isinstance(rows, list):
+        rows = []
+    pos = _index_by(rows, "key").get(key.strip().casefold())
+    if pos is not None:
+        rows[pos]["emoji_id"] = emoji_id.strip()
+    else:
+        rows.append({
+            "key": key.strip().lower(),
+            "name_ar": key,
+            "name_en": key,
+            "short": key[:2].upper(),
+            "emoji": "",
+            "emoji_id": emoji_id.strip(),
+        })
+    save_json(PLATFORMS_FILE, rows)
+    ok(f"set emoji_id for platform '{key}'")
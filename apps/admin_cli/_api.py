@@ -0,0 +1,324 @@
+import atexit
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import orjson
+from apps.admin_cli._common import (
+    _parallel_map,
+    api_headers,
+    env_value,
+    err,
+    is_real_value,
+    load_active_accounts,
+    warn,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+TOKEN_TTL_SECONDS = 30 * 60
+TOKEN_REFRESH_SKEW_SECONDS = 5 * 60
+CLI_TOKEN_CACHE_FILE = Path.home() / ".cache" / "ivasms-otp" / "tokens.json"
+AUTH_FAILURE_STATUSES = frozenset({"status=401", "status=403"})
+_ENVELOPE_KEYS = ("data", "result")
+_TOKEN_KEYS = ("token", "access_token", "session_token", "api_token", "jwt")
+_BALANCE_KEYS = ("balance", "wallet", "credit", "amount")
+_SESSION: "requests.Session | None" = None
+_SESSION_LOCK = threading.Lock()
+# Login tokens reused for the whole run, keyed by _token_store_key: (token, time.monotonic() deadline).
+_TOKEN_CACHE: dict[str, tuple[str, float]] = {}
+_TOKEN_STORE_LOCK = threading.Lock()
+
+
+def _session() -> "requests.Session":
+    # One pooled keep-alive session for every API call instead of a new connection per request.
+    # requests (with urllib3/certifi) is the bulk of this module's import time, so it is only
+    # imported once a command actually talks to the API.
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=16,
+                    pool_maxsize=32,
+                    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                atexit.register(session.close)
+                _SESSION = session
+    return _SESSION
+
+
+def _extract_login_token(payload: object) -> str:
+    if not isinstance(payload, dict):
+        return ""
+    for src in (payload, payload.get("data"), payload.get("result")):
+        if not isinstance(src, dict):
+            continue
+        for key in _TOKEN_KEYS:
+            tok = str(src.get(key, "")).strip()
+            if tok:
+                return tok
+    return ""
+
+
+def api_login(api_base: str, email: str, password: str) -> tuple[str | None, str]:
+    url = f"{api_base.rstrip('/')}/api/v1/auth/login"
+    session = _session()
+    from requests import RequestException
+
+    try:
+        r = session.post(url, json={"email": email, "password": password}, headers=api_headers(), timeout=60)
+    except RequestException as exc:
+        return None, str(exc)
+    payload: object
+    try:
+        payload = r.json()
+    except ValueError:
+        payload = None
+    if r.status_code != 200:
+        err = ""
+        if isinstance(payload, dict):
+            err = str(payload.get("message") or payload.get("error") or payload.get("detail") or "").strip()
+        if not err:
+            err = (r.text or "").strip()
+        return None, f"status={r.status_code} {err}".strip()
+    token = _extract_login_token(payload)
+    if token:
+        return token, ""
+    return None, "login succeeded without token in response"
+
+
+def _is_auth_failure(error: str) -> bool:
+    return error.split(" ", 1)[0] in AUTH_FAILURE_STATUSES
+
+
+def _token_store_key(api_base: str, email: str) -> str:
+    # A token is only valid against the API that issued it.
+    return f"{api_base.rstrip('/')}|{email.strip().casefold()}"
+
+
+def _load_token_file() -> dict:
+    try:
+        data = orjson.loads(CLI_TOKEN_CACHE_FILE.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_token_file(data: dict) -> None:
+    # Private to the CLI (0600 in a 0700 dir); written to a temp file and renamed so a crash
+    # never leaves a truncated cache behind.
+    CLI_TOKEN_CACHE_FILE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".tokens.", suffix=".tmp", dir=CLI_TOKEN_CACHE_FILE.parent)
+    try:
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(orjson.dumps(data))
+        os.replace(tmp_name, CLI_TOKEN_CACHE_FILE)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _row_expires_at(row: object) -> int:
+    # A malformed or hand-edited row counts as already expired instead of breaking every command.
+    if not isinstance(row, dict):
+        return 0
+    try:
+        return int(row.get("expires_at", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _stored_token(api_base: str, email: str) -> tuple[str, int] | None:
+    row = _load_token_file().get(_token_store_key(api_base, email))
+    expires_at = _row_expires_at(row)
+    if expires_at <= int(time.time()) + TOKEN_REFRESH_SKEW_SECONDS:
+        return None
+    token = str(row.get("token", "")).strip()
+    if not token:
+        return None
+    return token, expires_at
+
+
+def _persist_token(api_base: str, account: dict, token: str) -> None:
+    # Saved so later CLI runs within the TTL can reuse it; expired rows are dropped on the way.
+    now = int(time.time())
+    with _TOKEN_STORE_LOCK:
+        data = {
+            key: row
+            for key, row in _load_token_file().items()
+            if _row_expires_at(row) > now
+        }
+        data[_token_store_key(api_base, account["email"])] = {
+            "token": token,
+            "obtained_at": now,
+            "expires_at": now + TOKEN_TTL_SECONDS,
+        }
+        try:
+            _write_token_file(data)
+        except OSError as exc:
+            warn(f"could not save token cache ({exc})")
+
+
+def _account_token(api_base: str, account: dict, refresh: bool = False) -> tuple[str | None, str]:
+    email = account["email"]
+    cache_key = _token_store_key(api_base, email)
+    if not refresh:
+        hit = _TOKEN_CACHE.get(cache_key)
+        if hit and time.monotonic() < hit[1]:
+            return hit[0], ""
+        stored = _stored_token(api_base, email)
+        if stored:
+            # Only the lifetime the token has left, so a long run never outlives its expires_at.
+            token, expires_at = stored
+            _TOKEN_CACHE[cache_key] = (token, time.monotonic() + (expires_at - time.time()))
+            return token, ""
+    _TOKEN_CACHE.pop(cache_key, None)
+    token, login_err = api_login(api_base, email, account["password"])
+    if token:
+        _TOKEN_CACHE[cache_key] = (token, time.monotonic() + TOKEN_TTL_SECONDS)
+        _persist_token(api_base, account, token)
+    return token, login_err
+
+
+def api_post(api_base: str, path: str, body: dict, timeout: int = 60) -> tuple[bool, object, str]:
+    url = f"{api_base.rstrip('/')}{path}"
+    session = _session()
+    from requests import RequestException
+
+    try:
+        r = session.post(url, json=body, headers=api_headers(), timeout=timeout)
+    except RequestException as exc:
+        return False, None, str(exc)
+    try:
+        payload: object = r.json()
+    except ValueError:
+        payload = {"raw": r.text}
+    if r.status_code != 200:
+        msg = ""
+        if isinstance(payload, dict):
+            msg = str(payload.get("message") or payload.get("error") or payload.get("detail") or "").strip()
+        if not msg:
+            msg = str(payload)
+        return False, payload, f"status={r.status_code} {msg}".strip()
+    return True, payload, ""
+
+
+def _api_post_as(
+    api_base: str, account: dict | None, token: str, path: str, body: dict, timeout: int = 60
+) -> tuple[bool, object, str]:
+    # Cached tokens can be revoked server-side: on 401/403 log in again once as the account that
+    # owns the token and retry. account is None for the API_SESSION_TOKEN fallback.
+    result = api_post(api_base, path, {"token": token, **body}, timeout=timeout)
+    if result[0] or account is None or not _is_auth_failure(result[2]):
+        return result
+    new_token, _login_err = _account_token(api_base, account, refresh=True)
+    if not new_token:
+        return result
+    return api_post(api_base, path, {"token": new_token, **body}, timeout=timeout)
+
+
+def _balance_field(src: dict) -> float | None:
+    for key in _BALANCE_KEYS:
+        val = src.get(key)
+        if isinstance(val, (int, float)):
+            return float(val)
+        if isinstance(val, str):
+            try:
+                return float(val.strip())
+            except Exception:
+                pass
+    return None
+
+
+def _extract_balance_value(payload: object) -> float | None:
+    # The API wraps its body in at most one data/result envelope (see _extract_data).
+    if isinstance(payload, (int, float)):
+        return float(payload)
+    if not isinstance(payload, dict):
+        return None
+    got = _balance_field(payload)
+    if got is not None:
+        return got
+    for key in _ENVELOPE_KEYS:
+        nested = payload.get(key)
+        if isinstance(nested, (int, float)):
+            return float(nested)
+        if isinstance(nested, dict):
+            got = _balance_field(nested)
+            if got is not None:
+                return got
+    return None
+
+
+def fetch_account_balance(api_base: str, token: str) -> tuple[float | None, str, str]:
+    ok, payload, err = api_post(api_base, "/api/v1/balance", {"token": token}, timeout=40)
+    if not ok:
+        return None, "/api/v1/balance", err
+    balance = _extract_balance_value(payload)
+    if balance is None:
+        return None, "/api/v1/balance", "response missing balance value"
+    return balance, "/api/v1/balance", ""
+
+
+def _extract_data(payload: object) -> object:
+    if isinstance(payload, dict):
+        for key in _ENVELOPE_KEYS:
+            if key in payload:
+                return payload[key]
+    return payload
+
+
+def _extract_list_payload(payload: object) -> list:
+    data = _extract_data(payload)
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in ("items", "rows", "numbers", "applications", "apps", "services"):
+            value = data.get(key)
+            if isinstance(value, list):
+                return value
+    return []
+
+
+def _call_targets(api_base: str, call: Callable[[dict | None, str], tuple]) -> list[tuple[str, tuple]]:
+    # Each worker logs in and immediately issues its request, so a slow login never holds back
+    # the other accounts' calls. Returns (name, call result) for every target that got a token.
+    def _login_and_call(acc: dict) -> tuple[str | None, str, tuple | None]:
+        token, login_err = _account_token(api_base, acc)
+        if not token:
+            return None, login_err, None
+        return token, "", call(acc, token)
+
+    accounts = load_active_accounts()
+    results: list[tuple[str, tuple]] = []
+    for acc, (token, login_err, result) in zip(accounts, _parallel_map(_login_and_call, accounts)):
+        if not token:
+            err(f"{acc['name']}: login failed ({login_err})")
+            continue
+        results.append((acc["name"], result))
+
+    if results:
+        return results
+
+    env_token = env_value("API_SESSION_TOKEN")
+    if is_real_value(env_token):
+        return [("session", call(None, env_token))]
+
+    err("no valid account/session token found")
+    return results
@@ -0,0 +1,269 @@
+import functools
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+# Not worth deferring: sqlite3 (via app.storage) imports datetime on every run anyway.
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterable
+
+from dotenv import load_dotenv
+from app.paths import ACCOUNTS_FILE, BASE_DIR
+from app.storage import (
+    json_revision,
+    load_json as db_load_json,
+    save_json as db_save_json,
+)
+
+PLACEHOLDER_VALUES = frozenset(
+    {
+        "https://your-api-domain.example.com",
+        "123456789:EXAMPLE_BOT_TOKEN",
+        "-1001234567890",
+        "YOUR_PASSWORD",
+    }
+)
+PLACEHOLDER_RE = re.compile(r"example|your-api-domain|your_password", re.IGNORECASE)
+# Surrounding whitespace is tolerated by the patterns themselves, so callers need not strip().
+EMAIL_RE = re.compile(r"^\s*[^@\s]+@[^@\s]+\.[^@\s]+\s*$")
+CHAT_ID_RE = re.compile(r"^\s*-100\d{6,}\s*$")
+DAY_RE = re.compile(r"^(\d{4})-(\d+)-(\d+)$")
+_email_match = EMAIL_RE.match
+_chat_id_match = CHAT_ID_RE.match
+_day_match = DAY_RE.match
+USE_COLOR = sys.stdout.isatty()
+RESET = "\033[0m"
+BOLD = "\033[1m"
+GREEN = "\033[32m"
+YELLOW = "\033[33m"
+RED = "\033[31m"
+CYAN = "\033[36m"
+API_WORKERS = 8
+DEFAULT_API_BASE = "http://127.0.0.1:8000"
+
+
+def ok(msg: str) -> None:
+    prefix = f"{GREEN}[OK]{RESET}" if USE_COLOR else "[OK]"
+    print(f"{prefix} {msg}")
+
+
+def err(msg: str) -> None:
+    prefix = f"{RED}[ERR]{RESET}" if USE_COLOR else "[ERR]"
+    print(f"{prefix} {msg}")
+
+
+def warn(msg: str) -> None:
+    prefix = f"{YELLOW}[WARN]{RESET}" if USE_COLOR else "[WARN]"
+    print(f"{prefix} {msg}")
+
+
+def _print_lines(lines: list[str]) -> None:
+    # One write for a whole listing instead of a print() (and possible flush) per row.
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def heading(msg: str) -> None:
+    title = f"{BOLD}{CYAN}{msg}{RESET}" if USE_COLOR else msg
+    print(f"\n=== {title} ===")
+
+
+def _parallel_map(fn: Callable, items: Iterable, workers: int = API_WORKERS) -> list:
+    # Results come back in input order so command output stays deterministic.
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as pool:
+        return list(pool.map(fn, items))
+
+
+def load_json(path: Path, fallback):
+    return db_load_json(path, fallback)
+
+
+def save_json(path: Path, data) -> None:
+    db_save_json(path, data)
+
+
+def _now_str() -> str:
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+def _validate_email(value: str) -> bool:
+    return value is not None and bool(_email_match(value))
+
+
+def _validate_chat_id(value: str) -> bool:
+    return value is not None and bool(_chat_id_match(str(value)))
+
+
+def _validate_day(value: str) -> bool:
+    m = _day_match(str(value or "").strip())
+    if not m:
+        return False
+    try:
+        date(int(m[1]), int(m[2]), int(m[3]))
+    except ValueError:
+        return False
+    return True
+
+
+def _validate_request_count(value: int) -> tuple[bool, str]:
+    if value < 50:
+        return False, "count must be >= 50"
+    if value > 1000:
+        return False, "count must be <= 1000"
+    if value % 50 != 0:
+        return False, "count must be a multiple of 50"
+    return True, ""
+
+
+def _range_limit_total() -> int:
+    raw = env_value("RANGE_MAX_TOTAL", "1000")
+    try:
+        value = int(raw)
+    except Exception:
+        value = 1000
+    return max(50, value)
+
+
+def _accounts_limit_total() -> int:
+    raw = str(os.getenv("BOT_ACCOUNTS_LIMIT", "")).strip()
+    if not raw:
+        return 0
+    try:
+        value = int(raw)
+    except Exception:
+        return 0
+    return max(0, value)
+
+
+def is_real_value(value: str | None) -> bool:
+    v = str(value or "").strip()
+    if not v:
+        return False
+    if v in PLACEHOLDER_VALUES:
+        return False
+    if PLACEHOLDER_RE.search(v):
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=64)
+def env_value(key: str, fallback: str = "") -> str:
+    raw = os.getenv(key, "").strip()
+    if is_real_value(raw):
+        return raw
+    return fallback.strip()
+
+
+@functools.lru_cache(maxsize=1)
+def api_key_value() -> str:
+    return env_value("API_KEY", "")
+
+
+@functools.lru_cache(maxsize=1)
+def api_headers() -> dict[str, str]:
+    key = api_key_value()
+    if not key:
+        return {}
+    return {"X-API-Key": key}
+
+
+def _invalidate_env_cache() -> None:
+    # Call after anything that changes os.environ (e.g. load_dotenv).
+    env_value.cache_clear()
+    api_key_value.cache_clear()
+    api_headers.cache_clear()
+    _default_api_base.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _dotenv_loaded() -> bool:
+    # .env is read once per process, whichever entry point gets there first.
+    load_dotenv(BASE_DIR / ".env")
+    _invalidate_env_cache()
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _default_api_base() -> str:
+    _dotenv_loaded()
+    return env_value("API_BASE_URL", DEFAULT_API_BASE)
+
+
+_ACCOUNTS_CACHE: tuple[object, list[dict]] | None = None
+
+
+def invalidate_accounts_cache() -> None:
+    global _ACCOUNTS_CACHE
+    _ACCOUNTS_CACHE = None
+
+
+def load_active_accounts() -> list[dict]:
+    global _ACCOUNTS_CACHE
+    revision = json_revision(ACCOUNTS_FILE)
+    if _ACCOUNTS_CACHE is not None and _ACCOUNTS_CACHE[0] == revision:
+        return list(_ACCOUNTS_CACHE[1])
+    out = _read_active_accounts()
+    _ACCOUNTS_CACHE = (revision, out)
+    return list(out)
+
+
+def _read_active_accounts() -> list[dict]:
+    rows = load_json(ACCOUNTS_FILE, [])
+    out: list[dict] = []
+    if not isinstance(rows, list):
+        return out
+    strip = str.strip
+    append = out.append
+    for row in rows:
+        if not isinstance(row, dict) or not row.get("enabled", True):
+            continue
+        get = row.get
+        email = strip(str(get("email") or ""))
+        password = strip(str(get("password") or ""))
+        if not (email and password):
+            continue
+        append({"name": strip(str(get("name") or email)) or email, "email": email, "password": password})
+    return out
+
+
+def _row_key(row: object, field: str) -> str:
+    return str(row.get(field, "") or "").strip().casefold() if isinstance(row, dict) else ""
+
+
+def _index_by(rows: list, field: str) -> dict[str, int]:
+    # Normalized identifier -> position of the first row carrying it; rows without one are skipped.
+    # Positions (not rows) let callers replace the match in place and keep every other row where it is.
+    index: dict[str, int] = {}
+    for pos, row in enumerate(rows):
+        key = _row_key(row, field)
+        if key:
+            index.setdefault(key, pos)
+    return index
+
+
+def _upsert_by(rows: list, field: str, new_row: dict) -> list:
+    # Every row sharing new_row's identifier collapses onto new_row at the first one's position,
+    # as a dict keyed by the identifier would; a new identifier is appended.
+    key = _row_key(new_row, field)
+    out: list = []
+    placed = False
+    for row in rows:
+        if _row_key(row, field) != key:
+            out.append(row)
+        elif not placed:
+            out.append(new_row)
+            placed = True
+    if not placed:
+        out.append(new_row)
+    return out
+
+
+def _ask(prompt: str, default: str | None = None) -> str:
+    if default is None:
+        return input(f"{prompt}: ").strip()
+    value = input(f"{prompt} [{default}]: ").strip()
+    return value or default
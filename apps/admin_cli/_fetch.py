@@ -0,0 +1,127 @@
+from app.paths import RANGES_STORE_FILE
+from apps.admin_cli._api import _api_post_as, _call_targets, _extract_list_payload
+from apps.admin_cli._common import _print_lines, err, heading, ok
+from apps.admin_cli._ranges import (
+    _extract_number_and_range,
+    load_ranges_store,
+    save_ranges_store,
+    update_ranges_store_from_numbers,
+)
+
+
+def fetch_numbers_command(api_base: str, update_store: bool = True) -> list[dict]:
+    responses = _call_targets(
+        api_base,
+        lambda acc, token: _api_post_as(api_base, acc, token, "/api/v1/numbers/announce", {}, timeout=120),
+    )
+    if not responses:
+        return []
+    heading("Fetch Numbers")
+    all_rows: list[dict] = []
+    for name, (ok_req, payload, req_err) in responses:
+        if not ok_req:
+            err(f"{name}: fetch numbers failed ({req_err})")
+            continue
+        rows = _extract_list_payload(payload)
+        all_rows.extend([r for r in rows if isinstance(r, dict)])
+        if rows:
+            ok(f"{name}: numbers count={len(rows)}")
+            lines: list[str] = []
+            for idx, row in enumerate(rows[:10], start=1):
+                if isinstance(row, dict):
+                    number, range_name = _extract_number_and_range(row)
+                    app = str(row.get("app_name") or row.get("service_name") or row.get("app") or "-").strip()
+                    printable = number or str(row.get("id") or "-").strip()
+                    lines.append(f"  {idx}. {printable} | {app} | {range_name}")
+                else:
+                    lines.append(f"  {idx}. {row}")
+            if len(rows) > 10:
+                lines.append(f"  ... +{len(rows) - 10} more")
+            _print_lines(lines)
+        else:
+            msg = ""
+            if isinstance(payload, dict):
+                msg = str(payload.get("message") or payload.get("status") or "").strip()
+            ok(f"{name}: no numbers ({msg or 'empty response'})")
+    if update_store and all_rows:
+        store = load_ranges_store()
+        if update_ranges_store_from_numbers(store, all_rows):
+            save_ranges_store(store)
+            ok(f"ranges store updated from numbers: {RANGES_STORE_FILE.name}")
+        else:
+            ok(f"ranges store unchanged: {RANGES_STORE_FILE.name}")
+    return all_rows
+
+
+def fetch_traffic_command(api_base: str, app_name: str) -> None:
+    app = str(app_name or "WhatsApp").strip() or "WhatsApp"
+    responses = _call_targets(
+        api_base,
+        lambda acc, token: _api_post_as(
+            api_base,
+            acc,
+            token,
+            "/api/v1/traffic/services",
+            {"app_name": app},
+            timeout=120,
+        ),
+    )
+    if not responses:
+        return
+    heading(f"Fetch Traffic | app={app}")
+    for name, (ok_req, payload, req_err) in responses:
+        if not ok_req:
+            err(f"{name}: fetch traffic failed ({req_err})")
+            continue
+        rows = _extract_list_payload(payload)
+        if rows:
+            ok(f"{name}: traffic rows={len(rows)} for {app}")
+            lines: list[str] = []
+            for idx, row in enumerate(rows[:20], start=1):
+                if isinstance(row, dict):
+                    rname = str(row.get("range") or row.get("range_name") or "UNKNOWN").strip()
+                    cnt = str(row.get("count") or row.get("total") or row.get("messages") or "0").strip()
+                    last = str(row.get("last_message_time") or row.get("updated_at") or "-").strip()
+                    lines.append(f"  {idx}. {rname} | count={cnt} | last={last}")
+                else:
+                    lines.append(f"  {idx}. {row}")
+            if len(rows) > 20:
+                lines.append(f"  ... +{len(rows) - 20} more")
+            _print_lines(lines)
+        else:
+            msg = ""
+            if isinstance(payload, dict):
+                msg = str(payload.get("message") or payload.get("status") or "").strip()
+            ok(f"{name}: no traffic data ({msg or 'empty response'})")
+
+
+def fetch_platforms_command(api_base: str) -> None:
+    responses = _call_targets(
+        api_base,
+        lambda acc, token: _api_post_as(api_base, acc, token, "/api/v1/applications/available", {}, timeout=90),
+    )
+    if not responses:
+        return
+    heading("Fetch Platforms")
+    for name, (ok_req, payload, req_err) in responses:
+        if not ok_req:
+            err(f"{name}: fetch platforms failed ({req_err})")
+            continue
+        rows = _extract_list_payload(payload)
+        if rows:
+            ok(f"{name}: platforms count={len(rows)}")
+            lines: list[str] = []
+            for idx, row in enumerate(rows[:30], start=1):
+                if isinstance(row, dict):
+                    pname = str(row.get("name") or row.get("app_name") or row.get("key") or row.get("service_name") or row).strip()
+                else:
+                    pname = str(row)
+                lines.append(f"  {idx}. {pname}")
+            if len(rows) > 30:
+                lines.append(f"  ... +{len(rows) - 30} more")
+            _print_lines(lines)
+        else:
+            msg = ""
+            if isinstance(payload, dict):
+                msg = str(payload.get("message") or payload.get("status") or "").strip()
+            ok(f"{name}: no platforms data ({msg or 'empty response'})")
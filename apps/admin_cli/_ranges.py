@@ -0,0 +1,228 @@
+import heapq
+import time
+
+from app.paths import RANGES_STORE_FILE
+from apps.admin_cli._api import _api_post_as, _call_targets
+from apps.admin_cli._common import (
+    _now_str,
+    _print_lines,
+    _range_limit_total,
+    _validate_request_count,
+    err,
+    heading,
+    load_json,
+    ok,
+    save_json,
+    warn,
+)
+
+
+def load_ranges_store() -> dict:
+    data = load_json(RANGES_STORE_FILE, {})
+    if not isinstance(data, dict):
+        data = {}
+    if not isinstance(data.get("ranges"), dict):
+        data["ranges"] = {}
+    if not isinstance(data.get("meta"), dict):
+        data["meta"] = {}
+    return data
+
+
+def save_ranges_store(store: dict) -> None:
+    store["meta"] = {
+        **(store.get("meta") if isinstance(store.get("meta"), dict) else {}),
+        "updated_at": _now_str(),
+    }
+    save_json(RANGES_STORE_FILE, store)
+
+
+def _new_range_entry() -> dict:
+    return {
+        "requested_total": 0,
+        "last_requested_at": "",
+        "available_numbers_count": 0,
+        "last_numbers_sync_at": "",
+        "sample_numbers": [],
+        "accounts": {},
+    }
+
+
+def _range_entry(store: dict, range_name: str) -> dict:
+    ranges = store.setdefault("ranges", {})
+    entry = ranges.get(range_name)
+    if not isinstance(entry, dict):
+        entry = ranges[range_name] = _new_range_entry()
+    return entry
+
+
+def record_range_request(store: dict, range_name: str, account_name: str, requested_numbers: int) -> None:
+    now = _now_str()
+    entry = _range_entry(store, range_name)
+    entry["requested_total"] = int(entry.get("requested_total", 0)) + int(requested_numbers)
+    entry["last_requested_at"] = now
+    accounts = entry.get("accounts")
+    if not isinstance(accounts, dict):
+        accounts = {}
+        entry["accounts"] = accounts
+    row = accounts.get(account_name) if isinstance(accounts.get(account_name), dict) else {}
+    row["requested_total"] = int(row.get("requested_total", 0)) + int(requested_numbers)
+    row["last_requested_at"] = now
+    accounts[account_name] = row
+
+
+def _extract_number_and_range(row: dict) -> tuple[str, str]:
+    number = str(row.get("number") or row.get("phone") or row.get("msisdn") or row.get("mobile") or "").strip()
+    range_name = str(row.get("range") or row.get("range_name") or row.get("termination") or "UNKNOWN").strip() or "UNKNOWN"
+    return number, range_name
+
+
+def update_ranges_store_from_numbers(store: dict, rows: list[dict]) -> bool:
+    # range_name -> [row_count, unique numbers], filled in a single pass.
+    # Field lookups from _extract_number_and_range are inlined: this loop runs once per fetched number.
+    grouped: dict[str, list] = {}
+
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        get = row.get
+        number = str(get("number") or get("phone") or get("msisdn") or get("mobile") or "").strip()
+        range_name = str(get("range") or get("range_name") or get("termination") or "UNKNOWN").strip() or "UNKNOWN"
+        group = grouped.get(range_name)
+        if group is None:
+            group = grouped[range_name] = [0, set()]
+        group[0] += 1
+        if number:
+            group[1].add(number)
+
+    # A range is only touched (and its sync stamp moved) when its count or sample changes.
+    # Returns whether anything changed, so an idle sync tick can skip the write entirely.
+    now = _now_str()
+    changed = False
+    ranges_root = store.setdefault("ranges", {})
+    for range_name, (row_count, numbers_set) in grouped.items():
+        entry = ranges_root.get(range_name)
+        if not isinstance(entry, dict):
+            entry = ranges_root[range_name] = _new_range_entry()
+        count = len(numbers_set) if numbers_set else row_count
+        sample = heapq.nsmallest(20, numbers_set) if numbers_set else entry.get("sample_numbers")
+        if entry.get("available_numbers_count") == count and entry.get("sample_numbers") == sample:
+            continue
+        entry["available_numbers_count"] = count
+        entry["sample_numbers"] = sample
+        entry["last_numbers_sync_at"] = now
+        changed = True
+    return changed
+
+
+def add_range_command(api_base: str, range_name: str, count: int) -> None:
+    value = str(range_name or "").strip()
+    if not value:
+        err("range name is required")
+        return
+    valid_count, count_err = _validate_request_count(int(count))
+    if not valid_count:
+        err(count_err)
+        return
+    store = load_ranges_store()
+    entry = _range_entry(store, value)
+    max_total = _range_limit_total()
+    already_requested = int(entry.get("requested_total", 0) or 0)
+    remaining = max_total - already_requested
+    if remaining <= 0:
+        err(f"range '{value}' reached limit ({max_total}). no remaining numbers.")
+        return
+    if remaining < 50:
+        err(f"range '{value}' remaining from limit: {remaining}. minimum request is 50.")
+        return
+    if count > remaining:
+        allowed = remaining - (remaining % 50)
+        if allowed < 50:
+            err(f"range '{value}' remaining from limit: {remaining}. minimum request is 50.")
+        else:
+            err(f"requested {count} exceeds remaining {remaining}. max allowed now is {allowed}.")
+        return
+
+    # API v3 supports direct total count in one request.
+    responses = _call_targets(
+        api_base,
+        lambda acc, token: _api_post_as(
+            api_base,
+            acc,
+            token,
+            "/api/v1/order/range",
+            {"range_name": value, "count": count},
+            timeout=90,
+        ),
+    )
+    if not responses:
+        return
+    heading(f"Add Range | {value} | count={count}")
+    ok(f"limit={max_total} | already={already_requested} | remaining={remaining}")
+    for name, (ok_req, payload, req_err) in responses:
+        success_count = 0
+        last_err = ""
+        if ok_req:
+            success_count = count
+            msg = str((payload.get("message") if isinstance(payload, dict) else "") or "request submitted").strip()
+            ok(f"{name}: request done ({msg})")
+        else:
+            last_err = req_err
+            err(f"{name}: request failed ({req_err})")
+
+        requested_numbers = success_count
+        if success_count == count:
+            ok(f"{name}: requested {requested_numbers}/{count} numbers for range '{value}'")
+            record_range_request(store, value, name, requested_numbers)
+        else:
+            err(
+                f"{name}: partial success {requested_numbers}/{count} for range '{value}'"
+                + (f" | last_error={last_err}" if last_err else "")
+            )
+            if requested_numbers > 0:
+                record_range_request(store, value, name, requested_numbers)
+    save_ranges_store(store)
+    updated = _range_entry(store, value)
+    new_remaining = max_total - int(updated.get("requested_total", 0) or 0)
+    ok(f"ranges store updated: {RANGES_STORE_FILE.name} | remaining from limit={max(0, new_remaining)}")
+
+
+def show_ranges_store_command() -> None:
+    store = load_ranges_store()
+    ranges = store.get("ranges") if isinstance(store.get("ranges"), dict) else {}
+    heading("Ranges Store")
+    if not ranges:
+        warn("no ranges data yet")
+        return
+    # Keys come from a JSON object, so they are always str.
+    rows = sorted(ranges.items(), key=lambda kv: kv[0].lower())
+    lines: list[str] = []
+    for idx, (range_name, entry) in enumerate(rows, start=1):
+        if not isinstance(entry, dict):
+            continue
+        req_total = int(entry.get("requested_total", 0) or 0)
+        available = int(entry.get("available_numbers_count", 0) or 0)
+        last_req = str(entry.get("last_requested_at", "")).strip() or "-"
+        last_sync = str(entry.get("last_numbers_sync_at", "")).strip() or "-"
+        lines.append(f"{idx}. {range_name} | requested={req_total} | available={available} | req_at={last_req} | sync_at={last_sync}")
+    _print_lines(lines)
+
+
+def sync_ranges_command(api_base: str, interval_minutes: int, once: bool) -> None:
+    if interval_minutes < 1:
+        err("interval-minutes must be >= 1")
+        return
+    from apps.admin_cli._fetch import fetch_numbers_command
+
+    heading("Range Sync")
+    ok(f"store file: {RANGES_STORE_FILE}")
+    ok(f"interval: {interval_minutes} minute(s)")
+    while True:
+        started = _now_str()
+        ok(f"sync started at {started}")
+        rows = fetch_numbers_command(api_base, update_store=True)
+        ok(f"sync completed | rows={len(rows)} | at={_now_str()}")
+        if once:
+            return
+        sleep_seconds = interval_minutes * 60
+        ok(f"sleeping {sleep_seconds} seconds")
+        time.sleep(sleep_seconds)
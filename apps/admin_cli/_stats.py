@@ -0,0 +1,173 @@
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+from app.paths import DAILY_STORE_DIR, STORE_FILE
+from app.storage import (
+    clear_daily_store,
+    delete_daily_store,
+    get_daily_store,
+    list_daily_store_days,
+)
+from apps.admin_cli._api import _account_token, _is_auth_failure, fetch_account_balance
+from apps.admin_cli._common import (
+    _parallel_map,
+    _print_lines,
+    _validate_day,
+    err,
+    heading,
+    load_active_accounts,
+    ok,
+    save_json,
+    warn,
+)
+
+
+def _daily_store_file(day_key: str) -> Path:
+    return DAILY_STORE_DIR / f"messages_{day_key}.json"
+
+
+def _daily_sent_list(day_key: str) -> list:
+    data = get_daily_store(day_key, {})
+    if not isinstance(data, dict):
+        return []
+    sent = data.get("sent")
+    return sent if isinstance(sent, list) else []
+
+
+def _load_daily_sent_rows(day_key: str) -> list[dict]:
+    return [row for row in _daily_sent_list(day_key) if isinstance(row, dict)]
+
+
+def stats_command(day: str | None, all_days: bool) -> None:
+    heading("Stats")
+    day_keys: list[str] = []
+    if all_days:
+        day_keys = sorted(list_daily_store_days())
+    else:
+        day_key = (day or date.today().isoformat()).strip()
+        if not _validate_day(day_key):
+            err("invalid day format, expected YYYY-MM-DD")
+            return
+        day_keys = [day_key]
+
+    by_service: dict[str, int] = defaultdict(int)
+    by_group: dict[str, int] = defaultdict(int)
+    unique_numbers: set[str] = set()
+    total_revenue = 0.0
+    revenue_count = 0
+    delivery_count = 0
+    sent_count = 0
+    used_days: list[str] = []
+
+    # Aggregate one day at a time straight off the parsed payload; no filtered copy or per-row objects.
+    for day_key in day_keys:
+        try:
+            rows = _daily_sent_list(day_key)
+        except Exception:
+            continue
+        day_count = 0
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            day_count += 1
+            service = str(row.get("service_name", "unknown")).strip() or "unknown"
+            by_service[service] += 1
+            number = str(row.get("number", "")).strip()
+            if number:
+                unique_numbers.add(number)
+
+            revenue = row.get("revenue")
+            if isinstance(revenue, (int, float)):
+                total_revenue += float(revenue)
+                revenue_count += 1
+            elif isinstance(revenue, str):
+                try:
+                    total_revenue += float(revenue.strip())
+                    revenue_count += 1
+                except Exception:
+                    pass
+
+            groups = row.get("groups")
+            if isinstance(groups, list):
+                for g in groups:
+                    if isinstance(g, dict):
+                        gname = str(g.get("group") or g.get("chat_id") or "unknown").strip()
+                        by_group[gname] += 1
+                        delivery_count += 1
+        if day_count:
+            used_days.append(day_key)
+            sent_count += day_count
+
+    if not sent_count:
+        warn("no sent messages found for selected range")
+        return
+
+    top_group = "-"
+    if by_group:
+        top_group = max(by_group.items(), key=lambda kv: kv[1])[0]
+
+    if len(used_days) == 1:
+        day_label = used_days[0]
+    elif used_days:
+        day_label = f"{used_days[0]} -> {used_days[-1]}"
+    else:
+        day_label = (day or date.today().isoformat()).strip()
+
+    _print_lines(
+        [
+            f"اليوم: {day_label}",
+            f"اتبعت: {sent_count} رسالة",
+            f"وصلت: {delivery_count} مرة",
+            f"الجروب الأساسي: {top_group}",
+            f"إجمالي الربح: {round(total_revenue, 4)}",
+        ]
+    )
+
+
+def balances_command(api_base: str) -> None:
+    heading("Balances")
+    accounts = load_active_accounts()
+    if not accounts:
+        err("no enabled accounts found in database")
+        return
+
+    def _account_balance(acc: dict) -> tuple[str | None, str, float | None, str]:
+        token, login_err = _account_token(api_base, acc)
+        if not token:
+            return None, login_err, None, ""
+        balance, _endpoint, bal_err = fetch_account_balance(api_base, token)
+        if balance is None and _is_auth_failure(bal_err):
+            token, login_err = _account_token(api_base, acc, refresh=True)
+            if not token:
+                return None, login_err, None, ""
+            balance, _endpoint, bal_err = fetch_account_balance(api_base, token)
+        return token, "", balance, bal_err
+
+    for acc, (token, login_err, balance, bal_err) in zip(accounts, _parallel_map(_account_balance, accounts)):
+        name = acc["name"]
+        if not token:
+            err(f"{name}: login failed ({login_err})")
+            continue
+        if balance is None:
+            err(f"{name}: balance fetch failed ({bal_err})")
+            continue
+        ok(f"{name}: {balance}")
+
+
+def clear_store(start_date: str | None) -> None:
+    if start_date:
+        if not _validate_day(start_date):
+            err("invalid start date, expected YYYY-MM-DD")
+            return
+        rows = _load_daily_sent_rows(start_date)
+        if rows:
+            delete_daily_store(start_date)
+            ok(f"cleared daily store for day={start_date}")
+        else:
+            warn(f"no daily store found for day={start_date}")
+        return
+
+    clear_daily_store()
+    save_json(STORE_FILE, {"by_start_date": {}})
+    ok("cleared all stored messages")
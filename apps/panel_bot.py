@@ -1,18 +1,26 @@
-import json
+import functools
+import io
 import os
+import queue
 import re
 import sqlite3
 import time
 import threading
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
-from collections import defaultdict
+import heapq
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from collections import OrderedDict, defaultdict, deque
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from app.paths import (
     ACCOUNTS_FILE,
     BASE_DIR,
@@ -25,7 +33,7 @@ from app.paths import (
     RUNTIME_CONFIG_FILE,
 )
 from app.storage import clear_daily_store, get_daily_store, list_daily_store_days
-from app.storage import load_json as db_load_json, save_json as db_save_json
+from app.storage import json_revision, load_json as db_load_json, save_json as db_save_json
 
 
 MAIN_TITLE = "༺═══⇓ لوحة التحكم ⇓═══༻"
@@ -39,6 +47,70 @@ MESSAGES_TITLE = "༺═════⇓ الرسائل ⇓═════༻"
 TOKEN_KEYS = ("token", "access_token", "session_token", "api_token", "jwt")
 DEFAULT_ADMIN_IDS = {7011309417}
 PRIMARY_ADMIN_ID = 7011309417
+# Upper bound on how long a parsed runtime config is reused before it is re-read from the store.
+RUNTIME_CFG_TTL_SECONDS = 2.0
+HTTP_POOL_CONNECTIONS = 16
+HTTP_POOL_MAXSIZE = 32
+# getUpdates long-poll window; PANEL_POLL_TIMEOUT=0 switches to short polling every poll_interval.
+DEFAULT_POLL_TIMEOUT = 25
+POLL_HTTP_GRACE_SECONDS = 5
+ALLOWED_UPDATES = ["message", "callback_query"]
+ADMIN_IDS_SPLIT_RE = re.compile(r"[,\s]+")
+DAY_RE = re.compile(r"(\d{4})-(\d+)-(\d+)")
+# Chat ids and @usernames pass through as-is; otherwise capture the path after the first "t.me/".
+GROUP_TARGET_RE = re.compile(r"(?P<keep>-100\d*\Z|@)|.*?t\.me/(?P<tme>[^?]*)", re.DOTALL)
+MD_ESCAPE_TABLE = str.maketrans({ch: f"\\{ch}" for ch in "\\*_`["})
+HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+# Menu layout repeats rows of 1, 2, 2, 2, 1 buttons; slice bounds within one 8-button cycle.
+PATTERN_CYCLE = 8
+PATTERN_SLICES = ((0, 1), (1, 3), (3, 5), (5, 7), (7, 8))
+BLOCK_PREFIX = "__BLOCK__ "
+BLOCK_PREFIX_LEN = len(BLOCK_PREFIX)
+# Telegram flood limits: ~30 messages/s per bot and about one per second per chat.
+SEND_GLOBAL_PER_SECOND = 30
+SEND_CHAT_INTERVAL_SECONDS = 1.0
+SEND_MAX_ATTEMPTS = 3
+BROADCAST_WORKERS = 6
+FETCH_WORKERS = 8
+# Field aliases the API uses across versions, in lookup order.
+PLATFORM_LABEL_KEYS = ("name", "app_name", "key", "service_name")
+RANGE_KEYS = ("range", "range_name", "termination")
+NUMBER_KEYS = ("number", "phone", "msisdn", "mobile")
+NUMBER_ID_KEYS = ("id", "number_id", "uid")
+COUNT_KEYS = ("count", "total", "messages")
+LAST_SEEN_KEYS = ("last_message_time", "updated_at", "last")
+# Kept well under the API session lifetime; a 401/403 drops the token early and the call is retried.
+TOKEN_CACHE_TTL_SECONDS = 300
+TOKEN_OWNERS_MAX = 256
+AUTH_FAILURE_STATUSES = (401, 403)
+
+# UI phrases shared by many screens, looked up by key instead of repeating both literals.
+I18N: dict[str, dict[str, str]] = {
+    "ar": {
+        "back": "رجوع",
+        "not_allowed": "غير متاح.",
+        "choose_action": "اختر العملية.",
+        "export_title": "༺═════⇓ تصدير الارقام ⇓═════༻",
+        "prev": "⬅️ السابق",
+        "next": "التالي ➡️",
+        "admins_title": "༺═════⇓ إدارة الأدمن ⇓═════༻",
+        "bots_title": "༺═════⇓ إدارة البوتات ⇓═════༻",
+        "task_running": "هذه المهمة قيد التنفيذ بالفعل.",
+        "bot_not_found": "البوت غير موجود.",
+    },
+    "en": {
+        "back": "Back",
+        "not_allowed": "Not allowed.",
+        "choose_action": "Choose an action.",
+        "export_title": "༺═════⇓ Export Numbers ⇓═════༻",
+        "prev": "⬅️ Prev",
+        "next": "Next ➡️",
+        "admins_title": "༺═════⇓ Admin Management ⇓═════༻",
+        "bots_title": "༺═════⇓ Bots Management ⇓═════༻",
+        "task_running": "This task is already running.",
+        "bot_not_found": "Bot not found.",
+    },
+}
 
 DEFAULT_SERVICES: list[dict[str, str]] = [
     {"key": "whatsapp", "short": "WA", "emoji": "✨", "emoji_id": ""},
@@ -94,27 +166,155 @@ DEFAULT_COUNTRIES: list[dict[str, str]] = [
 ]
 
 
+@dataclass(slots=True)
+class UserSession:
+    # Everything the panel keeps per Telegram user, in one object instead of parallel dicts.
+    state: dict[str, Any] | None = None
+    platforms: list[str] | None = None
+    traffic: dict[str, list[dict[str, str]]] = field(default_factory=dict)
+    numbers: dict[str, list[dict[str, str]]] = field(default_factory=dict)
+    numbers_view_account: str | None = None
+    view_rev: int = 0
+    lang: str = ""
+    # Derived from lang once per change; _tr reads it for every label on every render.
+    is_ar: bool = False
+
+    def set_lang(self, lang: str) -> None:
+        self.lang = lang
+        self.is_ar = lang.startswith("ar")
+
+
+@dataclass(slots=True)
+class TTLEntry:
+    at: float
+    data: Any
+
+
+@dataclass(slots=True)
+class SendJob:
+    chat_id: int | str
+    send: Callable[[], dict[str, Any]]
+    attempts: int = 0
+    done: Future = field(default_factory=Future)
+
+
+def _parse_ids(values: Iterable[Any]) -> list[int]:
+    # Digit-only entries as ints, in first-seen order with duplicates dropped.
+    return list(dict.fromkeys(int(s) for s in (str(v).strip() for v in values) if s.isdigit()))
+
+
+def _pick(row: dict[str, Any], keys: tuple[str, ...], default: Any) -> Any:
+    # Same result as row.get(a) or row.get(b) or ... or default.
+    for key in keys:
+        value = row.get(key)
+        if value:
+            return value
+    return default
+
+
+@functools.lru_cache(maxsize=512)
+def _format_html_text(text: str) -> str:
+    # Menu titles and status lines repeat constantly, so formatted output is memoized.
+    return "\n".join(
+        f"<pre>{line[BLOCK_PREFIX_LEN:].translate(HTML_ESCAPE_TABLE)}</pre>"
+        if line.startswith(BLOCK_PREFIX)
+        else f"<blockquote><b>{line.translate(HTML_ESCAPE_TABLE)}</b></blockquote>"
+        if line
+        else ""
+        for line in map(str.rstrip, text.splitlines())
+    )
+
+
+def _static_keyboard(build: Callable[..., list[list[dict[str, Any]]]]) -> Callable[..., list[list[dict[str, Any]]]]:
+    # Menus that only vary by language (and the extra args) are laid out once. Callers get a fresh
+    # outer list to append rows to; the cached rows and buttons are shared and never mutated.
+    @functools.wraps(build)
+    def wrapper(self: Any, user_id: int, *args: Any) -> list[list[dict[str, Any]]]:
+        key = (build.__name__, self._is_ar(user_id), *args)
+        rows = self._kb_cache.get(key)
+        if rows is None:
+            rows = build(self, user_id, *args)
+            self._kb_cache[key] = rows
+        return list(rows)
+
+    return wrapper
+
+
+class _MultipartFileBody:
+    # File-like multipart/form-data body: requests sends it in blocks with a Content-Length,
+    # so the document is streamed from disk instead of being read into memory first.
+    def __init__(self, fields: dict[str, str], file_field: str, file_name: str, file_obj: Any) -> None:
+        self.boundary = os.urandom(16).hex()
+        head = bytearray()
+        for name, value in fields.items():
+            head += f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+            head += str(value).encode() + b"\r\n"
+        safe_name = file_name.replace('"', "")
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{safe_name}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._size = len(head) + os.fstat(file_obj.fileno()).st_size + len(tail)
+        self._parts: deque[Any] = deque([io.BytesIO(bytes(head)), file_obj, io.BytesIO(tail)])
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        out = bytearray()
+        while self._parts and (size < 0 or len(out) < size):
+            chunk = self._parts[0].read(-1 if size < 0 else size - len(out))
+            if not chunk:
+                self._parts.popleft()
+                continue
+            out += chunk
+        return bytes(out)
+
+
 class PanelBot:
     def __init__(self) -> None:
         load_dotenv(BASE_DIR / ".env")
-        self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
-        self.api_base = os.getenv("API_BASE_URL", "").strip().rstrip("/")
-        self.api_session_token = os.getenv("API_SESSION_TOKEN", "").strip()
-        self.api_key = os.getenv("API_KEY", "").strip()
+        # The environment does not change after startup, so it is read once.
+        self._env = dict(os.environ)
+        self._env_admins = frozenset(_parse_ids(ADMIN_IDS_SPLIT_RE.split(self._env_str("PANEL_ADMIN_IDS"))))
+        self.bot_token = self._env_str("TELEGRAM_BOT_TOKEN")
+        self.api_base = self._env_str("API_BASE_URL").rstrip("/")
+        self.api_session_token = self._env_str("API_SESSION_TOKEN")
+        self.api_key = self._env_str("API_KEY")
         self.poll_interval = 2
-        self.user_state: dict[int, dict[str, Any]] = {}
+        self.poll_timeout = self._env_poll_timeout()
+        # One pooled session for Telegram and the API so calls reuse kept-alive TLS connections.
+        self.http = requests.Session()
+        # Status retries only cover idempotent requests (getFile's GET); urllib3 never retries POSTs on
+        # status. 429 is left to the send queue's retry_after handling, and the final response is
+        # returned instead of raising so callers still see Telegram's error body.
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504), raise_on_status=False),
+        )
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        self.sessions: dict[int, UserSession] = {}
         self.last_update_id = 0
         self.admin_ids = self._load_admin_ids()
         self.executor = ThreadPoolExecutor(max_workers=6)
+        # Separate from self.executor: fetches already run there and fan out per account.
+        self.fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
         self.cache_ttl_seconds = 45
-        self.platforms_cache: dict[str, Any] = {"at": 0.0, "data": []}
-        self.traffic_cache: dict[str, dict[str, Any]] = {}
-        self.user_platforms_cache: dict[int, list[str]] = {}
-        self.user_traffic_cache: dict[int, dict[str, list[dict[str, str]]]] = {}
-        self.user_numbers_cache: dict[int, dict[str, list[dict[str, str]]]] = {}
-        self.user_numbers_view_account: dict[int, str | None] = {}
-        self.user_view_rev: dict[int, int] = {}
-        self.user_lang: dict[int, str] = {}
+        self.platforms_cache: TTLEntry | None = None
+        self.traffic_cache: dict[str, TTLEntry] = {}
+        self.numbers_cache: dict[str, TTLEntry] = {}
+        self.balances_cache: TTLEntry | None = None
+        self.token_cache: dict[tuple[str, str, str], TTLEntry] = {}
+        # token -> (email, password) it was issued for, so a rejected token can be renewed.
+        self._token_owners: dict[str, tuple[str, str]] = {}
+        self._token_lock = threading.Lock()
         self.op_lock = threading.Lock()
         self.operations: dict[str, dict[str, Any]] = {}
         self.user_active_operation: dict[int, str] = {}
@@ -123,9 +323,22 @@ class PanelBot:
         self.op_stop_event = threading.Event()
         self.op_ticker_thread = threading.Thread(target=self._operations_ticker_loop, daemon=True)
         self.op_ticker_thread.start()
+        self._send_q: queue.Queue[SendJob] = queue.Queue()
+        self._send_times: deque[float] = deque(maxlen=SEND_GLOBAL_PER_SECOND)
+        self._chat_last_send: OrderedDict[str, float] = OrderedDict()
+        self._send_thread = threading.Thread(target=self._send_worker_loop, daemon=True)
+        self._send_thread.start()
         self.task_lock = threading.Lock()
         self.active_task_signatures: set[tuple[int, str]] = set()
         self.last_targets_error: str = ""
+        self._runtime_cfg_cache: dict[str, Any] = {"rev": None, "data": None, "at": 0.0}
+        self._req_cfg = threading.local()
+        self._rows_cache: dict[Path, tuple[Any, list[dict[str, Any]]]] = {}
+        self._ts_cache: tuple[int, str] = (0, "")
+        self._lang_view: tuple[Any, dict[int, str]] = (None, {})
+        self._kb_cache: dict[tuple[Any, ...], list[list[dict[str, Any]]]] = {}
+        self._back_btns: dict[tuple[str, str], dict[str, Any]] = {}
+        self._account_names_cache: tuple[Any, list[str]] | None = None
 
         if not self.bot_token:
             raise RuntimeError("TELEGRAM_BOT_TOKEN is missing in .env")
@@ -136,29 +349,23 @@ class PanelBot:
         self.ensure_runtime_config()
         self.refresh_runtime_settings()
 
+    def _env_str(self, name: str, default: str = "") -> str:
+        return str(self._env.get(name, default)).strip()
+
+    def _env_int(self, name: str, default: int) -> int:
+        try:
+            return int(self._env_str(name) or default)
+        except ValueError:
+            return default
+
+    def _env_poll_timeout(self) -> int:
+        return max(0, self._env_int("PANEL_POLL_TIMEOUT", DEFAULT_POLL_TIMEOUT))
+
     def _load_admin_ids(self) -> set[int]:
-        raw = os.getenv("PANEL_ADMIN_IDS", "").strip()
-        if not raw:
-            return set(DEFAULT_ADMIN_IDS)
-        out: set[int] = set()
-        for chunk in re.split(r"[,\s]+", raw):
-            value = chunk.strip()
-            if not value:
-                continue
-            if value.isdigit():
-                out.add(int(value))
-        if not out:
-            return set(DEFAULT_ADMIN_IDS)
-        return out
+        return self._env_admin_ids() or set(DEFAULT_ADMIN_IDS)
 
     def _env_admin_ids(self) -> set[int]:
-        raw = os.getenv("PANEL_ADMIN_IDS", "").strip()
-        out: set[int] = set()
-        for chunk in re.split(r"[,\s]+", raw):
-            value = chunk.strip()
-            if value.isdigit():
-                out.add(int(value))
-        return out
+        return set(self._env_admins)
 
     def is_admin(self, user_id: int) -> bool:
         uid = int(user_id or 0)
@@ -181,33 +388,49 @@ class PanelBot:
         # Full variables are only for the primary admin on the main bot instance.
         return self.is_main_instance() and self.is_primary_admin(user_id)
 
-    def bump_view_rev(self, user_id: int) -> int:
+    def user_session(self, user_id: int) -> UserSession:
         uid = int(user_id)
-        self.user_view_rev[uid] = int(self.user_view_rev.get(uid, 0)) + 1
-        return self.user_view_rev[uid]
+        sess = self.sessions.get(uid)
+        if sess is None:
+            sess = self.sessions[uid] = UserSession()
+        return sess
+
+    def bump_view_rev(self, user_id: int) -> int:
+        sess = self.user_session(user_id)
+        sess.view_rev += 1
+        return sess.view_rev
 
     def is_view_current(self, user_id: int, view_rev: int | None) -> bool:
         if view_rev is None:
             return True
-        return int(self.user_view_rev.get(int(user_id), 0)) == int(view_rev)
+        return self.user_session(user_id).view_rev == int(view_rev)
 
     # -------------------------- files/json --------------------------
     def load_json(self, path: Path, fallback: Any) -> Any:
         return db_load_json(path, fallback)
 
     def save_json(self, path: Path, data: Any) -> None:
+        self._rows_cache.pop(path, None)
+        if path == RUNTIME_CONFIG_FILE:
+            self._runtime_cfg_cache["data"] = None
+            self._req_cfg.cfg = None
         db_save_json(path, data)
 
+    def _cached_rows(self, path: Path, builder: Callable[[Any], list[dict[str, Any]]]) -> list[dict[str, Any]]:
+        # Normalized rows are rebuilt only when the store revision moves; callers get their own copies.
+        rev = json_revision(path)
+        hit = self._rows_cache.get(path)
+        if hit is None or hit[0] != rev:
+            hit = (rev, builder(self.load_json(path, [])))
+            self._rows_cache[path] = hit
+        return [dict(row) for row in hit[1]]
+
     def _is_valid_day(self, value: str) -> bool:
-        v = str(value or "").strip()
-        parts = v.split("-")
-        if len(parts) != 3 or any(not p.isdigit() for p in parts):
-            return False
-        y, m, d = parts
-        if len(y) != 4:
+        m = DAY_RE.fullmatch(str(value or "").strip())
+        if not m:
             return False
         try:
-            date(int(y), int(m), int(d))
+            date(int(m[1]), int(m[2]), int(m[3]))
         except ValueError:
             return False
         return True
@@ -219,19 +442,19 @@ class PanelBot:
         if "fetch_codes_enabled" not in data:
             data["fetch_codes_enabled"] = True
         if "messages_start_date" not in data:
-            data["messages_start_date"] = os.getenv("API_START_DATE", "2025-01-01").strip() or "2025-01-01"
+            data["messages_start_date"] = self._env_str("API_START_DATE") or "2025-01-01"
         if "messages_start_date_auto_today" not in data:
             data["messages_start_date_auto_today"] = False
         if "start_date_prompt_pending" not in data:
             data["start_date_prompt_pending"] = not self._is_valid_day(str(data.get("messages_start_date", "")).strip())
         if "api_base_url" not in data:
-            data["api_base_url"] = os.getenv("API_BASE_URL", "").strip().rstrip("/")
+            data["api_base_url"] = self._env_str("API_BASE_URL").rstrip("/")
         if "api_session_token" not in data:
-            data["api_session_token"] = os.getenv("API_SESSION_TOKEN", "").strip()
+            data["api_session_token"] = self._env_str("API_SESSION_TOKEN")
         if "api_key" not in data:
-            data["api_key"] = os.getenv("API_KEY", "").strip()
+            data["api_key"] = self._env_str("API_KEY")
         if "bot_limit" not in data:
-            data["bot_limit"] = int(str(os.getenv("BOT_LIMIT", "30") or "30").strip() or "30")
+            data["bot_limit"] = self._env_int("BOT_LIMIT", 30)
         if not isinstance(data.get("panel_admin_ids"), list):
             env_admins = sorted(self._env_admin_ids() or DEFAULT_ADMIN_IDS)
             data["panel_admin_ids"] = env_admins
@@ -242,27 +465,92 @@ class PanelBot:
         self.save_json(RUNTIME_CONFIG_FILE, data)
 
     def _load_runtime_cfg(self) -> dict[str, Any]:
+        batch = getattr(self._req_cfg, "batch", None)
+        if batch is not None:
+            return batch["cfg"]
+        req_cfg = getattr(self._req_cfg, "cfg", None)
+        if req_cfg is not None:
+            return req_cfg
+        # Hit on nearly every update; reuse the parsed dict while the store revision is unchanged.
+        cache = self._runtime_cfg_cache
+        rev = json_revision(RUNTIME_CONFIG_FILE)
+        now = time.monotonic()
+        if cache["data"] is not None and cache["rev"] == rev and now - cache["at"] < RUNTIME_CFG_TTL_SECONDS:
+            return cache["data"]
         cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        return cfg if isinstance(cfg, dict) else {}
+        if not isinstance(cfg, dict):
+            cfg = {}
+        self._runtime_cfg_cache = {"rev": rev, "data": cfg, "at": now}
+        return cfg
 
     def _save_runtime_cfg(self, cfg: dict[str, Any]) -> None:
-        now = self._now_marker()
-        cfg["updated_at"] = now
+        # Setters often re-save values that did not change; skip those so updated_at stays meaningful.
+        stored = self.load_json(RUNTIME_CONFIG_FILE, {})
+        if isinstance(stored, dict):
+            stored.pop("updated_at", None)
+            if stored == {k: v for k, v in cfg.items() if k != "updated_at"}:
+                return
+        cfg["updated_at"] = self._now_marker()
         self.save_json(RUNTIME_CONFIG_FILE, cfg)
 
-    def request_bot_restart(self) -> None:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            cfg = {}
-        now = self._now_marker()
-        cfg["updated_at"] = now
-        cfg["bot_restart_requested_at"] = now
+    def _runtime_cfg_copy(self) -> dict[str, Any]:
+        # The cached config is shared across threads; edits go to a private copy.
+        return orjson.loads(orjson.dumps(self._load_runtime_cfg()))
+
+    def _publish_runtime_cfg(self, cfg: dict[str, Any]) -> None:
+        self._runtime_cfg_cache = {"rev": json_revision(RUNTIME_CONFIG_FILE), "data": cfg, "at": time.monotonic()}
+
+    def _write_runtime_cfg(self, **values: Any) -> None:
+        batch = getattr(self._req_cfg, "batch", None)
+        if batch is not None:
+            batch["cfg"].update(values)
+            return
+        cfg = self._runtime_cfg_copy()
+        cfg.update(values)
         self.save_json(RUNTIME_CONFIG_FILE, cfg)
+        self._publish_runtime_cfg(cfg)
+
+    @contextmanager
+    def mutate_runtime_cfg(self, *markers: str) -> Iterator[dict[str, Any]]:
+        # Nested blocks share the outer config, so a whole admin flow saves and refreshes once.
+        batch = getattr(self._req_cfg, "batch", None)
+        if batch is not None:
+            batch["markers"].update(markers)
+            yield batch["cfg"]
+            return
+        cfg = self._runtime_cfg_copy()
+        batch = {"cfg": cfg, "markers": set(markers)}
+        self._req_cfg.batch = batch
+        try:
+            yield cfg
+        finally:
+            self._req_cfg.batch = None
+        if batch["markers"]:
+            now = self._now_marker()
+            for key in batch["markers"]:
+                cfg[key] = now
+        self._save_runtime_cfg(cfg)
+        self._publish_runtime_cfg(cfg)
+        self.refresh_runtime_settings()
+
+    def request_bot_restart(self) -> None:
+        with self.mutate_runtime_cfg("bot_restart_requested_at"):
+            pass
 
     def _now_marker(self) -> str:
         # Use microseconds so repeated actions in the same second still trigger.
         return datetime.now().isoformat(sep=" ", timespec="microseconds")
 
+    def _now_second_str(self) -> str:
+        # Second-resolution stamps only need formatting once per second.
+        t = int(time.time())
+        cached = self._ts_cache
+        if cached[0] == t:
+            return cached[1]
+        text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+        self._ts_cache = (t, text)
+        return text
+
     def refresh_runtime_settings(self) -> None:
         cfg = self._load_runtime_cfg()
         api_base = str(cfg.get("api_base_url", "")).strip().rstrip("/")
@@ -275,11 +563,9 @@ class PanelBot:
         admins: set[int] = set(DEFAULT_ADMIN_IDS) | self._env_admin_ids()
         runtime_admins = cfg.get("panel_admin_ids")
         if isinstance(runtime_admins, list):
-            for x in runtime_admins:
-                s = str(x).strip()
-                if s.isdigit():
-                    admins.add(int(s))
+            admins.update(_parse_ids(runtime_admins))
         self.admin_ids = admins or set(DEFAULT_ADMIN_IDS)
+        self._lang_overrides()
 
     def get_runtime_api_base(self) -> str:
         cfg = self._load_runtime_cfg()
@@ -295,10 +581,9 @@ class PanelBot:
         v = str(value or "").strip()
         if len(v) < 8:
             return False
-        cfg = self._load_runtime_cfg()
-        cfg["api_key"] = v
-        self._save_runtime_cfg(cfg)
-        self.refresh_runtime_settings()
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["api_key"] = v
+        self.invalidate_api_caches()
         return True
 
     def _masked_api_key(self, value: str) -> str:
@@ -316,10 +601,9 @@ class PanelBot:
         v = str(value or "").strip().rstrip("/")
         if not (v.startswith("http://") or v.startswith("https://")):
             return False
-        cfg = self._load_runtime_cfg()
-        cfg["api_base_url"] = v
-        self._save_runtime_cfg(cfg)
-        self.refresh_runtime_settings()
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["api_base_url"] = v
+        self.invalidate_api_caches()
         return True
 
     def get_runtime_bot_limit(self) -> int:
@@ -341,9 +625,8 @@ class PanelBot:
             n = 0
         else:
             n = max(1, min(10000, n))
-        cfg = self._load_runtime_cfg()
-        cfg["bot_limit"] = n
-        self._save_runtime_cfg(cfg)
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["bot_limit"] = n
         return True
 
     def get_runtime_admin_ids(self) -> list[int]:
@@ -354,24 +637,11 @@ class PanelBot:
         if not v.isdigit():
             return False
         aid = int(v)
-        cfg = self._load_runtime_cfg()
-        admins = cfg.get("panel_admin_ids")
-        if not isinstance(admins, list):
-            admins = []
-        out: list[int] = []
-        seen: set[int] = set()
-        for x in admins + [aid]:
-            sx = str(x).strip()
-            if not sx.isdigit():
-                continue
-            xi = int(sx)
-            if xi in seen:
-                continue
-            seen.add(xi)
-            out.append(xi)
-        cfg["panel_admin_ids"] = out
-        self._save_runtime_cfg(cfg)
-        self.refresh_runtime_settings()
+        with self.mutate_runtime_cfg() as cfg:
+            admins = cfg.get("panel_admin_ids")
+            if not isinstance(admins, list):
+                admins = []
+            cfg["panel_admin_ids"] = _parse_ids(admins + [aid])
         return True
 
     def remove_runtime_admin(self, value: str) -> bool:
@@ -383,107 +653,88 @@ class PanelBot:
         admins = cfg.get("panel_admin_ids")
         if not isinstance(admins, list):
             admins = []
-        out: list[int] = []
-        removed = False
-        for x in admins:
-            sx = str(x).strip()
-            if not sx.isdigit():
-                continue
-            xi = int(sx)
-            if xi == aid:
-                removed = True
-                continue
-            out.append(xi)
-        if not removed:
+        current = _parse_ids(admins)
+        if aid not in current:
             return False
-        cfg["panel_admin_ids"] = out
-        self._save_runtime_cfg(cfg)
-        self.refresh_runtime_settings()
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["panel_admin_ids"] = [x for x in current if x != aid]
         return True
 
+    def _lang_overrides(self) -> dict[int, str]:
+        # Int-keyed view of language_overrides, rebuilt only when a new config dict is loaded.
+        cfg = self._load_runtime_cfg()
+        src, view = self._lang_view
+        if src is not cfg:
+            raw = cfg.get("language_overrides")
+            view = {}
+            if isinstance(raw, dict):
+                for key, value in raw.items():
+                    k = str(key).strip()
+                    lang = str(value or "").strip().lower()
+                    if k.isdigit() and lang in {"ar", "en"}:
+                        view[int(k)] = lang
+            self._lang_view = (cfg, view)
+        return view
+
     def get_user_lang_override(self, user_id: int) -> str:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            return ""
-        overrides = cfg.get("language_overrides")
-        if not isinstance(overrides, dict):
-            return ""
-        lang = str(overrides.get(str(int(user_id)), "")).strip().lower()
-        return lang if lang in {"ar", "en"} else ""
+        return self._lang_overrides().get(user_id, "")
 
     def set_user_lang_override(self, user_id: int, lang: str) -> None:
         value = str(lang or "").strip().lower()
         if value not in {"ar", "en"}:
             return
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            cfg = {}
-        overrides = cfg.get("language_overrides")
-        if not isinstance(overrides, dict):
-            overrides = {}
-        overrides[str(int(user_id))] = value
-        cfg["language_overrides"] = overrides
-        cfg["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.save_json(RUNTIME_CONFIG_FILE, cfg)
+        if self._lang_overrides().get(user_id) == value:
+            return
+        # The int view is rebuilt from the published config, so it only changes once the save succeeded.
+        with self.mutate_runtime_cfg() as cfg:
+            overrides = cfg.get("language_overrides")
+            if not isinstance(overrides, dict):
+                overrides = {}
+            # JSON keeps string keys; only the in-memory view is int-keyed.
+            overrides[str(user_id)] = value
+            cfg["language_overrides"] = overrides
 
     def get_runtime_start_date(self) -> str:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        raw = str(cfg.get("messages_start_date", "")).strip() if isinstance(cfg, dict) else ""
-        if isinstance(cfg, dict) and bool(cfg.get("messages_start_date_auto_today", False)):
+        cfg = self._load_runtime_cfg()
+        raw = str(cfg.get("messages_start_date", "")).strip()
+        if bool(cfg.get("messages_start_date_auto_today", False)):
             today = date.today().strftime("%Y-%m-%d")
             if raw != today:
-                cfg["messages_start_date"] = today
-                cfg["updated_at"] = self._now_marker()
-                self.save_json(RUNTIME_CONFIG_FILE, cfg)
+                self._write_runtime_cfg(messages_start_date=today, updated_at=self._now_marker())
                 return today
         if self._is_valid_day(raw):
             return raw
-        env_default = os.getenv("API_START_DATE", "2025-01-01").strip() or "2025-01-01"
-        return env_default
+        return self._env_str("API_START_DATE") or "2025-01-01"
 
     def is_start_date_prompt_pending(self) -> bool:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if isinstance(cfg, dict) and "start_date_prompt_pending" in cfg:
+        cfg = self._load_runtime_cfg()
+        if "start_date_prompt_pending" in cfg:
             return bool(cfg.get("start_date_prompt_pending", False))
         # Backward compatibility: if no valid start date, keep prompt pending.
         return not self._is_valid_day(self.get_runtime_start_date())
 
     def set_start_date_prompt_pending(self, pending: bool) -> None:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            cfg = {}
-        cfg["start_date_prompt_pending"] = bool(pending)
-        cfg["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.save_json(RUNTIME_CONFIG_FILE, cfg)
+        self._write_runtime_cfg(start_date_prompt_pending=bool(pending), updated_at=self._now_second_str())
 
     def set_runtime_start_date(self, day_value: str) -> bool:
         value = str(day_value or "").strip()
         if not self._is_valid_day(value):
             return False
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            cfg = {}
-        cfg["messages_start_date"] = value
-        cfg["messages_start_date_auto_today"] = False
-        cfg["start_date_prompt_pending"] = False
-        self._save_runtime_cfg(cfg)
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["messages_start_date"] = value
+            cfg["messages_start_date_auto_today"] = False
+            cfg["start_date_prompt_pending"] = False
         return True
 
     def is_start_date_auto_today_enabled(self) -> bool:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            return False
-        return bool(cfg.get("messages_start_date_auto_today", False))
+        return bool(self._load_runtime_cfg().get("messages_start_date_auto_today", False))
 
     def set_start_date_auto_today(self, enabled: bool) -> None:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            cfg = {}
-        cfg["messages_start_date_auto_today"] = bool(enabled)
-        if enabled:
-            cfg["messages_start_date"] = date.today().strftime("%Y-%m-%d")
-            cfg["start_date_prompt_pending"] = False
-        self._save_runtime_cfg(cfg)
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["messages_start_date_auto_today"] = bool(enabled)
+            if enabled:
+                cfg["messages_start_date"] = date.today().strftime("%Y-%m-%d")
+                cfg["start_date_prompt_pending"] = False
 
     def load_managed_bots(self) -> list[dict[str, Any]]:
         cfg = self._load_runtime_cfg()
@@ -512,19 +763,14 @@ class PanelBot:
                     "bot_username": str(row.get("bot_username", "")).strip(),
                     "bot_name": str(row.get("bot_name", "")).strip(),
                     "accounts_limit": int(row.get("accounts_limit", 0) or 0),
-                    "admin_ids": [
-                        int(str(x).strip())
-                        for x in (row.get("admin_ids") or [])
-                        if str(x).strip().isdigit()
-                    ],
+                    "admin_ids": _parse_ids(row.get("admin_ids") or []),
                 }
             )
         return out
 
     def save_managed_bots(self, rows: list[dict[str, Any]]) -> None:
-        cfg = self._load_runtime_cfg()
-        cfg["managed_bots"] = rows
-        self._save_runtime_cfg(cfg)
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["managed_bots"] = rows
 
     def upsert_managed_bot(self, token: str, storage: str, created_by: int, bot_username: str = "", bot_name: str = "") -> None:
         tok = str(token or "").strip()
@@ -546,7 +792,7 @@ class PanelBot:
                 row["token"] = tok
                 row["bot_token"] = tok
                 row["created_by"] = str(created_by)
-                row["created_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                row["created_at"] = self._now_second_str()
                 row["bot_username"] = str(bot_username or row.get("bot_username", "")).strip()
                 if bot_name:
                     row["bot_name"] = str(bot_name).strip()
@@ -565,7 +811,7 @@ class PanelBot:
                     "storage": storage_value,
                     "storage_mode": storage_value,
                     "created_by": str(created_by),
-                    "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "created_at": self._now_second_str(),
                     "bot_username": str(bot_username or "").strip(),
                     "bot_name": str(bot_name or "").strip(),
                     "accounts_limit": 0,
@@ -590,7 +836,7 @@ class PanelBot:
         if not tok:
             return False, ""
         try:
-            r = requests.get(f"https://api.telegram.org/bot{tok}/getMe", timeout=25)
+            r = self.http.get(f"https://api.telegram.org/bot{tok}/getMe", timeout=25)
             payload = r.json()
         except Exception:
             return False, ""
@@ -630,13 +876,7 @@ class PanelBot:
             if str(row.get("id", "")).strip() != bid:
                 continue
             ids = row.get("admin_ids")
-            if not isinstance(ids, list):
-                ids = []
-            cleaned: list[int] = []
-            for x in ids:
-                s = str(x).strip()
-                if s.isdigit():
-                    cleaned.append(int(s))
+            cleaned = _parse_ids(ids) if isinstance(ids, list) else []
             if aid not in cleaned:
                 cleaned.append(aid)
             row["admin_ids"] = cleaned
@@ -658,13 +898,7 @@ class PanelBot:
             if str(row.get("id", "")).strip() != bid:
                 continue
             ids = row.get("admin_ids")
-            if not isinstance(ids, list):
-                ids = []
-            cleaned: list[int] = []
-            for x in ids:
-                s = str(x).strip()
-                if s.isdigit():
-                    cleaned.append(int(s))
+            cleaned = _parse_ids(ids) if isinstance(ids, list) else []
             new_ids = [x for x in cleaned if x != aid]
             if len(new_ids) != len(cleaned):
                 row["admin_ids"] = new_ids
@@ -676,37 +910,40 @@ class PanelBot:
         return True
 
     def request_messages_refresh(self) -> None:
-        cfg = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(cfg, dict):
-            cfg = {}
-        now = self._now_marker()
-        cfg["messages_update_requested_at"] = now
-        cfg["updated_at"] = now
-        self.save_json(RUNTIME_CONFIG_FILE, cfg)
+        with self.mutate_runtime_cfg("messages_update_requested_at"):
+            pass
 
     def mark_runtime_change(self) -> None:
         # Hot reload only (no full process restart).
         self.request_messages_refresh()
-        self.refresh_runtime_settings()
 
     def mark_process_restart_change(self) -> None:
         # Explicit full restart for topology/process-level changes only.
-        self.request_bot_restart()
-        self.request_messages_refresh()
+        with self.mutate_runtime_cfg("bot_restart_requested_at", "messages_update_requested_at"):
+            pass
+
+    def apply_runtime_change(self, setter: Callable[..., Any], *args: Any, restart: bool = False) -> bool:
+        # Setter and reload markers land in a single runtime config write.
+        with self.mutate_runtime_cfg():
+            if setter(*args) is False:
+                return False
+            if restart:
+                self.mark_process_restart_change()
+            else:
+                self.mark_runtime_change()
+        return True
 
     def fetch_codes_enabled(self) -> bool:
-        data = self.load_json(RUNTIME_CONFIG_FILE, {"fetch_codes_enabled": True})
-        return bool(data.get("fetch_codes_enabled", True))
+        return bool(self._load_runtime_cfg().get("fetch_codes_enabled", True))
 
     def set_fetch_codes_enabled(self, enabled: bool) -> None:
-        data = self.load_json(RUNTIME_CONFIG_FILE, {})
-        if not isinstance(data, dict):
-            data = {}
-        data["fetch_codes_enabled"] = bool(enabled)
-        self._save_runtime_cfg(data)
+        with self.mutate_runtime_cfg() as cfg:
+            cfg["fetch_codes_enabled"] = bool(enabled)
 
     def load_accounts(self) -> list[dict[str, Any]]:
-        rows = self.load_json(ACCOUNTS_FILE, [])
+        return self._cached_rows(ACCOUNTS_FILE, self._build_accounts)
+
+    def _build_accounts(self, rows: Any) -> list[dict[str, Any]]:
         if not isinstance(rows, list):
             return []
         out: list[dict[str, Any]] = []
@@ -723,6 +960,7 @@ class PanelBot:
 
     def save_accounts(self, rows: list[dict[str, Any]]) -> None:
         self.save_json(ACCOUNTS_FILE, rows)
+        self.invalidate_api_caches()
         self.request_messages_refresh()
 
     def _managed_limit_from_main_runtime(self) -> int:
@@ -740,7 +978,7 @@ class PanelBot:
             conn.close()
             if not row:
                 return 0
-            cfg = json.loads(str(row[0]))
+            cfg = orjson.loads(row[0])
             if not isinstance(cfg, dict):
                 return 0
             bots = cfg.get("managed_bots")
@@ -774,7 +1012,7 @@ class PanelBot:
             conn.close()
             if not row:
                 return set()
-            cfg = json.loads(str(row[0]))
+            cfg = orjson.loads(row[0])
             if not isinstance(cfg, dict):
                 return set()
             bots = cfg.get("managed_bots")
@@ -790,10 +1028,7 @@ class PanelBot:
                 created_by = str(bot.get("created_by", "")).strip()
                 if created_by.isdigit():
                     out.add(int(created_by))
-                for x in (bot.get("admin_ids") or []):
-                    s = str(x).strip()
-                    if s.isdigit():
-                        out.add(int(s))
+                out.update(_parse_ids(bot.get("admin_ids") or []))
                 return out
         except Exception:
             return set()
@@ -805,14 +1040,9 @@ class PanelBot:
         if dynamic_limit > 0:
             return dynamic_limit
         # Fallback to supervisor env.
-        raw = str(os.getenv("BOT_ACCOUNTS_LIMIT", "")).strip()
-        if raw:
-            try:
-                n = int(raw)
-            except Exception:
-                n = 0
-            if n > 0:
-                return n
+        n = self._env_int("BOT_ACCOUNTS_LIMIT", 0)
+        if n > 0:
+            return n
         return self._managed_limit_from_main_runtime()
 
     def check_accounts_capacity(self, incoming_rows: list[dict[str, Any]]) -> tuple[bool, int, int]:
@@ -837,7 +1067,9 @@ class PanelBot:
         return (current_total + new_unique) <= limit, new_unique, remaining
 
     def load_groups(self) -> list[dict[str, Any]]:
-        rows_any = self.load_json(GROUPS_FILE, [])
+        return self._cached_rows(GROUPS_FILE, self._build_groups)
+
+    def _build_groups(self, rows_any: Any) -> list[dict[str, Any]]:
         rows: list[Any] = []
         if isinstance(rows_any, list):
             rows = rows_any
@@ -886,7 +1118,7 @@ class PanelBot:
                             row_db = cur.execute("SELECT value FROM kv_store WHERE key='groups'").fetchone()
                             conn.close()
                             if row_db:
-                                payload = json.loads(str(row_db[0]))
+                                payload = orjson.loads(row_db[0])
                                 if isinstance(payload, list):
                                     groups = [x for x in payload if isinstance(x, dict)]
                         except Exception:
@@ -907,7 +1139,7 @@ class PanelBot:
     def send_with_token(self, token: str, method: str, payload: dict[str, Any]) -> dict[str, Any]:
         url = f"https://api.telegram.org/bot{token}/{method}"
         try:
-            r = requests.post(url, json=payload, timeout=40)
+            r = self.http.post(url, json=payload, timeout=40)
             return r.json()
         except Exception as exc:
             return {"ok": False, "error": str(exc)}
@@ -917,22 +1149,25 @@ class PanelBot:
         kb = None
         if button_text and button_url:
             kb = {"inline_keyboard": [[{"text": button_text, "url": button_url}]]}
-        ok_count = 0
-        fail_count = 0
-        for target in targets:
+        formatted = self._format_text(text)
+
+        def send_one(target: dict[str, str]) -> bool:
             body: dict[str, Any] = {
                 "chat_id": target["chat_id"],
-                "text": self._format_text(text),
+                "text": formatted,
                 "parse_mode": "HTML",
                 "disable_web_page_preview": True,
             }
             if kb:
                 body["reply_markup"] = kb
             res = self.send_with_token(target["token"], "sendMessage", body)
-            if isinstance(res, dict) and res.get("ok"):
-                ok_count += 1
-            else:
-                fail_count += 1
+            return isinstance(res, dict) and bool(res.get("ok"))
+
+        # Own pool: this already runs on self.executor, so mapping onto it could starve the workers.
+        with ThreadPoolExecutor(max_workers=BROADCAST_WORKERS) as pool:
+            results = list(pool.map(send_one, targets))
+        ok_count = sum(results)
+        fail_count = len(results) - ok_count
         self.send_text(
             chat_id,
             self._tr(
@@ -943,7 +1178,9 @@ class PanelBot:
         )
 
     def load_services(self) -> list[dict[str, str]]:
-        rows = self.load_json(PLATFORMS_FILE, [])
+        return self._cached_rows(PLATFORMS_FILE, self._build_services)
+
+    def _build_services(self, rows: Any) -> list[dict[str, str]]:
         if not isinstance(rows, list):
             rows = []
         out: list[dict[str, str]] = []
@@ -962,10 +1199,13 @@ class PanelBot:
 
     def save_services(self, rows: list[dict[str, str]]) -> None:
         self.save_json(PLATFORMS_FILE, rows)
+        self.invalidate_platforms_cache()
         self.mark_runtime_change()
 
     def load_countries_store(self) -> list[dict[str, str]]:
-        rows = self.load_json(COUNTRY_FILE, [])
+        return self._cached_rows(COUNTRY_FILE, self._build_countries)
+
+    def _build_countries(self, rows: Any) -> list[dict[str, str]]:
         if not isinstance(rows, list):
             rows = []
         out: list[dict[str, str]] = []
@@ -1005,22 +1245,14 @@ class PanelBot:
 
     def normalize_group_target(self, raw: str) -> str:
         value = str(raw or "").strip()
-        if not value:
-            return ""
-        if value.startswith("-100") and value[1:].isdigit():
-            return value
-        if value.startswith("@"):
+        m = GROUP_TARGET_RE.match(value)
+        if m is None or m["keep"] is not None:
             return value
-        if "t.me/" in value:
-            part = value.split("t.me/", 1)[1].strip().strip("/")
-            part = part.split("?", 1)[0].strip("/")
-            if part:
-                if part.startswith("+") or part.startswith("joinchat/") or part.startswith("c/"):
-                    return value
-                return f"@{part.lstrip('@')}"
-        if value.isdigit():
+        part = m["tme"].strip().strip("/")
+        # Invite links and private-channel links cannot be turned into an @username.
+        if not part or part.startswith(("+", "joinchat/", "c/")):
             return value
-        return value
+        return f"@{part.lstrip('@')}"
 
     def load_ranges_store(self) -> dict[str, Any]:
         data = self.load_json(RANGES_STORE_FILE, {})
@@ -1035,23 +1267,18 @@ class PanelBot:
     def save_ranges_store(self, store: dict[str, Any]) -> None:
         store["meta"] = {
             **(store.get("meta") if isinstance(store.get("meta"), dict) else {}),
-            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "updated_at": self._now_second_str(),
         }
         self.save_json(RANGES_STORE_FILE, store)
 
     def range_limit_total(self) -> int:
-        raw = os.getenv("RANGE_MAX_TOTAL", "1000").strip()
-        try:
-            value = int(raw)
-        except Exception:
-            value = 1000
-        return max(50, value)
+        return max(50, self._env_int("RANGE_MAX_TOTAL", 1000))
 
     # -------------------------- telegram api --------------------------
-    def tg_api(self, method: str, payload: dict[str, Any] | None = None) -> dict[str, Any]:
+    def tg_api(self, method: str, payload: dict[str, Any] | None = None, timeout: int = 40) -> dict[str, Any]:
         url = f"https://api.telegram.org/bot{self.bot_token}/{method}"
         try:
-            r = requests.post(url, json=payload or {}, timeout=40)
+            r = self.http.post(url, json=payload or {}, timeout=timeout)
             data = r.json()
             if isinstance(data, dict) and not data.get("ok"):
                 desc = str(data.get("description") or data.get("error") or "").strip()
@@ -1064,71 +1291,144 @@ class PanelBot:
             return {"ok": False, "error": str(exc)}
 
     def _md_escape(self, text: str) -> str:
-        out = text or ""
-        for ch in ("\\", "*", "_", "`", "["):
-            out = out.replace(ch, f"\\{ch}")
-        return out
+        return (text or "").translate(MD_ESCAPE_TABLE)
 
     def _html_escape(self, text: str) -> str:
-        out = str(text or "")
-        out = out.replace("&", "&amp;")
-        out = out.replace("<", "&lt;")
-        out = out.replace(">", "&gt;")
-        return out
+        return str(text or "").translate(HTML_ESCAPE_TABLE)
 
     def _format_text(self, text: str) -> str:
-        lines: list[str] = []
-        for raw in (text or "").splitlines():
-            line = raw.rstrip()
-            if not line:
-                lines.append("")
-                continue
-            if line.startswith("__BLOCK__ "):
-                title = line.replace("__BLOCK__ ", "", 1)
-                lines.append(f"<pre>{self._html_escape(title)}</pre>")
-            else:
-                lines.append(f"<blockquote><b>{self._html_escape(line)}</b></blockquote>")
-        return "\n".join(lines)
+        return _format_html_text(text or "")
 
     def _pad_text_for_keyboard(self, text: str, keyboard: list[list[dict[str, Any]]] | None) -> str:
         return text or ""
 
     def send_text(self, chat_id: int | str, text: str, keyboard: list[list[dict[str, Any]]] | None = None) -> None:
+        # Everything that posts or edits chat messages goes through _send_worker_loop, which keeps each
+        # chat in order and paces sends under Telegram's flood limits. Only callback answers, deletions
+        # and file lookups call tg_api directly.
+        self._queue_send(chat_id, lambda: self._send_text_now(chat_id, text, keyboard))
+
+    def _queue_send(self, chat_id: int | str, send: Callable[[], dict[str, Any]]) -> Future:
+        job = SendJob(chat_id, send)
+        self._send_q.put(job)
+        return job.done
+
+    def _send_worker_loop(self) -> None:
+        # Chats that must wait (pacing or a 429) keep their jobs in order here while other chats are served.
+        held: dict[str, deque[SendJob]] = {}
+        resume: list[tuple[float, str]] = []
+        while True:
+            timeout = max(0.0, resume[0][0] - time.monotonic()) if resume else None
+            try:
+                job = self._send_q.get(timeout=timeout)
+            except queue.Empty:
+                job = None
+            if job is not None:
+                chat_key = str(job.chat_id)
+                jobs = held.get(chat_key)
+                if jobs is not None:
+                    jobs.append(job)
+                else:
+                    held[chat_key] = deque((job,))
+                    self._drain_chat(chat_key, held, resume)
+            now = time.monotonic()
+            while resume and resume[0][0] <= now:
+                self._drain_chat(heapq.heappop(resume)[1], held, resume)
+
+    def _drain_chat(self, chat_key: str, held: dict[str, deque[SendJob]], resume: list[tuple[float, str]]) -> None:
+        jobs = held[chat_key]
+        while jobs:
+            not_before = self._claim_send_slot(chat_key)
+            if not_before:
+                heapq.heappush(resume, (not_before, chat_key))
+                return
+            job = jobs[0]
+            try:
+                res = job.send()
+            except Exception as exc:
+                print(f"send worker failed | chat={job.chat_id} | error={exc}")
+                res = {"ok": False, "error": str(exc)}
+            job.attempts += 1
+            retry_after = self._retry_after(res)
+            if retry_after and job.attempts < SEND_MAX_ATTEMPTS:
+                heapq.heappush(resume, (time.monotonic() + retry_after, chat_key))
+                return
+            jobs.popleft()
+            job.done.set_result(res)
+        del held[chat_key]
+
+    def _claim_send_slot(self, chat_key: str) -> float:
+        # Returns when the chat may send next if it is still inside its interval, else takes a slot and returns 0.
+        now = time.monotonic()
+        chat_last = self._chat_last_send
+        last = chat_last.get(chat_key)
+        if last is not None and last + SEND_CHAT_INTERVAL_SECONDS > now:
+            return last + SEND_CHAT_INTERVAL_SECONDS
+        if len(self._send_times) == SEND_GLOBAL_PER_SECOND:
+            wait = self._send_times[0] + 1.0 - now
+            if wait > 0:
+                time.sleep(wait)
+                now = time.monotonic()
+        self._send_times.append(now)
+        # Kept in last-send order, so chats past their interval are dropped from the front.
+        chat_last[chat_key] = now
+        chat_last.move_to_end(chat_key)
+        cutoff = now - SEND_CHAT_INTERVAL_SECONDS
+        while chat_last and next(iter(chat_last.values())) <= cutoff:
+            chat_last.popitem(last=False)
+        return 0.0
+
+    def _retry_after(self, response: dict[str, Any]) -> int:
+        if response.get("error_code") != 429:
+            return 0
+        params = response.get("parameters") or {}
+        try:
+            return max(1, int(params.get("retry_after") or 1))
+        except (TypeError, ValueError):
+            return 1
+
+    def _send_text_now(self, chat_id: int | str, text: str, keyboard: list[list[dict[str, Any]]] | None = None) -> dict[str, Any]:
+        # Returns the last Telegram response; a 429 stops the fallbacks so the worker can retry the job.
+        res: dict[str, Any] = {}
+        for body in self._message_bodies({"chat_id": chat_id}, text, keyboard):
+            res = self.tg_api("sendMessage", body)
+            if res.get("ok") or self._retry_after(res):
+                break
+        return res
+
+    def _edit_text_now(self, chat_id: int | str, message_id: int, text: str, keyboard: list[list[dict[str, Any]]] | None = None) -> dict[str, Any]:
+        res: dict[str, Any] = {}
+        for body in self._message_bodies({"chat_id": chat_id, "message_id": int(message_id)}, text, keyboard):
+            res = self.tg_api("editMessageText", body)
+            if res.get("ok") or self._is_tg_not_modified(res) or self._retry_after(res):
+                break
+        return res
+
+    def _message_bodies(
+        self,
+        body: dict[str, Any],
+        text: str,
+        keyboard: list[list[dict[str, Any]]] | None,
+    ) -> Iterator[dict[str, Any]]:
+        # Yields HTML, HTML with a sanitized keyboard, then plain text for parse/style incompatibilities.
+        # The one request dict is updated in place, and each fallback is only built if the previous
+        # attempt failed (tg_api has serialized the body by the time the caller asks for the next one).
         padded_text = self._pad_text_for_keyboard(text, keyboard)
-        formatted = self._format_text(padded_text)
-        body: dict[str, Any] = {
-            "chat_id": chat_id,
-            "text": formatted,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True,
-        }
+        body["text"] = self._format_text(padded_text)
+        body["parse_mode"] = "HTML"
+        body["disable_web_page_preview"] = True
         if keyboard is not None:
             body["reply_markup"] = {"inline_keyboard": keyboard}
-        res = self.tg_api("sendMessage", body)
-        if res.get("ok"):
-            return
-
-        # Fallback for parse/style incompatibilities.
-        body_fallback: dict[str, Any] = {
-            "chat_id": chat_id,
-            "text": formatted,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True,
-        }
+        yield body
         if keyboard is not None:
-            body_fallback["reply_markup"] = {"inline_keyboard": self._sanitize_keyboard(keyboard)}
-        fallback_res = self.tg_api("sendMessage", body_fallback)
-        if fallback_res.get("ok"):
-            return
-
-        plain_body: dict[str, Any] = {
-            "chat_id": chat_id,
-            "text": padded_text.replace("__SPACER__", " "),
-            "disable_web_page_preview": True,
-        }
-        if keyboard is not None:
-            plain_body["reply_markup"] = {"inline_keyboard": self._sanitize_keyboard(keyboard)}
-        self.tg_api("sendMessage", plain_body)
+            # Keyboards from _btn are already clean; don't resend an identical request.
+            clean = self._sanitize_keyboard(keyboard)
+            if clean != keyboard:
+                body["reply_markup"] = {"inline_keyboard": clean}
+                yield body
+        del body["parse_mode"]
+        body["text"] = padded_text.replace("__SPACER__", " ")
+        yield body
 
     def _is_tg_not_modified(self, response: dict[str, Any] | Any) -> bool:
         if not isinstance(response, dict):
@@ -1145,50 +1445,20 @@ class PanelBot:
     ) -> bool:
         if int(message_id or 0) <= 0:
             return False
-        padded_text = self._pad_text_for_keyboard(text, keyboard)
-        formatted = self._format_text(padded_text)
-
-        body: dict[str, Any] = {
-            "chat_id": chat_id,
-            "message_id": int(message_id),
-            "text": formatted,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True,
-        }
-        if keyboard is not None:
-            body["reply_markup"] = {"inline_keyboard": keyboard}
-        result = self.tg_api("editMessageText", body)
-        if result.get("ok") or self._is_tg_not_modified(result):
-            return True
-
-        body_fallback: dict[str, Any] = {
-            "chat_id": chat_id,
-            "message_id": int(message_id),
-            "text": formatted,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True,
-        }
-        if keyboard is not None:
-            body_fallback["reply_markup"] = {"inline_keyboard": self._sanitize_keyboard(keyboard)}
-        retry = self.tg_api("editMessageText", body_fallback)
-        if retry.get("ok") or self._is_tg_not_modified(retry):
-            return True
-
-        plain_body: dict[str, Any] = {
-            "chat_id": chat_id,
-            "message_id": int(message_id),
-            "text": padded_text.replace("__SPACER__", " "),
-            "disable_web_page_preview": True,
-        }
-        if keyboard is not None:
-            plain_body["reply_markup"] = {"inline_keyboard": self._sanitize_keyboard(keyboard)}
-        retry_plain = self.tg_api("editMessageText", plain_body)
-        return bool(retry_plain.get("ok") or self._is_tg_not_modified(retry_plain))
+        res = self._queue_send(chat_id, lambda: self._edit_text_now(chat_id, message_id, text, keyboard)).result()
+        return bool(res.get("ok")) or self._is_tg_not_modified(res)
 
     def edit_text(self, chat_id: int | str, message_id: int, text: str, keyboard: list[list[dict[str, Any]]] | None = None) -> None:
-        ok = self.edit_text_strict(chat_id, message_id, text, keyboard)
-        if not ok:
+        if int(message_id or 0) <= 0:
             self.send_text(chat_id, text, keyboard)
+            return
+        self._queue_send(chat_id, lambda: self._edit_or_send_now(chat_id, message_id, text, keyboard))
+
+    def _edit_or_send_now(self, chat_id: int | str, message_id: int, text: str, keyboard: list[list[dict[str, Any]]] | None) -> dict[str, Any]:
+        res = self._edit_text_now(chat_id, message_id, text, keyboard)
+        if res.get("ok") or self._is_tg_not_modified(res) or self._retry_after(res):
+            return res
+        return self._send_text_now(chat_id, text, keyboard)
 
     def answer_callback(self, callback_id: str, text: str = "") -> None:
         payload = {"callback_query_id": callback_id}
@@ -1203,13 +1473,18 @@ class PanelBot:
         self.tg_api("deleteMessage", {"chat_id": chat_id, "message_id": int(message_id)})
 
     def send_document(self, chat_id: int | str, file_path: Path, caption: str = "") -> None:
+        # Waits for delivery: callers remove the file once this returns.
+        self._queue_send(chat_id, lambda: self._send_document_now(chat_id, file_path, caption)).result()
+
+    def _send_document_now(self, chat_id: int | str, file_path: Path, caption: str) -> dict[str, Any]:
         url = f"https://api.telegram.org/bot{self.bot_token}/sendDocument"
         try:
             with file_path.open("rb") as f:
-                data = {"chat_id": str(chat_id), "caption": caption}
-                requests.post(url, data=data, files={"document": f}, timeout=60)
+                body = _MultipartFileBody({"chat_id": str(chat_id), "caption": caption}, "document", file_path.name, f)
+                res = self.http.post(url, data=body, headers={"Content-Type": body.content_type}, timeout=60).json()
         except Exception:
-            self.send_text(chat_id, "فشل إرسال الملف.")
+            return self._send_text_now(chat_id, "فشل إرسال الملف.")
+        return res if isinstance(res, dict) else {"ok": False}
 
     def get_file_content(self, file_id: str) -> str:
         res = self.tg_api("getFile", {"file_id": file_id})
@@ -1220,7 +1495,7 @@ class PanelBot:
             return ""
         url = f"https://api.telegram.org/file/bot{self.bot_token}/{file_path}"
         try:
-            r = requests.get(url, timeout=40)
+            r = self.http.get(url, timeout=40)
             if r.status_code != 200:
                 return ""
             return r.text
@@ -1243,7 +1518,7 @@ class PanelBot:
                     return tok
         return ""
 
-    def api_post(self, path: str, body: dict[str, Any], timeout: int = 60) -> tuple[bool, Any, str]:
+    def api_post(self, path: str, body: dict[str, Any], timeout: int = 60, retry_auth: bool = True) -> tuple[bool, Any, str]:
         api_key = str(self.get_runtime_api_key() or "").strip()
         if not api_key:
             return False, None, "api key missing"
@@ -1251,7 +1526,7 @@ class PanelBot:
         # API v3 expects X-API-Key header for /api/v1 endpoints.
         headers = {"X-API-Key": api_key}
         try:
-            r = requests.post(url, json=body, headers=headers, timeout=timeout)
+            r = self.http.post(url, json=body, headers=headers, timeout=timeout)
         except requests.RequestException as exc:
             return False, None, str(exc)
 
@@ -1272,6 +1547,14 @@ class PanelBot:
                 return str(obj.get("message") or obj.get("error") or detail or obj).strip()
             return str(obj)
 
+        token = str(body.get("token") or "")
+        if r.status_code in AUTH_FAILURE_STATUSES and token:
+            # Sessions can expire server-side before the cache does: log in again once and retry.
+            owner = self._drop_token(token)
+            if retry_auth and owner is not None:
+                new_token, _login_err = self.api_login(*owner)
+                if new_token and new_token != token:
+                    return self.api_post(path, {**body, "token": new_token}, timeout=timeout, retry_auth=False)
         if r.status_code != 200:
             msg = _err_text(payload)
             return False, payload, f"status={r.status_code} {msg}"
@@ -1285,13 +1568,32 @@ class PanelBot:
                 return False, payload, msg or f"status={status_val}"
         return True, payload, ""
 
+    def _drop_token(self, token: str) -> tuple[str, str] | None:
+        with self._token_lock:
+            for key, entry in list(self.token_cache.items()):
+                if entry.data == token:
+                    del self.token_cache[key]
+            return self._token_owners.get(token)
+
     def api_login(self, email: str, password: str) -> tuple[str | None, str]:
+        key = (self.api_base, email, password)
+        with self._token_lock:
+            cached = self.token_cache.get(key)
+        if cached is not None and time.monotonic() - cached.at <= TOKEN_CACHE_TTL_SECONDS:
+            return cached.data, ""
         last_err = ""
         for attempt in range(1, 4):
             ok, payload, err = self.api_post("/api/v1/auth/login", {"email": email, "password": password}, timeout=60)
             if ok:
                 token = self._extract_token(payload)
                 if token:
+                    with self._token_lock:
+                        self.token_cache[key] = TTLEntry(time.monotonic(), token)
+                        owners = self._token_owners
+                        owners[token] = (email, password)
+                        # Oldest first; old tokens stay long enough for concurrent callers to renew them.
+                        while len(owners) > TOKEN_OWNERS_MAX:
+                            del owners[next(iter(owners))]
                     return token, ""
                 last_err = "login succeeded without token"
             else:
@@ -1313,12 +1615,19 @@ class PanelBot:
             )
         return self._tr(user_id, fallback_ar, fallback_en)
 
+    def _fan_out(self, fn: Callable[[Any], Any], items: list[Any]) -> list[Any]:
+        # Per-account API calls are network bound; run them side by side, results in input order.
+        if len(items) < 2:
+            return [fn(item) for item in items]
+        return list(self.fetch_pool.map(fn, items))
+
     def resolve_targets(self) -> list[tuple[str, str]]:
         self.last_targets_error = ""
         targets: list[tuple[str, str]] = []
         login_errors: list[str] = []
-        for acc in self.active_accounts():
-            token, err = self.api_login(acc["email"], acc["password"])
+        accounts = self.active_accounts()
+        logins = self._fan_out(lambda acc: self.api_login(acc["email"], acc["password"]), accounts)
+        for acc, (token, err) in zip(accounts, logins):
             if token:
                 targets.append((acc["name"], token))
             elif err:
@@ -1359,25 +1668,27 @@ class PanelBot:
         back_text: str = "رجوع",
     ) -> list[list[dict[str, Any]]]:
         # توزيع ثابت: 1 ثم 2 ثم 2 ثم 2 ثم 1
-        pattern = [1, 2, 2, 2, 1]
-        rows: list[list[dict[str, Any]]] = []
-        idx = 0
-        step = 0
         total = len(buttons)
-        while idx < total:
-            take = pattern[step % len(pattern)]
-            rows.append(buttons[idx : idx + take])
-            idx += take
-            step += 1
+        rows = [
+            buttons[base + start : base + end]
+            for base in range(0, total, PATTERN_CYCLE)
+            for start, end in PATTERN_SLICES
+            if base + start < total
+        ]
         if back_callback:
-            rows.append([self._btn(back_text, callback_data=back_callback, style="primary")])
+            # Back buttons are identical across renders; share one dict per (label, target).
+            back = self._back_btns.get((back_text, back_callback))
+            if back is None:
+                back = self._btn(back_text, callback_data=back_callback, style="primary")
+                self._back_btns[(back_text, back_callback)] = back
+            rows.append([back])
         return rows
 
     def _q(self, title: str) -> str:
-        return f"__BLOCK__ {title}"
+        return f"{BLOCK_PREFIX}{title}"
 
     def _show_loading(self, chat_id: int | str, message_id: int, title: str, message: str, back_callback: str, user_id: int | None = None) -> None:
-        back_label = "رجوع" if user_id is None else self._tr(user_id, "رجوع", "Back")
+        back_label = "رجوع" if user_id is None else self._t(user_id, "back")
         self.edit_text(
             chat_id,
             message_id,
@@ -1389,24 +1700,29 @@ class PanelBot:
         self.executor.submit(fn, *args, **kwargs)
 
     def _traffic_key(self, app_name: str) -> str:
-        return (app_name or "").strip().lower()
+        return (app_name or "").strip().casefold()
 
     def _set_user_lang(self, user_id: int, language_code: str | None) -> None:
         override = self.get_user_lang_override(user_id)
         if override:
-            self.user_lang[int(user_id)] = override
+            self.user_session(user_id).set_lang(override)
             return
         code = str(language_code or "").strip().lower()
         if not code:
             code = "ar"
-        self.user_lang[int(user_id)] = code
+        self.user_session(user_id).set_lang(code)
 
     def _is_ar(self, user_id: int) -> bool:
-        code = self.user_lang.get(int(user_id), "")
-        return code.startswith("ar")
+        sess = self.sessions.get(user_id)
+        return sess is not None and sess.is_ar
 
     def _tr(self, user_id: int, ar_text: str, en_text: str) -> str:
-        return ar_text if self._is_ar(user_id) else en_text
+        sess = self.sessions.get(user_id)
+        return ar_text if sess is not None and sess.is_ar else en_text
+
+    def _t(self, user_id: int, key: str) -> str:
+        sess = self.sessions.get(user_id)
+        return I18N["ar" if sess is not None and sess.is_ar else "en"][key]
 
     def _title_main(self, user_id: int) -> str:
         return self._q(self._tr(user_id, f"🧭 {MAIN_TITLE}", "🧭 ༺═════⇓ Control Panel ⇓═════༻"))
@@ -1431,31 +1747,31 @@ class PanelBot:
 
     def _set_user_traffic_rows(self, user_id: int, app_name: str, rows: list[dict[str, str]]) -> None:
         key = self._traffic_key(app_name)
-        self.user_traffic_cache.setdefault(int(user_id), {})[key] = rows
+        self.user_session(user_id).traffic[key] = rows
 
     def _get_user_traffic_rows(self, user_id: int, app_name: str) -> list[dict[str, str]] | None:
         key = self._traffic_key(app_name)
-        rows = self.user_traffic_cache.get(int(user_id), {}).get(key)
+        rows = self.user_session(user_id).traffic.get(key)
         if isinstance(rows, list):
             return rows
         return None
 
     def _set_user_numbers_rows(self, user_id: int, rows: list[dict[str, str]], scope: str = "all") -> None:
         key = str(scope or "all").strip().lower() or "all"
-        self.user_numbers_cache.setdefault(int(user_id), {})[key] = rows
+        self.user_session(user_id).numbers[key] = rows
 
     def _get_user_numbers_rows(self, user_id: int, scope: str = "all") -> list[dict[str, str]] | None:
         key = str(scope or "all").strip().lower() or "all"
-        rows = self.user_numbers_cache.get(int(user_id), {}).get(key)
+        rows = self.user_session(user_id).numbers.get(key)
         if isinstance(rows, list):
             return rows
         return None
 
     def _set_user_platforms_rows(self, user_id: int, rows: list[str]) -> None:
-        self.user_platforms_cache[int(user_id)] = [str(x) for x in rows]
+        self.user_session(user_id).platforms = [str(x) for x in rows]
 
     def _get_user_platforms_rows(self, user_id: int) -> list[str] | None:
-        rows = self.user_platforms_cache.get(int(user_id))
+        rows = self.user_session(user_id).platforms
         if isinstance(rows, list):
             return [str(x) for x in rows]
         return None
@@ -1572,49 +1888,16 @@ class PanelBot:
     def _operation_keyboard(self, op_id: str, user_id: int, running: bool) -> list[list[dict[str, Any]]]:
         if running:
             return [[self._btn(self._tr(user_id, "🛑 الغاء العملية", "🛑 Cancel Operation"), callback_data=f"op_cancel:{op_id}", style="danger")]]
-        return [[self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="main_menu", style="primary")]]
+        return [[self._btn(self._t(user_id, "back"), callback_data="main_menu", style="primary")]]
 
     def _send_progress_message(self, chat_id: int | str, text: str, keyboard: list[list[dict[str, Any]]]) -> int:
-        padded_text = self._pad_text_for_keyboard(text, keyboard)
-        formatted = self._format_text(padded_text)
-
-        attempts: list[dict[str, Any]] = []
-        attempts.append(
-            {
-                "chat_id": chat_id,
-                "text": formatted,
-                "parse_mode": "HTML",
-                "disable_web_page_preview": True,
-                "reply_markup": {"inline_keyboard": keyboard},
-            }
-        )
-        attempts.append(
-            {
-                "chat_id": chat_id,
-                "text": formatted,
-                "parse_mode": "HTML",
-                "disable_web_page_preview": True,
-                "reply_markup": {"inline_keyboard": self._sanitize_keyboard(keyboard)},
-            }
-        )
-        attempts.append(
-            {
-                "chat_id": chat_id,
-                "text": padded_text.replace("__SPACER__", " "),
-                "disable_web_page_preview": True,
-                "reply_markup": {"inline_keyboard": self._sanitize_keyboard(keyboard)},
-            }
-        )
-
-        for body in attempts:
-            res = self.tg_api("sendMessage", body)
-            if isinstance(res, dict) and res.get("ok"):
-                result = res.get("result") or {}
-                try:
-                    return int(result.get("message_id") or 0)
-                except Exception:
-                    return 0
-        return 0
+        res = self._queue_send(chat_id, lambda: self._send_text_now(chat_id, text, keyboard)).result()
+        if not res.get("ok"):
+            return 0
+        try:
+            return int((res.get("result") or {}).get("message_id") or 0)
+        except Exception:
+            return 0
 
     def _create_operation(self, user_id: int, chat_id: int | str, name: str, target: str, total: int) -> str:
         op_id = self._new_operation_id()
@@ -1794,7 +2077,7 @@ class PanelBot:
                 done = int(op.get("done", 0) or 0)
                 total = int(op.get("total", 0) or 0)
                 buttons.append(self._btn(f"{marker} {name} {done}/{total}", callback_data=f"op_show:{op_id}", style="primary"))
-        kb = self._pattern_rows(buttons, back_callback="main_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        kb = self._pattern_rows(buttons, back_callback="main_menu", back_text=self._t(user_id, "back"))
         self.edit_text(chat_id, message_id, "\n".join(lines), kb)
 
     def _is_api_callback(self, data: str) -> bool:
@@ -1847,27 +2130,37 @@ class PanelBot:
         )
         kb = [
             [self._btn(self._tr(user_id, "🔐 تعيين API Key", "🔐 Set API Key"), callback_data="var_set_api_key", style="success")],
-            [self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="vars_menu", style="primary")],
+            [self._btn(self._t(user_id, "back"), callback_data="vars_menu", style="primary")],
         ]
         self.edit_text(chat_id, message_id, text, kb)
 
+    @_static_keyboard
     def kb_numbers_scope(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "📋 عرض جميع الأرقام", "📋 Show All Numbers"), callback_data="numbers_show_all", style="primary"),
             self._btn(self._tr(user_id, "🎯 عرض مخصص (حسب الحساب)", "🎯 Custom View (by account)"), callback_data="numbers_show_custom", style="primary"),
         ]
-        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._t(user_id, "back"))
+
+    def _account_name_index(self) -> list[str]:
+        # Active account names, rebuilt only when the accounts store changes.
+        rev = json_revision(ACCOUNTS_FILE)
+        cached = self._account_names_cache
+        if cached is None or cached[0] != rev:
+            names: list[str] = []
+            for row in self.active_accounts():
+                name = str(row.get("name") or "").strip()
+                if name:
+                    names.append(name)
+            cached = (rev, names)
+            self._account_names_cache = cached
+        return cached[1]
 
     def _active_account_names(self) -> list[str]:
-        names: list[str] = []
-        for row in self.active_accounts():
-            name = str(row.get("name") or "").strip()
-            if name:
-                names.append(name)
-        return names
+        return list(self._account_name_index())
 
     def _account_name_by_pick(self, pick: str) -> str:
-        names = self._active_account_names()
+        names = self._account_name_index()
         try:
             idx = int(str(pick).strip()) - 1
         except Exception:
@@ -1885,19 +2178,20 @@ class PanelBot:
     ) -> list[list[dict[str, Any]]]:
         names = self._active_account_names()
         if not names:
-            return [[self._btn(self._tr(user_id, "لا يوجد حسابات مفعلة.", "No active accounts."), callback_data="noop", style="danger")], [self._btn(self._tr(user_id, "رجوع", "Back"), callback_data=back_callback, style="primary")]]
+            return [[self._btn(self._tr(user_id, "لا يوجد حسابات مفعلة.", "No active accounts."), callback_data="noop", style="danger")], [self._btn(self._t(user_id, "back"), callback_data=back_callback, style="primary")]]
         buttons = [
             self._btn(f"👤 {name}", callback_data=f"{callback_prefix}:{idx}", style="primary")
             for idx, name in enumerate(names, start=1)
         ]
-        return self._pattern_rows(buttons, back_callback=back_callback, back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback=back_callback, back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_numbers_request_mode(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "🎯 تحكم عادي (حساب واحد)", "🎯 Normal Mode (Single Account)"), callback_data="numbers_req_mode_normal", style="primary"),
             self._btn(self._tr(user_id, "🧩 تحكم متعدد (عدة حسابات)", "🧩 Multi Mode (Multi Accounts)"), callback_data="numbers_req_mode_multi", style="success"),
         ]
-        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._t(user_id, "back"))
 
     def kb_numbers_req_multi_accounts(self, user_id: int, selected: set[str] | None = None) -> list[list[dict[str, Any]]]:
         selected = selected or set()
@@ -1907,7 +2201,7 @@ class PanelBot:
             checked = "✅" if name in selected else "☑️"
             buttons.append(self._btn(f"{checked} {name}", callback_data=f"numbers_req_multi_toggle:{idx}", style="primary"))
         buttons.append(self._btn(self._tr(user_id, "✅ تم", "✅ Done"), callback_data="numbers_req_multi_done", style="success"))
-        return self._pattern_rows(buttons, back_callback="numbers_request", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_request", back_text=self._t(user_id, "back"))
 
     def _range_existing_count(
         self,
@@ -1919,7 +2213,8 @@ class PanelBot:
         target_range = str(range_name or "").strip().lower()
         if not target_range:
             return 0
-        rows = numbers_rows if isinstance(numbers_rows, list) else self.fetch_numbers()
+        # Counts feed the RANGE_MAX_TOTAL quota, so they come from live numbers, never the TTL cache.
+        rows = numbers_rows if isinstance(numbers_rows, list) else self.fetch_numbers(refresh=True)
         selected: set[str] = set()
         if account_names:
             selected = {str(x).strip().lower() for x in account_names if str(x).strip()}
@@ -2070,7 +2365,7 @@ class PanelBot:
                 continue
             grouped[rname] += 1
         store = self.load_ranges_store()
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = self._now_second_str()
         ranges = store.get("ranges") if isinstance(store.get("ranges"), dict) else {}
         for rname, entry in list(ranges.items()):
             if not isinstance(entry, dict):
@@ -2090,8 +2385,12 @@ class PanelBot:
             if enabled
             else self._tr(user_id, "زر جلب الاكواد : مغلق 🔴", "Fetch Codes: OFF 🔴")
         )
+        toggle_row = [self._btn(toggle_label, callback_data="toggle_fetch", style="success" if enabled else "danger")]
+        return [toggle_row] + self._kb_main_rows(user_id)
+
+    @_static_keyboard
+    def _kb_main_rows(self, user_id: int) -> list[list[dict[str, Any]]]:
         return [
-            [self._btn(toggle_label, callback_data="toggle_fetch", style="success" if enabled else "danger")],
             [
                 self._btn(self._tr(user_id, "💬 الرسائل", "💬 Messages"), callback_data="messages_menu", style="primary"),
                 self._btn(self._tr(user_id, "⚙️ الإعدادات", "⚙️ Settings"), callback_data="vars_menu", style="primary"),
@@ -2114,21 +2413,26 @@ class PanelBot:
             [self._btn(self._tr(user_id, "🆘 المساعدة", "🆘 Help"), url="https://t.me/XET_F", style="primary")],
         ]
 
+    @_static_keyboard
     def kb_messages_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "📄 عرض الرسائل", "📄 Show Messages"), callback_data="messages_show", style="primary"),
             self._btn(self._tr(user_id, "🗑️ حذف الرسائل", "🗑️ Delete Messages"), callback_data="messages_delete_confirm", style="danger"),
         ]
-        return self._pattern_rows(buttons, back_callback="main_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="main_menu", back_text=self._t(user_id, "back"))
 
     def kb_vars_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
-        if not self.has_full_vars_access(user_id):
+        return self._kb_vars_rows(user_id, self.has_full_vars_access(user_id))
+
+    @_static_keyboard
+    def _kb_vars_rows(self, user_id: int, full_access: bool) -> list[list[dict[str, Any]]]:
+        if not full_access:
             buttons = [
                 self._btn(self._tr(user_id, "🗓️ Start Date", "🗓️ Start Date"), callback_data="var_startdate_menu", style="primary"),
                 self._btn(self._tr(user_id, "🌐 تعيين API URL", "🌐 Set API URL"), callback_data="var_set_api_url", style="primary"),
                 self._btn(self._tr(user_id, "🔐 API Key", "🔐 API Key"), callback_data="var_set_api_key", style="success"),
             ]
-            return self._pattern_rows(buttons, back_callback="main_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            return self._pattern_rows(buttons, back_callback="main_menu", back_text=self._t(user_id, "back"))
 
         buttons = [
             self._btn(self._tr(user_id, "🌐 API URL", "🌐 API URL"), callback_data="var_set_api_url", style="primary"),
@@ -2141,10 +2445,13 @@ class PanelBot:
             self._btn(self._tr(user_id, "📢 إعدادات النشر", "📢 Publish Settings"), callback_data="publish_settings_menu", style="primary"),
             self._btn(self._tr(user_id, "🔁 إعادة تشغيل البوت", "🔁 Restart Bot"), callback_data="var_restart", style="danger"),
         ]
-        return self._pattern_rows(buttons, back_callback="main_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="main_menu", back_text=self._t(user_id, "back"))
 
     def kb_startdate_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
-        auto_enabled = self.is_start_date_auto_today_enabled()
+        return self._kb_startdate_rows(user_id, self.is_start_date_auto_today_enabled())
+
+    @_static_keyboard
+    def _kb_startdate_rows(self, user_id: int, auto_enabled: bool) -> list[list[dict[str, Any]]]:
         toggle_label = (
             self._tr(user_id, "🟢 إيقاف التوقيت التلقائي", "🟢 Disable Auto Daily Time")
             if auto_enabled
@@ -2154,16 +2461,18 @@ class PanelBot:
             self._btn(self._tr(user_id, "✍️ كتابة يدوي", "✍️ Manual Input"), callback_data="var_startdate_manual", style="primary"),
             self._btn(toggle_label, callback_data="var_startdate_toggle", style="success" if not auto_enabled else "danger"),
         ]
-        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_admins_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "➕ إضافة أدمن", "➕ Add Admin"), callback_data="var_admin_add", style="success"),
             self._btn(self._tr(user_id, "🗑️ حذف أدمن", "🗑️ Delete Admin"), callback_data="var_admin_delete_menu", style="danger"),
             self._btn(self._tr(user_id, "📄 عرض الأدمن", "📄 Show Admins"), callback_data="var_admin_list", style="primary"),
         ]
-        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_bots_mgmt_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "➕ إضافة بوت", "➕ Add Bot"), callback_data="var_bot_add", style="success"),
@@ -2172,30 +2481,34 @@ class PanelBot:
             self._btn(self._tr(user_id, "🗑️ حذف بوت", "🗑️ Delete Bot"), callback_data="var_bot_delete_menu", style="danger"),
             self._btn(self._tr(user_id, "📄 عرض البوتات", "📄 Show Bots"), callback_data="var_bot_list", style="primary"),
         ]
-        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_bot_admins_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "➕ إضافة أدمن", "➕ Add Admin"), callback_data="var_bot_admin_add_menu", style="success"),
             self._btn(self._tr(user_id, "🗑️ حذف أدمن", "🗑️ Delete Admin"), callback_data="var_bot_admin_delete_bot_menu", style="danger"),
         ]
-        return self._pattern_rows(buttons, back_callback="var_bots_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="var_bots_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_bot_limits_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "➕ تحديد حد", "➕ Set Limit"), callback_data="var_bot_limit_set_menu", style="success"),
             self._btn(self._tr(user_id, "✏️ تعديل الحد", "✏️ Edit Limit"), callback_data="var_bot_limit_edit_menu", style="primary"),
             self._btn(self._tr(user_id, "📄 عرض الحدود", "📄 Show Limits"), callback_data="var_bot_limits_show", style="primary"),
         ]
-        return self._pattern_rows(buttons, back_callback="var_bots_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="var_bots_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_publish_settings_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "🧩 الخدمات", "🧩 Services"), callback_data="publish_services_menu", style="primary"),
             self._btn(self._tr(user_id, "🌍 البلدان", "🌍 Countries"), callback_data="publish_countries_menu", style="primary"),
         ]
-        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="vars_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_publish_services_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "📄 عرض", "📄 Show"), callback_data="publish_services_show", style="primary"),
@@ -2203,8 +2516,9 @@ class PanelBot:
             self._btn(self._tr(user_id, "✏️ تعديل", "✏️ Edit"), callback_data="publish_services_edit_menu", style="primary"),
             self._btn(self._tr(user_id, "🗑️ حذف", "🗑️ Delete"), callback_data="publish_services_delete_menu", style="danger"),
         ]
-        return self._pattern_rows(buttons, back_callback="publish_settings_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="publish_settings_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_publish_countries_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "📄 عرض", "📄 Show"), callback_data="publish_countries_show", style="primary"),
@@ -2212,11 +2526,13 @@ class PanelBot:
             self._btn(self._tr(user_id, "✏️ تعديل", "✏️ Edit"), callback_data="publish_countries_edit_menu", style="primary"),
             self._btn(self._tr(user_id, "🗑️ حذف", "🗑️ Delete"), callback_data="publish_countries_delete_menu", style="danger"),
         ]
-        return self._pattern_rows(buttons, back_callback="publish_settings_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="publish_settings_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_back_main(self, user_id: int) -> list[list[dict[str, Any]]]:
-        return [[self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="main_menu", style="primary")]]
+        return [[self._btn(self._t(user_id, "back"), callback_data="main_menu", style="primary")]]
 
+    @_static_keyboard
     def kb_numbers_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "📋 عرض الارقام", "📋 Show Numbers"), callback_data="numbers_show", style="primary"),
@@ -2227,20 +2543,23 @@ class PanelBot:
         ]
         return self._pattern_rows(buttons, back_callback="main_menu")
 
+    @_static_keyboard
     def kb_numbers_delete_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "🗑️ حذف مخصص", "🗑️ Custom Delete"), callback_data="numbers_delete_manual", style="danger"),
             self._btn(self._tr(user_id, "💥 حذف كل الأرقام", "💥 Delete All Numbers"), callback_data="numbers_delete_all_confirm", style="danger"),
         ]
-        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_ranges_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "📄 عرض الرينجات", "📄 Show Ranges"), callback_data="ranges_show", style="primary"),
             self._btn(self._tr(user_id, "➕ إضافة رينجات", "➕ Add Ranges"), callback_data="ranges_add", style="success"),
         ]
-        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._t(user_id, "back"))
 
+    @_static_keyboard
     def kb_accounts_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "➕ إضافة حساب", "➕ Add Account"), callback_data="acc_add", style="success"),
@@ -2250,6 +2569,7 @@ class PanelBot:
         ]
         return self._pattern_rows(buttons, back_callback="main_menu")
 
+    @_static_keyboard
     def kb_groups_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "➕ إضافة جروب", "➕ Add Group"), callback_data="grp_add", style="success"),
@@ -2258,13 +2578,14 @@ class PanelBot:
         ]
         return self._pattern_rows(buttons, back_callback="main_menu")
 
+    @_static_keyboard
     def kb_export_menu(self, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
             self._btn(self._tr(user_id, "📦 تصدير شامل", "📦 Full Export"), callback_data="exp_full", style="primary"),
             self._btn(self._tr(user_id, "🏷️ تصدير حسب الرينج", "🏷️ Export by Range"), callback_data="exp_by_range", style="primary"),
             self._btn(self._tr(user_id, "🌍 تصدير حسب الدولة", "🌍 Export by Country"), callback_data="exp_by_country", style="primary"),
         ]
-        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_menu", back_text=self._t(user_id, "back"))
 
     def kb_export_formats(self, prefix: str, user_id: int) -> list[list[dict[str, Any]]]:
         buttons = [
@@ -2272,7 +2593,7 @@ class PanelBot:
             self._btn("CSV", callback_data=f"{prefix}:csv", style="primary"),
             self._btn("JSON", callback_data=f"{prefix}:json", style="primary"),
         ]
-        return self._pattern_rows(buttons, back_callback="numbers_export_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_export_menu", back_text=self._t(user_id, "back"))
 
     def _export_field_label(self, user_id: int, field: str) -> str:
         if field == "number":
@@ -2307,70 +2628,80 @@ class PanelBot:
             ),
             self._btn(self._tr(user_id, "✅ تم", "✅ Done"), callback_data=f"exp_field_done:{scope}", style="success"),
         ]
-        return self._pattern_rows(buttons, back_callback="numbers_export_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+        return self._pattern_rows(buttons, back_callback="numbers_export_menu", back_text=self._t(user_id, "back"))
 
     # -------------------------- data fetch --------------------------
+    def _fresh(self, entry: TTLEntry | None) -> bool:
+        # Monotonic clock: wall-clock jumps (NTP, manual changes) cannot stretch or cut a TTL.
+        return entry is not None and time.monotonic() - entry.at <= self.cache_ttl_seconds
+
+    def invalidate_platforms_cache(self) -> None:
+        self.platforms_cache = None
+
+    def invalidate_numbers_cache(self) -> None:
+        self.numbers_cache = {}
+
+    def invalidate_api_caches(self) -> None:
+        # Everything fetched across the accounts; stale once the account set or the API endpoint changes.
+        self.invalidate_platforms_cache()
+        self.traffic_cache = {}
+        self.invalidate_numbers_cache()
+        self.balances_cache = None
+
     def fetch_platforms(self, refresh: bool = False) -> list[str]:
-        now = time.time()
         if not refresh:
-            cached = self.platforms_cache.get("data")
-            cached_at = float(self.platforms_cache.get("at") or 0.0)
-            if isinstance(cached, list) and cached and (now - cached_at) <= self.cache_ttl_seconds:
-                return [str(x) for x in cached]
+            cached = self.platforms_cache
+            if self._fresh(cached) and cached.data:
+                return list(cached.data)
 
         targets = self.resolve_targets()
-        names: set[str] = set()
-        for _name, token in targets:
-            ok, payload, _err = self.api_post("/api/v1/applications/available", {"token": token}, timeout=90)
+        # lower-cased name -> first spelling seen, so sorting needs no per-item key function.
+        names: dict[str, str] = {}
+        responses = self._fan_out(
+            lambda t: self.api_post("/api/v1/applications/available", {"token": t[1]}, timeout=90), targets
+        )
+        for ok, payload, _err in responses:
             if not ok:
                 continue
             rows = self.extract_list_payload(payload)
             for row in rows:
-                if isinstance(row, dict):
-                    label = str(row.get("name") or row.get("app_name") or row.get("key") or row.get("service_name") or "").strip()
-                else:
-                    label = str(row).strip()
+                label = str(_pick(row, PLATFORM_LABEL_KEYS, "")).strip() if isinstance(row, dict) else str(row).strip()
                 if label:
-                    names.add(label)
-        out = sorted(names, key=lambda x: x.lower())
-        self.platforms_cache = {"at": now, "data": out}
-        return out
+                    names.setdefault(label.lower(), label)
+        out = [names[k] for k in sorted(names)]
+        self.platforms_cache = TTLEntry(time.monotonic(), out)
+        return list(out)
 
     def fetch_traffic(self, app_name: str, refresh: bool = False) -> list[dict[str, str]]:
         key = self._traffic_key(app_name)
-        now = time.time()
         if not refresh:
-            cached_row = self.traffic_cache.get(key)
-            if isinstance(cached_row, dict):
-                cached_at = float(cached_row.get("at") or 0.0)
-                cached_data = cached_row.get("data")
-                if isinstance(cached_data, list) and (now - cached_at) <= self.cache_ttl_seconds:
-                    return [x for x in cached_data if isinstance(x, dict)]
+            cached = self.traffic_cache.get(key)
+            if self._fresh(cached):
+                return list(cached.data)
 
         targets = self.resolve_targets()
         merged: dict[str, dict[str, Any]] = {}
 
-        for _name, token in targets:
-            ok, payload, _err = self.api_post(
-                "/api/v1/traffic/services",
-                {"token": token, "app_name": app_name},
-                timeout=120,
-            )
+        responses = self._fan_out(
+            lambda t: self.api_post("/api/v1/traffic/services", {"token": t[1], "app_name": app_name}, timeout=120),
+            targets,
+        )
+        merged_setdefault = merged.setdefault
+        for ok, payload, _err in responses:
             if not ok:
                 continue
             rows = self.extract_list_payload(payload)
             for row in rows:
                 if not isinstance(row, dict):
                     continue
-                range_name = str(row.get("range") or row.get("range_name") or row.get("termination") or "UNKNOWN").strip() or "UNKNOWN"
-                cnt_raw = row.get("count") or row.get("total") or row.get("messages") or 0
+                range_name = str(_pick(row, RANGE_KEYS, "UNKNOWN")).strip() or "UNKNOWN"
                 try:
-                    cnt = int(str(cnt_raw).strip())
+                    cnt = int(str(_pick(row, COUNT_KEYS, 0)).strip())
                 except Exception:
                     cnt = 0
-                last = str(row.get("last_message_time") or row.get("updated_at") or row.get("last") or "-").strip() or "-"
+                last = str(_pick(row, LAST_SEEN_KEYS, "-")).strip() or "-"
 
-                bucket = merged.setdefault(range_name, {"range": range_name, "count": 0, "last": "-"})
+                bucket = merged_setdefault(range_name, {"range": range_name, "count": 0, "last": "-"})
                 bucket["count"] += cnt
                 if bucket["last"] == "-" and last != "-":
                     bucket["last"] = last
@@ -2378,62 +2709,77 @@ class PanelBot:
         out = list(merged.values())
         out.sort(key=lambda x: int(x.get("count") or 0), reverse=True)
         final_rows = [{"range": str(x["range"]), "count": str(x["count"]), "last": str(x["last"])} for x in out]
-        self.traffic_cache[key] = {"at": now, "data": final_rows}
-        return final_rows
+        self.traffic_cache[key] = TTLEntry(time.monotonic(), final_rows)
+        return list(final_rows)
+
+    def fetch_numbers(self, account_name: str | None = None, refresh: bool = False) -> list[dict[str, str]]:
+        cache_key = (account_name or "__ALL__").strip().casefold()
+        if refresh:
+            # Numbers changed upstream, so every account scope is stale, not only this one.
+            self.invalidate_numbers_cache()
+        else:
+            cached = self.numbers_cache.get(cache_key)
+            if self._fresh(cached):
+                return list(cached.data)
 
-    def fetch_numbers(self, account_name: str | None = None) -> list[dict[str, str]]:
         targets = self.resolve_targets()
         if account_name:
-            target_name = str(account_name).strip().lower()
-            targets = [row for row in targets if str(row[0]).strip().lower() == target_name]
-        merged: list[dict[str, str]] = []
-        seen: set[str] = set()
-
-        for account_name, token in targets:
-            ok, payload, _err = self.api_post("/api/v1/numbers/announce", {"token": token}, timeout=120)
-            if not ok:
-                continue
-            rows = self.extract_list_payload(payload)
+            target_name = str(account_name).strip().casefold()
+            targets = [row for row in targets if row[0].casefold() == target_name]
+        responses = self._fan_out(lambda t: self.api_post("/api/v1/numbers/announce", {"token": t[1]}, timeout=120), targets)
+        rows_per_account = [
+            (account_name, self.extract_list_payload(payload))
+            for (account_name, _token), (ok, payload, _err) in zip(targets, responses)
+            if ok
+        ]
+        # One dict does dedup and keeps first-seen order; tuple keys avoid building a joined string per row.
+        merged: dict[tuple[str, str, str, str], dict[str, str]] = {}
+        for account_name, rows in rows_per_account:
             for row in rows:
                 if not isinstance(row, dict):
                     continue
-                number = str(row.get("number") or row.get("phone") or row.get("msisdn") or row.get("mobile") or "").strip()
-                range_name = str(row.get("range") or row.get("range_name") or row.get("termination") or "UNKNOWN").strip() or "UNKNOWN"
-                id_value = str(row.get("id") or row.get("number_id") or row.get("uid") or number).strip()
-                key = f"{account_name}|{number}|{range_name}|{id_value}"
-                if key in seen:
+                number = str(_pick(row, NUMBER_KEYS, "")).strip()
+                range_name = str(_pick(row, RANGE_KEYS, "UNKNOWN")).strip() or "UNKNOWN"
+                id_value = str(_pick(row, NUMBER_ID_KEYS, number)).strip()
+                key = (account_name, number, range_name, id_value)
+                if key in merged:
                     continue
-                seen.add(key)
-                merged.append({"number": number, "range": range_name, "id": id_value, "account": account_name})
+                merged[key] = {"number": number, "range": range_name, "id": id_value, "account": account_name}
 
-        return merged
+        out = list(merged.values())
+        self.numbers_cache[cache_key] = TTLEntry(time.monotonic(), out)
+        return list(out)
 
-    def fetch_balances(self) -> list[dict[str, str]]:
-        out: list[dict[str, str]] = []
-        for acc in self.active_accounts():
-            token, err = self.api_login(acc["email"], acc["password"])
-            if not token:
-                out.append({"name": acc["name"], "email": acc["email"], "balance": "login failed", "err": err})
-                continue
-            ok, payload, req_err = self.api_post("/api/v1/balance", {"token": token}, timeout=60)
-            if not ok:
-                out.append({"name": acc["name"], "email": acc["email"], "balance": "error", "err": req_err})
-                continue
+    def fetch_balances(self, refresh: bool = False) -> list[dict[str, str]]:
+        if not refresh:
+            cached = self.balances_cache
+            if self._fresh(cached):
+                return list(cached.data)
+        out = self._fan_out(self._fetch_balance, self.active_accounts())
+        self.balances_cache = TTLEntry(time.monotonic(), out)
+        return list(out)
+
+    def _fetch_balance(self, acc: dict[str, Any]) -> dict[str, str]:
+        token, err = self.api_login(acc["email"], acc["password"])
+        if not token:
+            return {"name": acc["name"], "email": acc["email"], "balance": "login failed", "err": err}
+        ok, payload, req_err = self.api_post("/api/v1/balance", {"token": token}, timeout=60)
+        if not ok:
+            return {"name": acc["name"], "email": acc["email"], "balance": "error", "err": req_err}
 
-            balance: str = "-"
-            if isinstance(payload, (int, float, str)):
-                balance = str(payload)
-            elif isinstance(payload, dict):
-                probe = payload
-                for key in ("data", "result"):
-                    if isinstance(probe.get(key), dict):
-                        probe = probe[key]
-                for key in ("balance", "wallet", "credit", "amount"):
-                    if key in probe:
-                        balance = str(probe.get(key))
-                        break
-            out.append({"name": acc["name"], "email": acc["email"], "balance": balance, "err": ""})
-        return out
+        balance: str = "-"
+        if isinstance(payload, (int, float, str)):
+            balance = str(payload)
+        elif isinstance(payload, dict):
+            probe = payload
+            for key in ("data", "result"):
+                if isinstance(probe.get(key), dict):
+                    probe = probe[key]
+            for key in ("balance", "wallet", "credit", "amount"):
+                if key in probe:
+                    balance = str(probe.get(key))
+                    break
+        return {"name": acc["name"], "email": acc["email"], "balance": balance, "err": ""}
 
     # -------------------------- range request / delete --------------------------
     def range_entry(self, store: dict[str, Any], range_name: str) -> dict[str, Any]:
@@ -2479,6 +2825,7 @@ class PanelBot:
             range_name,
             account_name=account_name if account_name else None,
             account_names=selected_names if selected_names else None,
+            numbers_rows=self.fetch_numbers(refresh=True),
         )
         last_live_done = 0
         remaining = max_total - existing_before
@@ -2494,8 +2841,8 @@ class PanelBot:
 
         targets = self.resolve_targets()
         if selected_names:
-            names_lc = {x.lower() for x in selected_names}
-            targets = [row for row in targets if str(row[0]).strip().lower() in names_lc]
+            names_cf = {x.casefold() for x in selected_names}
+            targets = [row for row in targets if row[0].casefold() in names_cf]
         elif not account_name and len(targets) > 1:
             # Default to a single account when no account is explicitly selected.
             # This avoids sending multiple API requests for one user action.
@@ -2559,7 +2906,7 @@ class PanelBot:
                 need_sync = (not ok) or (now_ts - last_live_sync_at >= 10.0)
                 if need_sync:
                     try:
-                        live_rows = self.fetch_numbers()
+                        live_rows = self.fetch_numbers(refresh=True)
                         existing_now = self._range_existing_count(
                             range_name,
                             account_name=account_name if account_name else None,
@@ -2578,14 +2925,14 @@ class PanelBot:
             requested_numbers = success_count
             if requested_numbers > 0:
                 entry["requested_total"] = int(entry.get("requested_total", 0)) + requested_numbers
-                entry["last_requested_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                entry["last_requested_at"] = self._now_second_str()
                 accounts = entry.get("accounts")
                 if not isinstance(accounts, dict):
                     accounts = {}
                     entry["accounts"] = accounts
                 row = accounts.get(name) if isinstance(accounts.get(name), dict) else {}
                 row["requested_total"] = int(row.get("requested_total", 0) or 0) + requested_numbers
-                row["last_requested_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                row["last_requested_at"] = self._now_second_str()
                 accounts[name] = row
                 total_success += requested_numbers
                 if operation_id:
@@ -2593,7 +2940,7 @@ class PanelBot:
             elif operation_id:
                 # If API reports failure but site shows numbers, sync from live data to avoid stuck 0 progress.
                 try:
-                    live_rows = self.fetch_numbers()
+                    live_rows = self.fetch_numbers(refresh=True)
                     existing_now = self._range_existing_count(
                         range_name,
                         account_name=account_name if account_name else None,
@@ -2629,7 +2976,7 @@ class PanelBot:
                 break
 
         self.save_ranges_store(store)
-        live_rows_after = self.fetch_numbers()
+        live_rows_after = self.fetch_numbers(refresh=True)
         existing_after = self._range_existing_count(
             range_name,
             account_name=account_name if account_name else None,
@@ -2674,7 +3021,7 @@ class PanelBot:
             )
 
         # Map provided numbers to number IDs when possible.
-        current_rows = self.fetch_numbers()
+        current_rows = self.fetch_numbers(refresh=True)
         number_to_id: dict[str, str] = {}
         id_to_account: dict[str, str] = {}
         for row in current_rows:
@@ -2980,18 +3327,18 @@ class PanelBot:
 
             nav_row: list[dict[str, Any]] = []
             if page > 1:
-                nav_row.append(self._btn(self._tr(user_id, "⬅️ السابق", "⬅️ Prev"), callback_data=f"platforms_nav:{page-1}", style="danger"))
+                nav_row.append(self._btn(self._t(user_id, "prev"), callback_data=f"platforms_nav:{page-1}", style="danger"))
             else:
                 nav_row.append(self._btn("—", callback_data="noop", style="primary"))
             nav_row.append(self._btn(f"{page}/{total_pages}", callback_data="noop", style="primary"))
             if page < total_pages:
-                nav_row.append(self._btn(self._tr(user_id, "التالي ➡️", "Next ➡️"), callback_data=f"platforms_nav:{page+1}", style="success"))
+                nav_row.append(self._btn(self._t(user_id, "next"), callback_data=f"platforms_nav:{page+1}", style="success"))
             else:
                 nav_row.append(self._btn("—", callback_data="noop", style="primary"))
             kb.append(nav_row)
 
             if include_back:
-                kb.append([self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="main_menu", style="primary")])
+                kb.append([self._btn(self._t(user_id, "back"), callback_data="main_menu", style="primary")])
 
         if message_id is None:
             self.send_text(chat_id, text, kb)
@@ -3027,16 +3374,16 @@ class PanelBot:
 
         nav_row: list[dict[str, Any]] = []
         if page > 1:
-            nav_row.append(self._btn(self._tr(user_id, "⬅️ السابق", "⬅️ Prev"), callback_data=f"traffic_menu_nav:{page-1}", style="danger"))
+            nav_row.append(self._btn(self._t(user_id, "prev"), callback_data=f"traffic_menu_nav:{page-1}", style="danger"))
         else:
             nav_row.append(self._btn("—", callback_data="noop", style="primary"))
         nav_row.append(self._btn(f"{page}/{total_pages}", callback_data="noop", style="primary"))
         if page < total_pages:
-            nav_row.append(self._btn(self._tr(user_id, "التالي ➡️", "Next ➡️"), callback_data=f"traffic_menu_nav:{page+1}", style="success"))
+            nav_row.append(self._btn(self._t(user_id, "next"), callback_data=f"traffic_menu_nav:{page+1}", style="success"))
         else:
             nav_row.append(self._btn("—", callback_data="noop", style="primary"))
         kb.append(nav_row)
-        kb.append([self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="main_menu", style="primary")])
+        kb.append([self._btn(self._t(user_id, "back"), callback_data="main_menu", style="primary")])
 
         text = self._title_traffic(user_id) + "\n" + self._tr(user_id, "اختر منصة لعرض الترافيك.", "Choose a platform to view traffic.")
         if not self.is_view_current(user_id, view_rev):
@@ -3075,17 +3422,17 @@ class PanelBot:
 
         nav_row: list[dict[str, Any]] = []
         if page > 1:
-            nav_row.append(self._btn(self._tr(user_id, "⬅️ السابق", "⬅️ Prev"), callback_data=f"traffic_nav:{app_name}:{page-1}", style="danger"))
+            nav_row.append(self._btn(self._t(user_id, "prev"), callback_data=f"traffic_nav:{app_name}:{page-1}", style="danger"))
         else:
             nav_row.append(self._btn("—", callback_data="noop", style="primary"))
         nav_row.append(self._btn(f"{page}/{total_pages}", callback_data="noop", style="primary"))
         if page < total_pages:
-            nav_row.append(self._btn(self._tr(user_id, "التالي ➡️", "Next ➡️"), callback_data=f"traffic_nav:{app_name}:{page+1}", style="success"))
+            nav_row.append(self._btn(self._t(user_id, "next"), callback_data=f"traffic_nav:{app_name}:{page+1}", style="success"))
         else:
             nav_row.append(self._btn("—", callback_data="noop", style="primary"))
         buttons.append(nav_row)
 
-        buttons.append([self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="traffic_menu", style="primary")])
+        buttons.append([self._btn(self._t(user_id, "back"), callback_data="traffic_menu", style="primary")])
         if not self.is_view_current(user_id, view_rev):
             return
         self.edit_text(chat_id, message_id, "\n".join(text_lines), buttons)
@@ -3134,7 +3481,7 @@ class PanelBot:
             return
         scope_key = "all" if not account_name else f"acc:{str(account_name).strip().lower()}"
         if refresh:
-            rows = self.fetch_numbers(account_name=account_name)
+            rows = self.fetch_numbers(account_name=account_name, refresh=True)
             self._set_user_numbers_rows(user_id, rows, scope=scope_key)
         else:
             rows = self._get_user_numbers_rows(user_id, scope=scope_key)
@@ -3184,16 +3531,16 @@ class PanelBot:
 
         nav_row: list[dict[str, Any]] = []
         if page > 1:
-            nav_row.append(self._btn(self._tr(user_id, "⬅️ السابق", "⬅️ Prev"), callback_data=f"numbers_nav:{page-1}", style="danger"))
+            nav_row.append(self._btn(self._t(user_id, "prev"), callback_data=f"numbers_nav:{page-1}", style="danger"))
         else:
             nav_row.append(self._btn("—", callback_data="noop", style="primary"))
         nav_row.append(self._btn(f"{page}/{total_pages}", callback_data="noop", style="primary"))
         if page < total_pages:
-            nav_row.append(self._btn(self._tr(user_id, "التالي ➡️", "Next ➡️"), callback_data=f"numbers_nav:{page+1}", style="success"))
+            nav_row.append(self._btn(self._t(user_id, "next"), callback_data=f"numbers_nav:{page+1}", style="success"))
         else:
             nav_row.append(self._btn("—", callback_data="noop", style="primary"))
         kb.append(nav_row)
-        kb.append([self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="numbers_menu", style="primary")])
+        kb.append([self._btn(self._t(user_id, "back"), callback_data="numbers_menu", style="primary")])
 
         if not self.is_view_current(user_id, view_rev):
             return
@@ -3225,7 +3572,7 @@ class PanelBot:
                     ]
                 )
 
-        kb.append([self._btn(self._tr(user_id, "رجوع", "Back"), callback_data="main_menu", style="primary")])
+        kb.append([self._btn(self._t(user_id, "back"), callback_data="main_menu", style="primary")])
         if not self.is_view_current(user_id, view_rev):
             return
         self.edit_text(chat_id, message_id, text, kb)
@@ -3466,7 +3813,7 @@ class PanelBot:
             self.send_text(chat_id, self._tr(user_id, "لا توجد أرقام لهذه الدولة.", "No numbers for this country."))
 
     def _render_export_menu(self, chat_id: int | str, message_id: int, user_id: int) -> None:
-        text = self._q(self._tr(user_id, "༺═════⇓ تصدير الارقام ⇓═════༻", "༺═════⇓ Export Numbers ⇓═════༻")) + "\n" + self._tr(user_id, "اختر نوع التصدير.", "Choose export type.")
+        text = self._q(self._t(user_id, "export_title")) + "\n" + self._tr(user_id, "اختر نوع التصدير.", "Choose export type.")
         self.edit_text(chat_id, message_id, text, self.kb_export_menu(user_id))
 
     def _process_range_request(
@@ -3482,7 +3829,7 @@ class PanelBot:
         selected_names.sort()
         signature = f"req_range|{str(range_name).strip().lower()}|{int(count or 0)}|{str(account_name or '').strip().lower()}|{','.join(selected_names)}"
         if not self._acquire_task_signature(user_id, signature):
-            self.send_text(chat_id, self._tr(user_id, "هذه المهمة قيد التنفيذ بالفعل.", "This task is already running."))
+            self.send_text(chat_id, self._t(user_id, "task_running"))
             return
         result = ""
         try:
@@ -3491,6 +3838,7 @@ class PanelBot:
         except Exception as exc:
             result = self._tr(user_id, f"فشل تنفيذ الطلب: {exc}", f"Request failed: {exc}")
         finally:
+            self.invalidate_numbers_cache()
             self._release_task_signature(user_id, signature)
         self.send_text(chat_id, result)
         self.show_main(chat_id, user_id)
@@ -3508,7 +3856,7 @@ class PanelBot:
         selected_names.sort()
         signature = f"req_multi|{'|'.join(normalized_rows)}|{str(account_name or '').strip().lower()}|{','.join(selected_names)}"
         if not self._acquire_task_signature(user_id, signature):
-            self.send_text(chat_id, self._tr(user_id, "هذه المهمة قيد التنفيذ بالفعل.", "This task is already running."))
+            self.send_text(chat_id, self._t(user_id, "task_running"))
             return
         total_target = len(requests_rows)
         op_name = self._tr(user_id, "إضافة أرقام", "Add Numbers")
@@ -3601,7 +3949,7 @@ class PanelBot:
         cleaned_items = sorted({str(x).strip() for x in items if str(x).strip()})
         signature = f"delete_custom|{'|'.join(cleaned_items)}"
         if not self._acquire_task_signature(user_id, signature):
-            self.send_text(chat_id, self._tr(user_id, "هذه المهمة قيد التنفيذ بالفعل.", "This task is already running."))
+            self.send_text(chat_id, self._t(user_id, "task_running"))
             return
         op_name = self._tr(user_id, "حذف أرقام", "Delete Numbers")
         op_target = self._tr(user_id, "حذف العناصر المحددة", "Delete selected entries")
@@ -3614,6 +3962,7 @@ class PanelBot:
         except Exception as exc:
             result = self._tr(user_id, f"فشل الحذف: {exc}", f"Delete failed: {exc}")
         finally:
+            self.invalidate_numbers_cache()
             self._release_task_signature(user_id, signature)
         self.send_text(chat_id, result)
         self.show_main(chat_id, user_id)
@@ -3623,7 +3972,7 @@ class PanelBot:
         if not self._acquire_task_signature(user_id, signature):
             self.send_text(chat_id, self._tr(user_id, "مهمة حذف كل الأرقام تعمل بالفعل.", "Delete-all task is already running."))
             return
-        rows = self.fetch_numbers()
+        rows = self.fetch_numbers(refresh=True)
         ids: list[str] = []
         for row in rows:
             rid = str(row.get("id") or "").strip()
@@ -3645,19 +3994,20 @@ class PanelBot:
         except Exception as exc:
             result = self._tr(user_id, f"فشل حذف كل الأرقام: {exc}", f"Delete all failed: {exc}")
         finally:
+            self.invalidate_numbers_cache()
             self._release_task_signature(user_id, signature)
         self.send_text(chat_id, result)
         self.show_main(chat_id, user_id)
 
     # -------------------------- state machine --------------------------
     def set_state(self, user_id: int, mode: str, data: dict[str, Any] | None = None) -> None:
-        self.user_state[user_id] = {"mode": mode, "data": data or {}}
+        self.user_session(user_id).state = {"mode": mode, "data": data or {}}
 
     def clear_state(self, user_id: int) -> None:
-        self.user_state.pop(user_id, None)
+        self.user_session(user_id).state = None
 
     def get_state(self, user_id: int) -> dict[str, Any] | None:
-        return self.user_state.get(user_id)
+        return self.user_session(user_id).state
 
     # -------------------------- callbacks --------------------------
     def handle_callback(self, q: dict[str, Any]) -> None:
@@ -3725,8 +4075,7 @@ class PanelBot:
             return
         if data == "toggle_fetch":
             enabled = self.fetch_codes_enabled()
-            self.set_fetch_codes_enabled(not enabled)
-            self.mark_runtime_change()
+            self.apply_runtime_change(self.set_fetch_codes_enabled, not enabled)
             self.show_main(chat_id, user_id, message_id)
             return
 
@@ -3762,8 +4111,7 @@ class PanelBot:
 
         if data == "var_startdate_toggle":
             enabled = self.is_start_date_auto_today_enabled()
-            self.set_start_date_auto_today(not enabled)
-            self.mark_runtime_change()
+            self.apply_runtime_change(self.set_start_date_auto_today, not enabled)
             current = self.get_runtime_start_date()
             auto_enabled = self.is_start_date_auto_today_enabled()
             self.edit_text(
@@ -3786,7 +4134,7 @@ class PanelBot:
 
         if data == "settings_broadcast":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.set_state(user_id, "wait_broadcast_text")
             self.send_text(
@@ -3801,7 +4149,7 @@ class PanelBot:
 
         if data.startswith("broadcast_has_btn:"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             choice = data.split(":", 1)[1].strip().lower()
             st = self.get_state(user_id) or {}
@@ -3825,14 +4173,14 @@ class PanelBot:
 
         if data == "var_admins_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.edit_text(
                 chat_id,
                 message_id,
-                self._q(self._tr(user_id, "༺═════⇓ إدارة الأدمن ⇓═════༻", "༺═════⇓ Admin Management ⇓═════༻"))
+                self._q(self._t(user_id, "admins_title"))
                 + "\n"
-                + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                + self._t(user_id, "choose_action"),
                 self.kb_admins_menu(user_id),
             )
             return
@@ -3865,7 +4213,7 @@ class PanelBot:
 
         if data == "var_set_bot_limit":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             current = self.get_runtime_bot_limit()
             self.set_state(user_id, "wait_var_bot_limit")
@@ -3881,7 +4229,7 @@ class PanelBot:
 
         if data in {"var_add_admin", "var_admin_add"}:
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.set_state(user_id, "wait_var_add_admin")
             self.send_text(
@@ -3892,13 +4240,13 @@ class PanelBot:
 
         if data == "var_admin_list":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             admins_txt = ", ".join(str(x) for x in self.get_runtime_admin_ids()) or "-"
             self.edit_text(
                 chat_id,
                 message_id,
-                self._q(self._tr(user_id, "༺═════⇓ إدارة الأدمن ⇓═════༻", "༺═════⇓ Admin Management ⇓═════༻"))
+                self._q(self._t(user_id, "admins_title"))
                 + "\n"
                 + self._tr(user_id, f"الأدمن الحاليين:\n{admins_txt}", f"Current admins:\n{admins_txt}"),
                 self.kb_admins_menu(user_id),
@@ -3907,15 +4255,15 @@ class PanelBot:
 
         if data == "var_admin_delete_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             admin_ids = self.get_runtime_admin_ids()
             buttons = [self._btn(f"🗑️ {aid}", callback_data=f"var_admin_del:{aid}", style="danger") for aid in admin_ids]
-            kb = self._pattern_rows(buttons, back_callback="var_admins_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="var_admins_menu", back_text=self._t(user_id, "back"))
             self.edit_text(
                 chat_id,
                 message_id,
-                self._q(self._tr(user_id, "༺═════⇓ إدارة الأدمن ⇓═════༻", "༺═════⇓ Admin Management ⇓═════༻"))
+                self._q(self._t(user_id, "admins_title"))
                 + "\n"
                 + self._tr(user_id, "اختر الأدمن المراد حذفه.", "Choose admin to delete."),
                 kb,
@@ -3924,20 +4272,19 @@ class PanelBot:
 
         if data.startswith("var_admin_del:"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             aid = data.split(":", 1)[1].strip()
-            if not self.remove_runtime_admin(aid):
+            if not self.apply_runtime_change(self.remove_runtime_admin, aid):
                 self.answer_callback(callback_id, self._tr(user_id, "تعذر حذف الأدمن.", "Could not delete admin."))
             else:
-                self.mark_runtime_change()
                 self.answer_callback(callback_id, self._tr(user_id, "تم حذف الأدمن.", "Admin deleted."))
             admin_ids = self.get_runtime_admin_ids()
             admins_txt = ", ".join(str(x) for x in admin_ids) or "-"
             self.edit_text(
                 chat_id,
                 message_id,
-                self._q(self._tr(user_id, "༺═════⇓ إدارة الأدمن ⇓═════༻", "༺═════⇓ Admin Management ⇓═════༻"))
+                self._q(self._t(user_id, "admins_title"))
                 + "\n"
                 + self._tr(user_id, f"الأدمن الحاليين:\n{admins_txt}", f"Current admins:\n{admins_txt}"),
                 self.kb_admins_menu(user_id),
@@ -3946,35 +4293,35 @@ class PanelBot:
 
         if data == "var_bots_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.edit_text(
                 chat_id,
                 message_id,
-                self._q(self._tr(user_id, "༺═════⇓ إدارة البوتات ⇓═════༻", "༺═════⇓ Bots Management ⇓═════༻"))
+                self._q(self._t(user_id, "bots_title"))
                 + "\n"
-                + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                + self._t(user_id, "choose_action"),
                 self.kb_bots_mgmt_menu(user_id),
             )
             return
 
         if data == "var_bot_admins_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.edit_text(
                 chat_id,
                 message_id,
                 self._q(self._tr(user_id, "༺═════⇓ إدارة أدمن البوتات ⇓═════༻", "༺═════⇓ Bots Admin Management ⇓═════༻"))
                 + "\n"
-                + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                + self._t(user_id, "choose_action"),
                 self.kb_bot_admins_menu(user_id),
             )
             return
 
         if data == "var_bot_add":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.set_state(user_id, "wait_new_bot_name")
             self.send_text(chat_id, self._tr(user_id, "اكتب اسم البوت/صاحب البوت أولًا.", "Send bot name/owner name first."))
@@ -3982,7 +4329,7 @@ class PanelBot:
 
         if data == "var_bot_admin_add_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             rows = self.load_managed_bots()
             buttons: list[dict[str, Any]] = []
@@ -3992,7 +4339,7 @@ class PanelBot:
                     continue
                 bname = str(row.get("bot_name") or row.get("bot_username") or f"bot_{i}").strip()
                 buttons.append(self._btn(f"🤖 {bname}", callback_data=f"var_bot_admin_pick:{bid}", style="primary"))
-            kb = self._pattern_rows(buttons, back_callback="var_bot_admins_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="var_bot_admins_menu", back_text=self._t(user_id, "back"))
             self.edit_text(
                 chat_id,
                 message_id,
@@ -4003,7 +4350,7 @@ class PanelBot:
 
         if data == "var_bot_admin_delete_bot_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             rows = self.load_managed_bots()
             buttons: list[dict[str, Any]] = []
@@ -4013,13 +4360,13 @@ class PanelBot:
                     continue
                 bname = str(row.get("bot_name") or row.get("bot_username") or f"bot_{i}").strip()
                 buttons.append(self._btn(f"🤖 {bname}", callback_data=f"var_bot_admin_del_pickbot:{bid}", style="primary"))
-            kb = self._pattern_rows(buttons, back_callback="var_bot_admins_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="var_bot_admins_menu", back_text=self._t(user_id, "back"))
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر البوت.", "Choose bot."), kb)
             return
 
         if data.startswith("var_bot_admin_del_pickbot:"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             bot_id = data.split(":", 1)[1].strip()
             rows = self.load_managed_bots()
@@ -4029,18 +4376,14 @@ class PanelBot:
                     target = row
                     break
             if not target:
-                self.answer_callback(callback_id, self._tr(user_id, "البوت غير موجود.", "Bot not found."))
+                self.answer_callback(callback_id, self._t(user_id, "bot_not_found"))
                 return
             bot_name = str(target.get("bot_name") or target.get("bot_username") or "bot").strip()
-            admin_ids = [
-                int(str(x).strip())
-                for x in (target.get("admin_ids") or [])
-                if str(x).strip().isdigit()
-            ]
+            admin_ids = _parse_ids(target.get("admin_ids") or [])
             buttons: list[dict[str, Any]] = []
             for aid in admin_ids:
                 buttons.append(self._btn(f"🗑️ {aid}", callback_data=f"var_bot_admin_del:{bot_id}:{aid}", style="danger"))
-            kb = self._pattern_rows(buttons, back_callback="var_bot_admin_delete_bot_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="var_bot_admin_delete_bot_menu", back_text=self._t(user_id, "back"))
             text = self._q(self._tr(user_id, "༺═════⇓ حذف أدمن البوت ⇓═════༻", "༺═════⇓ Delete Bot Admin ⇓═════༻")) + "\n"
             if admin_ids:
                 text += self._tr(user_id, f"اختر الأدمن لحذفه من {bot_name}.", f"Choose admin to delete from {bot_name}.")
@@ -4051,7 +4394,7 @@ class PanelBot:
 
         if data.startswith("var_bot_admin_del:"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             parts = data.split(":")
             if len(parts) != 3:
@@ -4062,8 +4405,7 @@ class PanelBot:
             if not aid.isdigit():
                 self.answer_callback(callback_id, self._tr(user_id, "ID غير صالح.", "Invalid ID."))
                 return
-            if self.remove_managed_bot_admin(bot_id, int(aid)):
-                self.mark_runtime_change()
+            if self.apply_runtime_change(self.remove_managed_bot_admin, bot_id, int(aid)):
                 self.answer_callback(callback_id, self._tr(user_id, "تم حذف الأدمن.", "Admin deleted."))
             else:
                 self.answer_callback(callback_id, self._tr(user_id, "لم يتم حذف الأدمن.", "Admin was not deleted."))
@@ -4075,18 +4417,14 @@ class PanelBot:
                     target = row
                     break
             if not target:
-                self.edit_text(chat_id, message_id, self._tr(user_id, "البوت غير موجود.", "Bot not found."), self.kb_bot_admins_menu(user_id))
+                self.edit_text(chat_id, message_id, self._t(user_id, "bot_not_found"), self.kb_bot_admins_menu(user_id))
                 return
             bot_name = str(target.get("bot_name") or target.get("bot_username") or "bot").strip()
-            admin_ids = [
-                int(str(x).strip())
-                for x in (target.get("admin_ids") or [])
-                if str(x).strip().isdigit()
-            ]
+            admin_ids = _parse_ids(target.get("admin_ids") or [])
             buttons: list[dict[str, Any]] = []
             for aid2 in admin_ids:
                 buttons.append(self._btn(f"🗑️ {aid2}", callback_data=f"var_bot_admin_del:{bot_id}:{aid2}", style="danger"))
-            kb = self._pattern_rows(buttons, back_callback="var_bot_admin_delete_bot_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="var_bot_admin_delete_bot_menu", back_text=self._t(user_id, "back"))
             text = self._q(self._tr(user_id, "༺═════⇓ حذف أدمن البوت ⇓═════༻", "༺═════⇓ Delete Bot Admin ⇓═════༻")) + "\n"
             if admin_ids:
                 text += self._tr(user_id, f"اختر الأدمن لحذفه من {bot_name}.", f"Choose admin to delete from {bot_name}.")
@@ -4097,7 +4435,7 @@ class PanelBot:
 
         if data.startswith("var_bot_admin_pick:"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             bot_id = data.split(":", 1)[1].strip()
             rows = self.load_managed_bots()
@@ -4107,7 +4445,7 @@ class PanelBot:
                     target = row
                     break
             if not target:
-                self.answer_callback(callback_id, self._tr(user_id, "البوت غير موجود.", "Bot not found."))
+                self.answer_callback(callback_id, self._t(user_id, "bot_not_found"))
                 return
             bot_name = str(target.get("bot_name") or target.get("bot_username") or "bot").strip()
             self.set_state(user_id, "wait_bot_admin_id", {"bot_id": bot_id, "bot_name": bot_name})
@@ -4123,14 +4461,14 @@ class PanelBot:
 
         if data == "var_bot_limits_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.edit_text(
                 chat_id,
                 message_id,
                 self._q(self._tr(user_id, "༺═════⇓ إدارة الحدود ⇓═════༻", "༺═════⇓ Limits Management ⇓═════༻"))
                 + "\n"
-                + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                + self._t(user_id, "choose_action"),
                 self.kb_bot_limits_menu(user_id),
             )
             return
@@ -4167,7 +4505,7 @@ class PanelBot:
                 bname = str(row.get("bot_name") or row.get("bot_username") or f"bot_{i}").strip()
                 limit = int(row.get("accounts_limit", 0) or 0)
                 buttons.append(self._btn(f"🤖 {bname} | {limit}", callback_data=f"var_bot_limit_pick:{bid}:{action}", style="primary"))
-            kb = self._pattern_rows(buttons, back_callback="var_bot_limits_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="var_bot_limits_menu", back_text=self._t(user_id, "back"))
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر البوت.", "Choose bot."), kb)
             return
 
@@ -4183,7 +4521,7 @@ class PanelBot:
 
         if data.startswith("var_bot_store:"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             storage = data.split(":", 1)[1].strip().lower()
             st = self.get_state(user_id) or {}
@@ -4199,9 +4537,8 @@ class PanelBot:
                 self.send_text(chat_id, self._tr(user_id, "توكن البوت غير صحيح أو غير متاح.", "Invalid bot token or unreachable."))
                 return
             bot_name = str((st.get("data") or {}).get("bot_name") or "").strip()
-            self.upsert_managed_bot(token, storage, user_id, username, bot_name)
+            self.apply_runtime_change(self.upsert_managed_bot, token, storage, user_id, username, bot_name, restart=True)
             self.clear_state(user_id)
-            self.mark_process_restart_change()
             self.send_text(
                 chat_id,
                 self._tr(
@@ -4215,10 +4552,10 @@ class PanelBot:
 
         if data == "var_bot_list":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             rows = self.load_managed_bots()
-            lines = [self._q(self._tr(user_id, "༺═════⇓ إدارة البوتات ⇓═════༻", "༺═════⇓ Bots Management ⇓═════༻"))]
+            lines = [self._q(self._t(user_id, "bots_title"))]
             if not rows:
                 lines.append(self._tr(user_id, "لا توجد بوتات إضافية.", "No extra bots."))
             else:
@@ -4226,7 +4563,7 @@ class PanelBot:
                     bname = str(row.get("bot_name") or row.get("bot_username") or f"bot_{i}").strip()
                     uname = str(row.get("bot_username") or "").strip()
                     limit = int(row.get("accounts_limit", 0) or 0)
-                    admins_count = len([x for x in (row.get("admin_ids") or []) if str(x).strip().isdigit()])
+                    admins_count = len(_parse_ids(row.get("admin_ids") or []))
                     lines.append(
                         self._tr(
                             user_id,
@@ -4239,7 +4576,7 @@ class PanelBot:
 
         if data == "var_bot_delete_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             rows = self.load_managed_bots()
             buttons: list[dict[str, Any]] = []
@@ -4251,22 +4588,21 @@ class PanelBot:
                 uname = str(row.get("bot_username") or "").strip()
                 label = f"🗑️ {bname} | @{uname}" if uname else f"🗑️ {bname}"
                 buttons.append(self._btn(label, callback_data=f"var_bot_del:{bid}", style="danger"))
-            kb = self._pattern_rows(buttons, back_callback="var_bots_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="var_bots_menu", back_text=self._t(user_id, "back"))
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر البوت المراد حذفه.", "Choose bot to delete."), kb)
             return
 
         if data.startswith("var_bot_del:"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             bot_id = data.split(":", 1)[1].strip()
-            if not self.delete_managed_bot_by_id(bot_id):
+            if not self.apply_runtime_change(self.delete_managed_bot_by_id, bot_id, restart=True):
                 self.answer_callback(callback_id, self._tr(user_id, "فشل الحذف أو البوت غير موجود.", "Delete failed or bot not found."))
                 return
-            self.mark_process_restart_change()
             self.answer_callback(callback_id, self._tr(user_id, "تم حذف البوت.", "Bot deleted."))
             rows = self.load_managed_bots()
-            lines = [self._q(self._tr(user_id, "༺═════⇓ إدارة البوتات ⇓═════༻", "༺═════⇓ Bots Management ⇓═════༻"))]
+            lines = [self._q(self._t(user_id, "bots_title"))]
             if not rows:
                 lines.append(self._tr(user_id, "لا توجد بوتات إضافية.", "No extra bots."))
             else:
@@ -4276,7 +4612,7 @@ class PanelBot:
 
         if data == "publish_settings_menu":
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.edit_text(
                 chat_id,
@@ -4290,7 +4626,7 @@ class PanelBot:
 
         if data.startswith("publish_"):
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
 
         if data == "publish_services_menu":
@@ -4336,7 +4672,7 @@ class PanelBot:
         if data == "publish_services_delete_menu":
             rows = self.load_services()
             buttons = [self._btn(f"🗑️ {row.get('key')}", callback_data=f"publish_service_del:{idx}", style="danger") for idx, row in enumerate(rows, start=1)]
-            kb = self._pattern_rows(buttons, back_callback="publish_services_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="publish_services_menu", back_text=self._t(user_id, "back"))
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر خدمة للحذف.", "Choose service to delete."), kb)
             return
 
@@ -4355,7 +4691,7 @@ class PanelBot:
         if data == "publish_countries_delete_menu":
             rows = self.load_countries_store()
             buttons = [self._btn(f"🗑️ +{row.get('dial_code')}", callback_data=f"publish_country_del:{idx}", style="danger") for idx, row in enumerate(rows, start=1)]
-            kb = self._pattern_rows(buttons, back_callback="publish_countries_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="publish_countries_menu", back_text=self._t(user_id, "back"))
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر بلد للحذف.", "Choose country to delete."), kb)
             return
 
@@ -4374,7 +4710,7 @@ class PanelBot:
         if data == "publish_services_edit_menu":
             rows = self.load_services()
             buttons = [self._btn(f"✏️ {row.get('key')}", callback_data=f"publish_service_edit:{idx}", style="primary") for idx, row in enumerate(rows, start=1)]
-            kb = self._pattern_rows(buttons, back_callback="publish_services_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="publish_services_menu", back_text=self._t(user_id, "back"))
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر خدمة للتعديل.", "Choose service to edit."), kb)
             return
 
@@ -4390,7 +4726,7 @@ class PanelBot:
                     self._btn(self._tr(user_id, "الايموجي", "Emoji"), callback_data="publish_service_field:emoji", style="primary"),
                 ],
                 back_callback="publish_services_menu",
-                back_text=self._tr(user_id, "رجوع", "Back"),
+                back_text=self._t(user_id, "back"),
             )
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر نوع التعديل.", "Choose edit field."), kb)
             return
@@ -4409,7 +4745,7 @@ class PanelBot:
         if data == "publish_countries_edit_menu":
             rows = self.load_countries_store()
             buttons = [self._btn(f"✏️ +{row.get('dial_code')}", callback_data=f"publish_country_edit:{idx}", style="primary") for idx, row in enumerate(rows, start=1)]
-            kb = self._pattern_rows(buttons, back_callback="publish_countries_menu", back_text=self._tr(user_id, "رجوع", "Back"))
+            kb = self._pattern_rows(buttons, back_callback="publish_countries_menu", back_text=self._t(user_id, "back"))
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر بلد للتعديل.", "Choose country to edit."), kb)
             return
 
@@ -4426,7 +4762,7 @@ class PanelBot:
                     self._btn(self._tr(user_id, "الايموجي", "Emoji"), callback_data="publish_country_field:emoji", style="primary"),
                 ],
                 back_callback="publish_countries_menu",
-                back_text=self._tr(user_id, "رجوع", "Back"),
+                back_text=self._t(user_id, "back"),
             )
             self.edit_text(chat_id, message_id, self._tr(user_id, "اختر نوع التعديل.", "Choose edit field."), kb)
             return
@@ -4444,7 +4780,7 @@ class PanelBot:
 
         if data in {"var_reload", "var_restart"}:
             if not self.has_full_vars_access(user_id):
-                self.answer_callback(callback_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.answer_callback(callback_id, self._t(user_id, "not_allowed"))
                 return
             self.mark_process_restart_change()
             self.answer_callback(callback_id, self._tr(user_id, "تم طلب إعادة تشغيل البوت.", "Bot restart requested."))
@@ -4459,7 +4795,7 @@ class PanelBot:
                     self._btn("English", callback_data="set_lang:en", style="primary"),
                 ],
                 back_callback="main_menu",
-                back_text=self._tr(user_id, "رجوع", "Back"),
+                back_text=self._t(user_id, "back"),
             )
             self.edit_text(chat_id, message_id, text, kb)
             return
@@ -4469,7 +4805,7 @@ class PanelBot:
             if lang not in {"ar", "en"}:
                 return
             self.set_user_lang_override(user_id, lang)
-            self.user_lang[user_id] = lang
+            self.user_session(user_id).set_lang(lang)
             self.answer_callback(callback_id, "تم" if lang == "ar" else "Done")
             self.show_main(chat_id, user_id, message_id)
             return
@@ -4478,7 +4814,7 @@ class PanelBot:
             self.edit_text(
                 chat_id,
                 message_id,
-                self._title_messages(user_id) + "\n" + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                self._title_messages(user_id) + "\n" + self._t(user_id, "choose_action"),
                 self.kb_messages_menu(user_id),
             )
             return
@@ -4507,10 +4843,10 @@ class PanelBot:
             return
 
         if data == "refresh_data":
-            self.platforms_cache = {"at": 0.0, "data": []}
-            self.traffic_cache = {}
-            self.user_traffic_cache.pop(user_id, None)
-            self.user_numbers_cache.pop(user_id, None)
+            self.invalidate_api_caches()
+            sess = self.user_session(user_id)
+            sess.traffic.clear()
+            sess.numbers.clear()
             self.request_messages_refresh()
             self.answer_callback(callback_id, self._tr(user_id, "تم التحديث.", "Refreshed."))
             self.edit_text(
@@ -4532,13 +4868,13 @@ class PanelBot:
                 page = int(data.split(":", 1)[1])
             except Exception:
                 page = 1
-            rev = self.user_view_rev.get(user_id, 0)
+            rev = self.user_session(user_id).view_rev
             self._run_async(self._render_traffic_menu, chat_id, message_id, user_id, page, False, rev)
             return
 
         if data.startswith("traffic_app:"):
             app = data.split(":", 1)[1]
-            rev = self.user_view_rev.get(user_id, 0)
+            rev = self.user_session(user_id).view_rev
             self._show_loading(chat_id, message_id, TRAFFIC_TITLE, self._tr(user_id, f"🧩 الخدمة: {app}\n⏳ جاري تحميل الترافيك...", f"🧩 Service: {app}\n⏳ Loading traffic..."), "traffic_menu", user_id)
             self._run_async(self.show_traffic_for_app, chat_id, message_id, user_id, app, 1, True, rev)
             return
@@ -4552,7 +4888,7 @@ class PanelBot:
                 page = int(parts[2])
             except Exception:
                 page = 1
-            rev = self.user_view_rev.get(user_id, 0)
+            rev = self.user_session(user_id).view_rev
             self._run_async(self.show_traffic_for_app, chat_id, message_id, user_id, app, page, False, rev)
             return
 
@@ -4567,7 +4903,7 @@ class PanelBot:
                 page = int(data.split(":", 1)[1])
             except Exception:
                 page = 1
-            rev = self.user_view_rev.get(user_id, 0)
+            rev = self.user_session(user_id).view_rev
             self._run_async(self.show_platforms, chat_id, user_id, message_id, True, page, False, rev)
             return
 
@@ -4576,7 +4912,7 @@ class PanelBot:
             self.edit_text(
                 chat_id,
                 message_id,
-                self._title_numbers(user_id) + "\n" + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                self._title_numbers(user_id) + "\n" + self._t(user_id, "choose_action"),
                 self.kb_numbers_menu(user_id),
             )
             return
@@ -4587,7 +4923,7 @@ class PanelBot:
             return
 
         if data == "numbers_show_all":
-            self.user_numbers_view_account[user_id] = None
+            self.user_session(user_id).numbers_view_account = None
             rev = self.bump_view_rev(user_id)
             self._show_loading(chat_id, message_id, NUMBERS_TITLE, self._tr(user_id, "⏳ جاري تحميل الأرقام...", "⏳ Loading numbers..."), "numbers_menu", user_id)
             self._run_async(self.show_numbers, chat_id, message_id, user_id, 1, True, None, rev)
@@ -4607,7 +4943,7 @@ class PanelBot:
             if not account_name:
                 self.answer_callback(callback_id, self._tr(user_id, "اختيار حساب غير صالح.", "Invalid account selection."))
                 return
-            self.user_numbers_view_account[user_id] = account_name
+            self.user_session(user_id).numbers_view_account = account_name
             rev = self.bump_view_rev(user_id)
             self._show_loading(chat_id, message_id, NUMBERS_TITLE, self._tr(user_id, "⏳ جاري تحميل الأرقام...", "⏳ Loading numbers..."), "numbers_show", user_id)
             self._run_async(self.show_numbers, chat_id, message_id, user_id, 1, True, account_name, rev)
@@ -4618,13 +4954,13 @@ class PanelBot:
                 page = int(data.split(":", 1)[1])
             except Exception:
                 page = 1
-            rev = self.user_view_rev.get(user_id, 0)
-            account_name = self.user_numbers_view_account.get(user_id)
+            rev = self.user_session(user_id).view_rev
+            account_name = self.user_session(user_id).numbers_view_account
             self._run_async(self.show_numbers, chat_id, message_id, user_id, page, False, account_name, rev)
             return
 
         if data == "numbers_export_menu":
-            text = self._q(self._tr(user_id, "༺═════⇓ تصدير الارقام ⇓═════༻", "༺═════⇓ Export Numbers ⇓═════༻")) + "\n" + self._tr(user_id, "اختر نوع التصدير.", "Choose export type.")
+            text = self._q(self._t(user_id, "export_title")) + "\n" + self._tr(user_id, "اختر نوع التصدير.", "Choose export type.")
             self.edit_text(chat_id, message_id, text, self.kb_export_menu(user_id))
             return
 
@@ -4705,7 +5041,7 @@ class PanelBot:
 
         if data.startswith("expfull:"):
             fmt = data.split(":", 1)[1]
-            self._show_loading(chat_id, message_id, self._tr(user_id, "༺═════⇓ تصدير الارقام ⇓═════༻", "༺═════⇓ Export Numbers ⇓═════༻"), self._tr(user_id, "⏳ جاري تجهيز التصدير...", "⏳ Preparing export..."), "numbers_export_menu", user_id)
+            self._show_loading(chat_id, message_id, self._t(user_id, "export_title"), self._tr(user_id, "⏳ جاري تجهيز التصدير...", "⏳ Preparing export..."), "numbers_export_menu", user_id)
             state = self.get_state(user_id) or {}
             fields: list[str] = []
             if state.get("mode") == "wait_export_full_format":
@@ -4743,7 +5079,7 @@ class PanelBot:
             return
 
         if data == "ranges_show":
-            live_rows = self.fetch_numbers()
+            live_rows = self.fetch_numbers(refresh=True)
             self.sync_ranges_store_from_numbers(live_rows)
             rows = self._ranges_summary_from_live(limit=60, numbers_rows=live_rows)
             lines = [self._q(self._tr(user_id, "༺═════⇓ الرينجات ⇓═════༻", "༺═════⇓ Ranges ⇓═════༻"))]
@@ -4840,7 +5176,7 @@ class PanelBot:
                 "numbers_request",
                 user_id,
             )
-            live_rows = self.fetch_numbers()
+            live_rows = self.fetch_numbers(refresh=True)
             self.sync_ranges_store_from_numbers(live_rows)
             hint_rows: list[str] = []
             snapshot_map: dict[str, int] = {}
@@ -4873,7 +5209,7 @@ class PanelBot:
                 "numbers_request",
                 user_id,
             )
-            live_rows = self.fetch_numbers()
+            live_rows = self.fetch_numbers(refresh=True)
             self.sync_ranges_store_from_numbers(live_rows)
             hint_rows: list[str] = []
             snapshot_map: dict[str, int] = {}
@@ -4961,7 +5297,7 @@ class PanelBot:
             self.edit_text(
                 chat_id,
                 message_id,
-                self._title_groups(user_id) + "\n" + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                self._title_groups(user_id) + "\n" + self._t(user_id, "choose_action"),
                 self.kb_groups_menu(user_id),
             )
             return
@@ -5008,7 +5344,7 @@ class PanelBot:
             self.edit_text(
                 chat_id,
                 message_id,
-                self._title_accounts(user_id) + "\n" + self._tr(user_id, "اختر العملية.", "Choose an action."),
+                self._title_accounts(user_id) + "\n" + self._t(user_id, "choose_action"),
                 self.kb_accounts_menu(user_id),
             )
             return
@@ -5189,7 +5525,7 @@ class PanelBot:
                     self._btn("English", callback_data="set_lang:en", style="primary"),
                 ],
                 back_callback="main_menu",
-                back_text=self._tr(user_id, "رجوع", "Back"),
+                back_text=self._t(user_id, "back"),
             )
             self.send_text(chat_id, text_msg, kb)
             return
@@ -5232,51 +5568,46 @@ class PanelBot:
             return
 
         if mode == "wait_var_start_date":
-            if not self.set_runtime_start_date(text):
+            if not self.apply_runtime_change(self.set_runtime_start_date, text):
                 self.send_text(chat_id, self._tr(user_id, "صيغة غير صحيحة. اكتب YYYY-MM-DD", "Invalid format. Use YYYY-MM-DD"))
                 return
             self.clear_state(user_id)
-            self.mark_runtime_change()
             self.send_text(chat_id, self._tr(user_id, f"تم حفظ Start Date: {text}", f"Start Date saved: {text}"))
             self.show_main(chat_id, user_id)
             return
 
         if mode == "wait_var_api_url":
-            if not self.set_runtime_api_base(text):
+            if not self.apply_runtime_change(self.set_runtime_api_base, text):
                 self.send_text(chat_id, self._tr(user_id, "صيغة URL غير صحيحة. اكتب http://... أو https://...", "Invalid URL. Use http://... or https://..."))
                 return
             self.clear_state(user_id)
-            self.mark_runtime_change()
             self.send_text(chat_id, self._tr(user_id, f"تم حفظ API URL: {self.get_runtime_api_base()}", f"API URL saved: {self.get_runtime_api_base()}"))
             self.show_main(chat_id, user_id)
             return
 
         if mode == "wait_var_api_key":
-            if not self.set_runtime_api_key(text):
+            if not self.apply_runtime_change(self.set_runtime_api_key, text):
                 self.send_text(chat_id, self._tr(user_id, "API Key غير صالح (الحد الأدنى 8 أحرف).", "Invalid API Key (minimum 8 chars)."))
                 return
             self.clear_state(user_id)
-            self.mark_runtime_change()
             self.send_text(chat_id, self._tr(user_id, "تم حفظ API Key بنجاح.", "API Key saved successfully."))
             self.show_main(chat_id, user_id)
             return
 
         if mode == "wait_var_bot_limit":
-            if not self.set_runtime_bot_limit(text):
+            if not self.apply_runtime_change(self.set_runtime_bot_limit, text):
                 self.send_text(chat_id, self._tr(user_id, "القيمة غير صحيحة. اكتب 0 (بدون حد) أو رقمًا صحيحًا.", "Invalid value. Send 0 (unlimited) or a valid number."))
                 return
             self.clear_state(user_id)
-            self.mark_runtime_change()
             self.send_text(chat_id, self._tr(user_id, f"تم حفظ BOT LIMIT: {self.get_runtime_bot_limit()}", f"BOT LIMIT saved: {self.get_runtime_bot_limit()}"))
             self.show_main(chat_id, user_id)
             return
 
         if mode == "wait_var_add_admin":
-            if not self.add_runtime_admin(text):
+            if not self.apply_runtime_change(self.add_runtime_admin, text):
                 self.send_text(chat_id, self._tr(user_id, "ID غير صحيح.", "Invalid ID."))
                 return
             self.clear_state(user_id)
-            self.mark_runtime_change()
             admins_txt = ", ".join(str(x) for x in self.get_runtime_admin_ids()) or "-"
             self.send_text(
                 chat_id,
@@ -5298,7 +5629,7 @@ class PanelBot:
                     self._btn(self._tr(user_id, "❌ لا", "❌ No"), callback_data="broadcast_has_btn:no", style="danger"),
                 ],
                 back_callback="vars_menu",
-                back_text=self._tr(user_id, "رجوع", "Back"),
+                back_text=self._t(user_id, "back"),
             )
             self.send_text(chat_id, self._tr(user_id, "هل تريد إضافة زر للرسايل؟", "Do you want a button in broadcast?"), kb)
             return
@@ -5328,7 +5659,7 @@ class PanelBot:
         if mode == "wait_new_bot_name":
             if not self.has_full_vars_access(user_id):
                 self.clear_state(user_id)
-                self.send_text(chat_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.send_text(chat_id, self._t(user_id, "not_allowed"))
                 return
             bot_name = str(text or "").strip()
             if len(bot_name) < 2:
@@ -5341,7 +5672,7 @@ class PanelBot:
         if mode == "wait_new_bot_token":
             if not self.has_full_vars_access(user_id):
                 self.clear_state(user_id)
-                self.send_text(chat_id, self._tr(user_id, "غير متاح.", "Not allowed."))
+                self.send_text(chat_id, self._t(user_id, "not_allowed"))
                 return
             token = str(text or "").strip()
             if ":" not in token or len(token) < 20:
@@ -5355,7 +5686,7 @@ class PanelBot:
                     self._btn(self._tr(user_id, "🔗 تخزين مشترك مع البوت الأساسي", "🔗 Shared With Main Bot"), callback_data="var_bot_store:shared", style="success"),
                 ],
                 back_callback="var_bots_menu",
-                back_text=self._tr(user_id, "رجوع", "Back"),
+                back_text=self._t(user_id, "back"),
             )
             self.send_text(chat_id, self._tr(user_id, "اختر نوع التخزين.", "Choose storage mode."), kb)
             return
@@ -5368,11 +5699,10 @@ class PanelBot:
             value = int(text)
             if value < 0:
                 value = 0
-            if not self.set_managed_bot_accounts_limit(bot_id, value):
+            if not self.apply_runtime_change(self.set_managed_bot_accounts_limit, bot_id, value):
                 self.send_text(chat_id, self._tr(user_id, "فشل تحديث الحد.", "Failed to update limit."))
                 return
             self.clear_state(user_id)
-            self.mark_runtime_change()
             self.send_text(
                 chat_id,
                 self._tr(
@@ -5391,11 +5721,10 @@ class PanelBot:
             if not aid.isdigit():
                 self.send_text(chat_id, self._tr(user_id, "اكتب ID رقمي صحيح.", "Send a valid numeric ID."))
                 return
-            if not self.add_managed_bot_admin(bot_id, int(aid)):
+            if not self.apply_runtime_change(self.add_managed_bot_admin, bot_id, int(aid)):
                 self.send_text(chat_id, self._tr(user_id, "فشل إضافة الأدمن للبوت.", "Failed to add admin to bot."))
                 return
             self.clear_state(user_id)
-            self.mark_runtime_change()
             self.send_text(
                 chat_id,
                 self._tr(
@@ -5605,7 +5934,7 @@ class PanelBot:
             store = self.load_ranges_store()
             ok_count = 0
             bad: list[str] = []
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            now = self._now_second_str()
             for line in lines:
                 if ":" not in line:
                     bad.append(line)
@@ -5664,7 +5993,7 @@ class PanelBot:
             account_name = str(data.get("account") or "").strip()
             account_names = [str(x) for x in (data.get("accounts") or []) if str(x).strip()]
             # Real-time synchronization: always compute from fresh live numbers.
-            live_rows = self.fetch_numbers()
+            live_rows = self.fetch_numbers(refresh=True)
             self.sync_ranges_store_from_numbers(live_rows)
             existing = self._range_existing_count(range_name, account_name or None, account_names or None, numbers_rows=live_rows)
             selected_count = max(1, len(account_names) if account_names else (1 if account_name else 1))
@@ -5792,6 +6121,14 @@ class PanelBot:
 
     # -------------------------- update router --------------------------
     def process_update(self, update: dict[str, Any]) -> None:
+        # The config is read once per update; accessors reuse it until the handler returns.
+        self._req_cfg.cfg = self._load_runtime_cfg()
+        try:
+            self._dispatch_update(update)
+        finally:
+            self._req_cfg.cfg = None
+
+    def _dispatch_update(self, update: dict[str, Any]) -> None:
         callback_query = update.get("callback_query")
         if isinstance(callback_query, dict):
             data = str(callback_query.get("data") or "")
@@ -5812,7 +6149,7 @@ class PanelBot:
                         self._show_loading(
                             chat_id,
                             mid,
-                            self._tr(user_id, "༺═════⇓ تصدير الارقام ⇓═════༻", "༺═════⇓ Export Numbers ⇓═════༻"),
+                            self._t(user_id, "export_title"),
                             self._tr(user_id, "جاري تجهيز التصدير...", "Preparing export..."),
                             "numbers_export_menu",
                             user_id,
@@ -5835,7 +6172,7 @@ class PanelBot:
                         self._show_loading(
                             chat_id,
                             mid,
-                            self._tr(user_id, "༺═════⇓ تصدير الارقام ⇓═════༻", "༺═════⇓ Export Numbers ⇓═════༻"),
+                            self._t(user_id, "export_title"),
                             self._tr(user_id, "جاري تجهيز التصدير...", "Preparing export..."),
                             "numbers_export_menu",
                             user_id,
@@ -5861,8 +6198,9 @@ class PanelBot:
     def run(self) -> None:
         print("Panel bot started. Press Ctrl+C to stop.")
         while True:
-            payload = {"timeout": 25, "offset": self.last_update_id + 1}
-            res = self.tg_api("getUpdates", payload)
+            # Telegram holds the request open until an update arrives or poll_timeout passes.
+            payload = {"timeout": self.poll_timeout, "offset": self.last_update_id + 1, "allowed_updates": ALLOWED_UPDATES}
+            res = self.tg_api("getUpdates", payload, timeout=self.poll_timeout + POLL_HTTP_GRACE_SECONDS)
             if not res.get("ok"):
                 time.sleep(self.poll_interval)
                 continue
@@ -5879,6 +6217,8 @@ class PanelBot:
                     self.process_update(upd)
                 except Exception as exc:
                     print(f"update processing error: {exc}")
+            if not updates and not self.poll_timeout:
+                time.sleep(self.poll_interval)
 
 
 def main() -> None:
@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+
+from apps.admin_cli import _accounts
+
+
+class _Store:
+    def __init__(self, rows):
+        self.rows = rows
+        self.saved = None
+
+    def load(self, path, fallback):
+        return self.rows
+
+    def save(self, path, data):
+        self.saved = data
+
+
+class UpsertTests(unittest.TestCase):
+    def _run(self, rows, fn, *args, limit=0):
+        store = _Store(rows)
+        with mock.patch.object(_accounts, "load_json", store.load), \
+                mock.patch.object(_accounts, "save_json", store.save), \
+                mock.patch.object(_accounts, "invalidate_accounts_cache", lambda: None), \
+                mock.patch.object(_accounts, "_accounts_limit_total", lambda: limit), \
+                mock.patch.object(_accounts, "err", lambda msg: None), \
+                mock.patch.object(_accounts, "ok", lambda msg: None):
+            fn(*args)
+        return store.saved
+
+    def test_add_account_keeps_duplicate_and_empty_key_rows(self):
+        x = {"name": "X", "email": "", "password": "p"}
+        a = {"name": "A", "email": "u@x.com", "password": "p"}
+        a2 = {"name": "A2", "email": "U@x.com", "password": "p"}
+        saved = self._run([x, a, a2], _accounts.add_account, "N", "new@x.com", "pw", True)
+        self.assertEqual([row["name"] for row in saved], ["X", "A", "A2", "N"])
+
+    def test_add_account_collapses_matches_onto_first_position(self):
+        x = {"name": "X", "email": "", "password": "p"}
+        a = {"name": "A", "email": "u@x.com", "password": "p"}
+        b = {"name": "B", "email": "b@x.com", "password": "p"}
+        a2 = {"name": "A2", "email": "U@x.com", "password": "p"}
+        saved = self._run([x, a, b, a2], _accounts.add_account, "N", "U@X.com", "pw", True)
+        self.assertEqual([row["name"] for row in saved], ["X", "N", "B"])
+        self.assertEqual(saved[1]["password"], "pw")
+
+    def test_add_account_limit_counts_distinct_emails(self):
+        rows = [
+            {"name": "A", "email": "u@x.com", "password": "p"},
+            {"name": "A2", "email": "U@x.com", "password": "p"},
+            {"name": "X", "email": "", "password": "p"},
+        ]
+        saved = self._run(list(rows), _accounts.add_account, "N", "new@x.com", "pw", True, limit=2)
+        self.assertEqual(len(saved), 4)
+        saved = self._run(saved, _accounts.add_account, "M", "more@x.com", "pw", True, limit=2)
+        self.assertIsNone(saved)
+
+    def test_add_group_collapses_matches_onto_first_position(self):
+        g0 = {"name": "G0", "chat_id": ""}
+        g1 = {"name": "G1", "chat_id": "-1001234567890"}
+        g2 = {"name": "G2", "chat_id": "-1001234567890"}
+        g3 = {"name": "G3", "chat_id": "-1009876543210"}
+        saved = self._run([g0, g1, g2, g3], _accounts.add_group, "N", "-1001234567890", True)
+        self.assertEqual([row["name"] for row in saved], ["G0", "N", "G3"])
+
+    def test_set_platform_emoji_id_updates_first_match_only(self):
+        wa = {"key": "wa", "emoji_id": ""}
+        wa2 = {"key": "WA", "emoji_id": ""}
+        tg = {"key": "tg", "emoji_id": ""}
+        saved = self._run([wa, wa2, tg], _accounts.set_platform_emoji_id, "wa", "9")
+        self.assertEqual([(row["key"], row["emoji_id"]) for row in saved], [("wa", "9"), ("WA", ""), ("tg", "")])
+        saved = self._run([wa, wa2, tg], _accounts.set_platform_emoji_id, "tg", "7")
+        self.assertEqual([row["key"] for row in saved], ["wa", "WA", "tg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
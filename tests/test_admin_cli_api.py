@@ -0,0 +1,52 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import orjson
+
+from apps.admin_cli import _api
+
+ACCOUNT = {"name": "A", "email": "u@x.com", "password": "p"}
+
+
+class TokenCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "tokens.json"
+        for patcher in (
+            mock.patch.object(_api, "CLI_TOKEN_CACHE_FILE", self.path),
+            mock.patch.dict(_api._TOKEN_CACHE, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _write(self, rows):
+        self.path.write_bytes(orjson.dumps(rows))
+
+    def test_malformed_row_is_a_miss(self):
+        key = _api._token_store_key("http://api", ACCOUNT["email"])
+        self._write({key: {"token": "old", "expires_at": "1.5e9"}, "other": {"expires_at": "x"}})
+        with mock.patch.object(_api, "api_login", return_value=("new", "")) as login:
+            self.assertEqual(_api._account_token("http://api", ACCOUNT), ("new", ""))
+        login.assert_called_once()
+        self.assertEqual(list(orjson.loads(self.path.read_bytes())), [key])
+
+    def test_stored_token_keeps_its_remaining_lifetime(self):
+        key = _api._token_store_key("http://api", ACCOUNT["email"])
+        expires_at = int(time.time()) + _api.TOKEN_REFRESH_SKEW_SECONDS + 60
+        self._write({key: {"token": "stored", "expires_at": expires_at}})
+        with mock.patch.object(_api, "api_login", return_value=("new", "")) as login:
+            self.assertEqual(_api._account_token("http://api", ACCOUNT), ("stored", ""))
+            deadline = _api._TOKEN_CACHE[key][1]
+            self.assertLess(deadline - time.monotonic(), _api.TOKEN_REFRESH_SKEW_SECONDS + 61)
+            with mock.patch.object(_api.time, "monotonic", return_value=deadline + 1), \
+                    mock.patch.object(_api.time, "time", return_value=expires_at + 1):
+                self.assertEqual(_api._account_token("http://api", ACCOUNT), ("new", ""))
+        login.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import copy
+import unittest
+from unittest import mock
+
+from apps.admin_cli import _fetch, _ranges
+
+
+ROWS = [
+    {"number": "201000000002", "range": "EG 1"},
+    {"number": "201000000001", "range": "EG 1"},
+    {"number": "441000000001", "range": "UK 7"},
+]
+
+
+class _Store:
+    def __init__(self, data):
+        self.data = data
+        self.writes = 0
+
+    def load(self, path, fallback):
+        return copy.deepcopy(self.data)
+
+    def save(self, path, data):
+        self.writes += 1
+        self.data = copy.deepcopy(data)
+
+
+class SyncTests(unittest.TestCase):
+    def _sync(self, store, rows):
+        response = ("acc", (True, {"data": rows}, ""))
+        with mock.patch.object(_ranges, "load_json", store.load), \
+                mock.patch.object(_ranges, "save_json", store.save), \
+                mock.patch.object(_fetch, "_call_targets", lambda api_base, call: [response]), \
+                mock.patch.object(_fetch, "_print_lines", lambda lines: None), \
+                mock.patch.object(_fetch, "heading", lambda msg: None), \
+                mock.patch.object(_fetch, "ok", lambda msg: None):
+            _fetch.fetch_numbers_command("http://api", update_store=True)
+
+    def test_unchanged_sync_does_not_write(self):
+        store = _Store({})
+        self._sync(store, ROWS)
+        self.assertEqual(store.writes, 1)
+        stamp = store.data["ranges"]["EG 1"]["last_numbers_sync_at"]
+        self.assertEqual(store.data["ranges"]["EG 1"]["available_numbers_count"], 2)
+        self._sync(store, list(reversed(ROWS)))
+        self.assertEqual(store.writes, 1)
+        self.assertEqual(store.data["ranges"]["EG 1"]["last_numbers_sync_at"], stamp)
+
+    def test_changed_count_writes_and_keeps_other_stamps(self):
+        store = _Store({})
+        self._sync(store, ROWS)
+        before = copy.deepcopy(store.data["ranges"]["UK 7"])
+        self._sync(store, ROWS + [{"number": "201000000003", "range": "EG 1"}])
+        self.assertEqual(store.writes, 2)
+        self.assertEqual(store.data["ranges"]["EG 1"]["available_numbers_count"], 3)
+        self.assertEqual(store.data["ranges"]["UK 7"], before)
+
+
+if __name__ == "__main__":
+    unittest.main()